@@ -0,0 +1,24 @@
+from typing import Any, Dict, Optional
+from abc import ABC, abstractmethod
+
+
+class AbstractAsyncStorage(ABC):
+    """
+    Non-blocking counterpart of `AbstractStorage` used by the async (ASGI) application.
+    """
+
+    @abstractmethod
+    async def set(self, object_id: str, data: Any) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, object_id: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def compare_and_set(self, object_id: str, data: Any, expected_version: Optional[int]) -> bool:
+        raise NotImplementedError
+
+    async def set_many(self, objects: Dict[str, Any]) -> None:
+        for object_id, data in objects.items():
+            await self.set(object_id, data)
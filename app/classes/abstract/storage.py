@@ -1,6 +1,9 @@
-from typing import Any
+import threading
+from typing import Any, Dict, Optional
 from abc import ABC, abstractmethod
 
+_compare_and_set_lock = threading.Lock()
+
 
 class AbstractStorage(ABC):
     @abstractmethod
@@ -10,3 +13,44 @@ class AbstractStorage(ABC):
     @abstractmethod
     def get(self, object_id: str) -> Any:
         raise NotImplementedError
+
+    def set_many(self, objects: Dict[str, Any]) -> None:
+        for object_id, data in objects.items():
+            self.set(object_id, data)
+
+    def compare_and_set(self, object_id: str, data: Any, expected_version: Optional[int]) -> bool:
+        """
+        Stores the object only when the stored one was not changed since it was read,
+        which means its version (returned by `get_version()` of the object) is still the expected one.
+
+        :param (str) object_id: Object id.
+        :param (Any) data: New version of the object.
+        :param (Optional[int]) expected_version: Version of the stored object, `None` when it should not exist yet.
+        :return (bool): Whether the object was stored.
+        """
+
+        return self.compare_and_set_many({object_id: data}, object_id, expected_version)
+
+    def compare_and_set_many(self, objects: Dict[str, Any], object_id: str, expected_version: Optional[int]) -> bool:
+        """
+        Stores the objects only when the version of the stored object with the given id is still the expected one
+        (see `compare_and_set()`), e.g. a mine field along with the objects kept for it.
+
+        Default implementation is atomic only between threads of the same process,
+        storages shared between processes should override it.
+
+        :param (Dict[str, Any]) objects: Objects to store by their ids.
+        :param (str) object_id: Id of the object which version is checked.
+        :param (Optional[int]) expected_version: Version of the stored object, `None` when it should not exist yet.
+        :return (bool): Whether the objects were stored.
+        """
+
+        with _compare_and_set_lock:
+            if self._get_version(self.get(object_id)) != expected_version:
+                return False
+            self.set_many(objects)
+            return True
+
+    @staticmethod
+    def _get_version(data: Any) -> Optional[int]:
+        return data.get_version() if data is not None else None
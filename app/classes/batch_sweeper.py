@@ -0,0 +1,173 @@
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField
+from app.field_utils import get_max_distance, get_mine_distance_map, get_radius_stencil
+
+
+class BatchSweeper:
+    """
+    Plays many games with the same settings simultaneously using the same strategy as `Sweeper`.
+    Mine fields of all games are stacked into arrays, so every move is made in all games at once.
+
+    Since every safe cell is discovered sooner or later no matter in which order, all safe cells found on the mine field
+    are discovered within one step. Random guesses are made only when no safe cells are left, same as `Sweeper` does.
+    Won/lost ratio and number of moves made in each game match the ones of `Sweeper` played one game at a time.
+    """
+
+    def __init__(
+        self,
+        horizontal_size: int,
+        vertical_size: int,
+        mines: int,
+        discoverable_radius: int,
+        opened_cells: int,
+        games: int,
+        seed: Optional[int] = None
+    ):
+        """
+        Initializes batch of games with the given parameters.
+
+        :param (int) horizontal_size: Horizontal size of the mine field. Can be any positive number.
+        :param (int) vertical_size: Vertical size of the mine field. Can be any positive number.
+        :param (int) mines: Number of mines to set on the field. Can be any positive number.
+        :param (int) discoverable_radius:  Distance from the current cell where nearest mine cells are looked for.
+        :param (int) opened_cells: Cells to open on the mine field before game starts.
+        :param (int) games: Number of games to play.
+        :param (Optional[int]) seed: Random generator seed, makes results reproducible when set.
+        """
+
+        MineField._validate_init(
+            horizontal_size=horizontal_size,
+            vertical_size=vertical_size,
+            mines=mines,
+            discoverable_radius=discoverable_radius,
+            opened_cells=opened_cells
+        )
+        if games < 1:
+            raise ValueError("at least 1 game should be played")
+
+        self._horizontal_field_size = horizontal_size
+        self._vertical_field_size = vertical_size
+        self._mines = mines
+        self._opened_cells = opened_cells
+        self._games = games
+        self._discoverable_radius = discoverable_radius
+        self._random = np.random.default_rng(seed)
+
+    def sweep(self) -> Dict[str, Union[int, np.ndarray]]:
+        """
+        Plays all the games till the end.
+
+        Usage example:
+
+        ```
+            from app.classes.batch_sweeper import BatchSweeper
+
+            batch_sweeper = BatchSweeper(
+                horizontal_size=5, vertical_size=5, mines=4, discoverable_radius=2, opened_cells=5, games=100000
+            )
+            print(batch_sweeper.sweep())
+        ```
+
+        :return (Dict): Number of games won and lost, along with the number of moves made in each game.
+        """
+
+        mines_cells, discovered_cells = self._generate_mine_fields()
+        distances = get_mine_distance_map(mines_cells, self._discoverable_radius)
+        moves = np.zeros(self._games, dtype=np.int64)
+        game_states = np.full(self._games, GameState.InProgress.value, dtype=object)
+        cells = self._horizontal_field_size * self._vertical_field_size
+
+        active_games = np.arange(self._games)
+        while True:
+            unknown_cells = cells - discovered_cells[active_games].sum(axis=(1, 2))
+            won_games = unknown_cells == self._mines
+            game_states[active_games[won_games]] = GameState.Won.value
+            active_games = active_games[~won_games]
+            if not active_games.size:
+                break
+
+            safe_cells = self._get_safe_cells(discovered_cells[active_games], distances[active_games])
+            safe_cells_counts = safe_cells.sum(axis=(1, 2))
+            sweeping_games = safe_cells_counts > 0
+            discovered_cells[active_games[sweeping_games]] |= safe_cells[sweeping_games]
+            moves[active_games[sweeping_games]] += safe_cells_counts[sweeping_games]
+
+            guessing_games = active_games[~sweeping_games]
+            if not guessing_games.size:
+                continue
+
+            # Picking cell with the highest random score gives uniform choice among unknown cells of each game.
+            scores = self._random.random((guessing_games.size, self._vertical_field_size, self._horizontal_field_size))
+            scores[discovered_cells[guessing_games]] = -1
+            flat_indices = scores.reshape(guessing_games.size, -1).argmax(axis=1)
+            ys, xs = np.unravel_index(flat_indices, (self._vertical_field_size, self._horizontal_field_size))
+            discovered_cells[guessing_games, ys, xs] = True
+            moves[guessing_games] += 1
+
+            lost_games = mines_cells[guessing_games, ys, xs]
+            game_states[guessing_games[lost_games]] = GameState.Lost.value
+            active_games = np.setdiff1d(active_games, guessing_games[lost_games], assume_unique=True)
+            if not active_games.size:
+                break
+
+        won = int(np.count_nonzero(game_states == GameState.Won.value))
+        return {
+            "won": won,
+            "lost": self._games - won,
+            "moves": moves
+        }
+
+    def _generate_mine_fields(self) -> Tuple[np.ndarray, np.ndarray]:
+        cells = self._horizontal_field_size * self._vertical_field_size
+        shape = (self._games, self._vertical_field_size, self._horizontal_field_size,)
+
+        # Random permutation of cells for each game: mines go first, opened cells next.
+        cells_order = self._random.random((self._games, cells)).argsort(axis=1)
+        mines_cells = np.zeros((self._games, cells), dtype=bool)
+        discovered_cells = np.zeros((self._games, cells), dtype=bool)
+        np.put_along_axis(mines_cells, cells_order[:, :self._mines], True, axis=1)
+        np.put_along_axis(
+            discovered_cells, cells_order[:, self._mines:self._mines + self._opened_cells], True, axis=1
+        )
+        return mines_cells.reshape(shape), discovered_cells.reshape(shape)
+
+    def _get_safe_cells(self, discovered_cells: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """
+        Finds undiscovered cells which are closer to some discovered cell than the nearest mine of that discovered cell.
+
+        :param (np.ndarray) discovered_cells: Stack of boolean maps of discovered cells.
+        :param (np.ndarray) distances: Stack of nearest mine distance maps.
+        :return (np.ndarray): Stack of boolean maps of safe undiscovered cells.
+        """
+
+        vertical_size, horizontal_size = discovered_cells.shape[-2:]
+        max_distance = get_max_distance(horizontal_size, vertical_size)
+        safe_cells = np.zeros_like(discovered_cells)
+        for mine_distance in range(2, min(self._discoverable_radius, max_distance) + 1):
+            source_cells = discovered_cells & (distances == mine_distance)
+            if not source_cells.any():
+                continue
+            for dx, dy, _ in get_radius_stencil(mine_distance - 1):
+                safe_cells[
+                    ...,
+                    max(dy, 0):vertical_size + min(dy, 0),
+                    max(dx, 0):horizontal_size + min(dx, 0)
+                ] |= source_cells[
+                    ...,
+                    max(-dy, 0):vertical_size - max(dy, 0),
+                    max(-dx, 0):horizontal_size - max(dx, 0)
+                ]
+        return safe_cells & ~discovered_cells
+
+    def __repr__(self) -> str:
+        return "BatchSweeper(" \
+               f"horizontal_size={self._horizontal_field_size}, " \
+               f"vertical_size={self._vertical_field_size}, " \
+               f"mines={self._mines}, " \
+               f"discoverable_radius={self._discoverable_radius}, " \
+               f"opened_cells={self._opened_cells}, " \
+               f"games={self._games})"
@@ -0,0 +1,147 @@
+import atexit
+import threading
+from copy import deepcopy
+from time import monotonic, sleep
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.classes.abstract.storage import AbstractStorage
+
+
+class CachedStorage(AbstractStorage):
+    """
+    Keeps recently used objects in memory in front of another storage, so consecutive moves on the same mine field
+    do not hit the underlying storage.
+
+    Cache is bounded both by size (least recently used objects are evicted first) and by time to live.
+    Writes are kept in memory as well and flushed to the underlying storage in background (write-behind),
+    evicted objects are flushed right away.
+    Since other processes do not see objects which are not flushed yet, cache fits single-process deployments only.
+
+    Cached objects are copied on every read, so requests changing the same object at the same time
+    never share it and compare-and-set can tell which of them was the first one.
+    """
+
+    def __init__(
+        self,
+        storage: AbstractStorage,
+        max_size: int = 1000,
+        ttl: float = 60.0,
+        flush_interval: Optional[float] = 1.0
+    ):
+        """
+        :param (AbstractStorage) storage: Underlying storage.
+        :param (int) max_size: Max number of objects to keep in memory.
+        :param (float) ttl: Number of seconds object is kept in memory since it was last accessed.
+        :param (Optional[float]) flush_interval: Number of seconds between background flushes.
+            When set to `None`, changes are flushed only on eviction or by explicit `flush()` call.
+        """
+
+        self._storage = storage
+        self._max_size = max_size
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+        self._entries = OrderedDict()
+        self._dirty_entries = {}
+        self._lock = threading.Lock()
+        self._compare_and_set_lock = threading.Lock()
+        self._flush_thread = None
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "flushed_writes": 0
+        }
+        atexit.register(self.flush)
+
+    def get(self, object_id: str) -> Any:
+        return deepcopy(self._get(object_id))
+
+    def set(self, object_id: str, data: Any) -> None:
+        with self._lock:
+            self._dirty_entries[object_id] = data
+        self._put(object_id, data)
+        self._start_flush_thread()
+
+    def compare_and_set_many(self, objects: Dict[str, Any], object_id: str, expected_version: Optional[int]) -> bool:
+        with self._compare_and_set_lock:
+            if self._get_version(self._get(object_id)) != expected_version:
+                return False
+            self.set_many(objects)
+            return True
+
+    def flush(self) -> None:
+        """
+        Writes all changed objects to the underlying storage.
+        """
+
+        with self._lock:
+            dirty_entries = self._dirty_entries
+            self._dirty_entries = {}
+        self._write(dirty_entries)
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._metrics, "size": len(self._entries), "dirty": len(self._dirty_entries)}
+
+    def _get(self, object_id: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(object_id)
+            if entry and entry[1] > monotonic():
+                self._entries.move_to_end(object_id)
+                self._entries[object_id] = (entry[0], monotonic() + self._ttl)
+                self._metrics["hits"] += 1
+                return entry[0]
+            self._metrics["misses"] += 1
+            # Expired object can still be waiting for flush, so it is not read from the underlying storage.
+            if object_id in self._dirty_entries:
+                data = self._dirty_entries[object_id]
+                self._entries[object_id] = (data, monotonic() + self._ttl)
+                return data
+
+        data = self._storage.get(object_id)
+        if data is not None:
+            # Object could be changed by another thread while it was being read, that version is kept then.
+            data = self._put(object_id, data, replace=False)
+        return data
+
+    def _put(self, object_id: str, data: Any, replace: bool = True) -> Any:
+        evicted_entries = {}
+        with self._lock:
+            if not replace and object_id in self._entries:
+                data = self._entries[object_id][0]
+            self._entries[object_id] = (data, monotonic() + self._ttl)
+            self._entries.move_to_end(object_id)
+
+            now = monotonic()
+            for entry_id, (_, expires_at) in list(self._entries.items()):
+                if len(self._entries) <= self._max_size and expires_at > now:
+                    break
+                del self._entries[entry_id]
+                self._metrics["evictions"] += 1
+                if entry_id in self._dirty_entries:
+                    evicted_entries[entry_id] = self._dirty_entries.pop(entry_id)
+        self._write(evicted_entries)
+        return data
+
+    def _write(self, entries: Dict[str, Any]) -> None:
+        if not entries:
+            return
+        self._storage.set_many(entries)
+        with self._lock:
+            self._metrics["flushed_writes"] += len(entries)
+
+    def _start_flush_thread(self) -> None:
+        if self._flush_interval is None or self._flush_thread:
+            return
+
+        with self._lock:
+            if self._flush_thread:
+                return
+            self._flush_thread = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flush_thread.start()
+
+    def _flush_periodically(self) -> None:
+        while True:
+            sleep(self._flush_interval)
+            self.flush()
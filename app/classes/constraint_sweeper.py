@@ -0,0 +1,398 @@
+import math
+import random
+from itertools import count
+from collections import defaultdict
+
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Union
+
+from app.classes.sweeper import Sweeper
+from app.classes.mine_field import MineField
+from app.field_utils import get_max_distance, get_radius_ring, get_radius_stencil
+
+Cell = Tuple[int, int]
+Constraint = FrozenSet[Cell]
+
+# Solutions of components are cached between moves, the cache is cleared once it gets bigger than this,
+# so memory of a sweeper stays bounded on huge mine fields with lots of components.
+MAX_CACHED_COMPONENT_SOLUTIONS = 10000
+
+
+class ComponentSolution:
+    """
+    Number of ways to place mines into cells of a single constraints component.
+
+    Cells which belong to the same constraints are grouped into classes, since they are interchangeable.
+    `mines_counts[k]` is the number of placements of `k` mines satisfying all constraints of the component,
+    `cells_mines_counts[i][k]` is the number of such placements where a certain cell of i-th class is a mine.
+    """
+
+    def __init__(self, cells_classes: List[List[Cell]], mines_counts: List[int], cells_mines_counts: List[List[int]]):
+        self.cells_classes = cells_classes
+        self.mines_counts = mines_counts
+        self.cells_mines_counts = cells_mines_counts
+
+
+class ConstraintSweeper(Sweeper):
+    """
+    Sweeper which treats every discovered cell as a constraint on unknown cells around it.
+
+    Cell with distance `d` means there are no mines closer than `d` and at least one mine exactly `d` cells away.
+    Empty cell means there are no mines inside the discoverable radius at all.
+    Deductions are propagated between constraints: cells which can not be mines are discovered,
+    and once only one cell is left to satisfy a constraint, it is marked as a mine and never discovered.
+
+    When no safe cells are left, the cell with the lowest mine probability is discovered.
+    Probabilities are computed by enumerating placements of mines inside independent groups (components)
+    of overlapping constraints, combined with the total number of mines on the field.
+    Solutions of components are cached between moves, since most of the components do not change after a move.
+    """
+
+    def __init__(
+        self,
+        mine_field: MineField,
+        max_component_classes: int = 10,
+        rng: Optional[random.Random] = None
+    ):
+        """
+        :param (MineField) mine_field: Mine field to clean.
+        :param (int) max_component_classes: Max number of cells classes in a component to enumerate placements for.
+            Probabilities of cells inside bigger components are estimated by constraint sizes.
+        :param (Optional[random.Random]) rng: Random generator of guesses,
+            module level `random` generator is used when not set.
+        """
+
+        self._mines = mine_field.get_mines()
+        self._discoverable_radius = mine_field.get_discoverable_radius()
+        self._max_component_classes = max_component_classes
+        self._constraints = {}
+        self._cells_constraints = defaultdict(set)
+        self._constraints_ids = count()
+        self._known_safe_cells = set()
+        self._known_mines_cells = set()
+        self._components_solutions = {}
+        super().__init__(mine_field, rng=rng)
+
+    def _guess_cell_coordinates(self) -> Cell:
+        if len(self._known_mines_cells) == self._mines:
+            for coordinates in list(self._unknown_cells_indices):
+                if coordinates not in self._known_mines_cells:
+                    self._mark_safe_cell(coordinates)
+            return self._find_next_safe_cell_coordinates()
+
+        mine_probabilities, are_probabilities_exact = self._get_mine_probabilities()
+        if are_probabilities_exact:
+            for coordinates, mine_probability in mine_probabilities.items():
+                if mine_probability == 0:
+                    self._mark_safe_cell(coordinates)
+                elif mine_probability == 1:
+                    self._mark_mine_cell(coordinates)
+
+        safe_cell_coordinates = self._find_next_safe_cell_coordinates()
+        if safe_cell_coordinates:
+            return safe_cell_coordinates
+
+        lowest_mine_probability = min(
+            mine_probability for coordinates, mine_probability in mine_probabilities.items()
+            if coordinates not in self._known_mines_cells
+        )
+        candidates = [
+            coordinates for coordinates, mine_probability in mine_probabilities.items()
+            if math.isclose(mine_probability, lowest_mine_probability) and coordinates not in self._known_mines_cells
+        ]
+        return candidates[self._random.randint(0, len(candidates) - 1)]
+
+    def _add_safe_cells(self, x: int, y: int, cell: Union[str, int]) -> None:
+        if cell == self._empty_cell:
+            # Distances on the field never exceed its diagonal, so there is no need to look further.
+            max_distance = get_max_distance(self._horizontal_field_size, self._vertical_field_size)
+            safe_offsets = get_radius_stencil(min(self._discoverable_radius, max_distance))
+            mine_offsets = ()
+        elif cell in self._non_distance_cells:
+            return
+        else:
+            safe_offsets = get_radius_stencil(cell - 1)
+            mine_offsets = get_radius_ring(cell)
+
+        for dx, dy, _ in safe_offsets:
+            self._mark_safe_cell((x + dx, y + dy,))
+
+        constraint_cells = set()
+        for dx, dy, _ in mine_offsets:
+            coordinates = (x + dx, y + dy,)
+            if coordinates in self._known_mines_cells:
+                return
+            if coordinates in self._unknown_cells_indices and coordinates not in self._known_safe_cells:
+                constraint_cells.add(coordinates)
+        self._add_constraint(constraint_cells)
+
+    def _remove_unknown_cell(self, x: int, y: int) -> None:
+        super()._remove_unknown_cell(x, y)
+        self._known_safe_cells.discard((x, y,))
+        # Discovered mine finishes the game, so there is nothing to learn from it.
+        if self._mine_field.get_cell(x, y) != self._mine_cell:
+            self._remove_constraints_cell((x, y,))
+
+    def _mark_safe_cell(self, coordinates: Cell) -> None:
+        if coordinates not in self._unknown_cells_indices or coordinates in self._known_safe_cells:
+            return
+
+        self._known_safe_cells.add(coordinates)
+        self._safe_cells_coordinates.append(coordinates)
+        self._remove_constraints_cell(coordinates)
+
+    def _mark_mine_cell(self, coordinates: Cell) -> None:
+        if coordinates in self._known_mines_cells:
+            return
+
+        self._known_mines_cells.add(coordinates)
+        # All constraints containing the mine are satisfied.
+        for constraint_id in self._cells_constraints.pop(coordinates, set()):
+            for constraint_cell in self._constraints.pop(constraint_id):
+                if constraint_cell != coordinates:
+                    self._cells_constraints[constraint_cell].discard(constraint_id)
+
+    def _add_constraint(self, constraint_cells: Set[Cell]) -> None:
+        if len(constraint_cells) == 1:
+            self._mark_mine_cell(next(iter(constraint_cells)))
+        elif constraint_cells:
+            constraint_id = next(self._constraints_ids)
+            self._constraints[constraint_id] = constraint_cells
+            for coordinates in constraint_cells:
+                self._cells_constraints[coordinates].add(constraint_id)
+
+    def _remove_constraints_cell(self, coordinates: Cell) -> None:
+        for constraint_id in self._cells_constraints.pop(coordinates, set()):
+            constraint_cells = self._constraints.get(constraint_id)
+            # Constraint might be already satisfied by the mine found while handling previous constraints.
+            if constraint_cells is None:
+                continue
+            constraint_cells.discard(coordinates)
+            if len(constraint_cells) == 1:
+                self._mark_mine_cell(next(iter(constraint_cells)))
+
+    def _get_mine_probabilities(self) -> Tuple[Dict[Cell, float], bool]:
+        """
+        Computes mine probability of every unknown cell which is not known to be a mine.
+
+        :return (Tuple[Dict, bool]): Mine probabilities of cells and whether they are exact,
+            probabilities are not exact when some of the components were too big to be enumerated.
+        """
+
+        constraints = self._get_reduced_constraints()
+        constrained_cells = set().union(*constraints)
+        other_cells = [
+            coordinates for coordinates in self._unknown_cells_coordinates
+            if coordinates not in constrained_cells
+            and coordinates not in self._known_mines_cells and coordinates not in self._known_safe_cells
+        ]
+        remaining_mines = self._mines - len(self._known_mines_cells)
+
+        mine_probabilities = {}
+        solutions = []
+        are_probabilities_exact = True
+        for component in self._get_components(constraints):
+            solution = self._solve_component(component)
+            if solution:
+                solutions.append(solution)
+                continue
+            # Component is too big to enumerate, so estimating probabilities by the smallest constraint of each cell.
+            for constraint in component:
+                for coordinates in constraint:
+                    mine_probabilities[coordinates] = max(mine_probabilities.get(coordinates, 0), 1 / len(constraint))
+            remaining_mines -= self._get_disjoint_constraints_count(component)
+            are_probabilities_exact = False
+
+        mines_counts = [1]
+        for solution in solutions:
+            mines_counts = _multiply_polynomials(mines_counts, solution.mines_counts)
+        placements = sum(
+            component_placements * _get_combinations(len(other_cells), remaining_mines - mines)
+            for mines, component_placements in enumerate(mines_counts)
+        )
+        if not placements:
+            # Estimations of big components made the total number of mines inconsistent, giving up on exact numbers.
+            for solution in solutions:
+                for cells_class in solution.cells_classes:
+                    for coordinates in cells_class:
+                        mine_probabilities[coordinates] = 0.5
+            for coordinates in other_cells:
+                mine_probabilities[coordinates] = 0.5
+            return mine_probabilities, False
+
+        for index, solution in enumerate(solutions):
+            other_mines_counts = [1]
+            for other_solution in solutions[:index] + solutions[index + 1:]:
+                other_mines_counts = _multiply_polynomials(other_mines_counts, other_solution.mines_counts)
+            # Number of ways to place the rest of mines outside the component, given `mines` mines inside it.
+            other_placements = [
+                sum(
+                    other_component_placements * _get_combinations(len(other_cells), remaining_mines - mines - j)
+                    for j, other_component_placements in enumerate(other_mines_counts)
+                ) for mines in range(len(solution.mines_counts))
+            ]
+            for cells_class, cells_mines_counts in zip(solution.cells_classes, solution.cells_mines_counts):
+                mine_placements = sum(
+                    cell_placements * other_placements[mines]
+                    for mines, cell_placements in enumerate(cells_mines_counts)
+                )
+                for coordinates in cells_class:
+                    mine_probabilities[coordinates] = mine_placements / placements
+
+        if other_cells:
+            other_cell_mine_placements = sum(
+                component_placements * _get_combinations(len(other_cells) - 1, remaining_mines - mines - 1)
+                for mines, component_placements in enumerate(mines_counts)
+            )
+            for coordinates in other_cells:
+                mine_probabilities[coordinates] = other_cell_mine_placements / placements
+        return mine_probabilities, are_probabilities_exact
+
+    def _get_reduced_constraints(self) -> List[Constraint]:
+        """
+        Drops constraints which are always satisfied once smaller ones are satisfied (supersets of other constraints).
+        """
+
+        reduced_constraints = []
+        for constraint in sorted({frozenset(cells) for cells in self._constraints.values()}, key=len):
+            if not any(reduced_constraint <= constraint for reduced_constraint in reduced_constraints):
+                reduced_constraints.append(constraint)
+        return reduced_constraints
+
+    @staticmethod
+    def _get_components(constraints: List[Constraint]) -> List[FrozenSet[Constraint]]:
+        cells_constraints = defaultdict(list)
+        for constraint in constraints:
+            for coordinates in constraint:
+                cells_constraints[coordinates].append(constraint)
+
+        components = []
+        visited_constraints = set()
+        for constraint in constraints:
+            if constraint in visited_constraints:
+                continue
+            component = set()
+            constraints_to_visit = [constraint]
+            visited_constraints.add(constraint)
+            while constraints_to_visit:
+                component_constraint = constraints_to_visit.pop()
+                component.add(component_constraint)
+                for coordinates in component_constraint:
+                    for neighbor_constraint in cells_constraints[coordinates]:
+                        if neighbor_constraint not in visited_constraints:
+                            visited_constraints.add(neighbor_constraint)
+                            constraints_to_visit.append(neighbor_constraint)
+            components.append(frozenset(component))
+        return components
+
+    def _solve_component(self, component: FrozenSet[Constraint]) -> Optional[ComponentSolution]:
+        if component in self._components_solutions:
+            return self._components_solutions[component]
+
+        constraints = list(component)
+        cells_classes = defaultdict(list)
+        for coordinates in set().union(*constraints):
+            cells_classes[frozenset(
+                index for index, constraint in enumerate(constraints) if coordinates in constraint
+            )].append(coordinates)
+        if len(cells_classes) > self._max_component_classes:
+            self._components_solutions[component] = None
+            return None
+
+        classes = list(cells_classes.values())
+        # Bit masks of constraints each class of cells belongs to.
+        classes_masks = [sum(1 << index for index in class_constraints) for class_constraints in cells_classes]
+        all_constraints_mask = (1 << len(constraints)) - 1
+        cells = sum(len(cells_class) for cells_class in classes)
+
+        mines_counts = self._count_placements(classes, classes_masks, all_constraints_mask)
+        cells_mines_counts = []
+        for index, cells_class in enumerate(classes):
+            # Certain cell of the class is a mine, so constraints of the class are satisfied
+            # and the rest of cells of the class may contain any number of mines.
+            other_classes_placements = self._count_placements(
+                classes[:index] + classes[index + 1:],
+                classes_masks[:index] + classes_masks[index + 1:],
+                all_constraints_mask,
+                satisfied_constraints_mask=classes_masks[index]
+            )
+            cell_polynomial = [0] + [math.comb(len(cells_class) - 1, j) for j in range(len(cells_class))]
+            cells_mines_counts.append(_multiply_polynomials(other_classes_placements, cell_polynomial))
+
+        mines_counts = _pad_polynomial(mines_counts, cells + 1)
+        cells_mines_counts = [_pad_polynomial(polynomial, cells + 1) for polynomial in cells_mines_counts]
+        solution = ComponentSolution(classes, mines_counts, cells_mines_counts)
+        if len(self._components_solutions) > MAX_CACHED_COMPONENT_SOLUTIONS:
+            self._components_solutions.clear()
+        self._components_solutions[component] = solution
+        return solution
+
+    @staticmethod
+    def _count_placements(
+        classes: List[List[Cell]],
+        classes_masks: List[int],
+        all_constraints_mask: int,
+        satisfied_constraints_mask: int = 0
+    ) -> List[int]:
+        """
+        Counts placements of mines into classes of cells which leave no constraint without a mine.
+        Classes are added one by one keeping numbers of placements grouped by constraints satisfied so far.
+
+        :return (List[int]): Numbers of placements indexed by the number of mines.
+        """
+
+        placements = {satisfied_constraints_mask: [1]}
+        for cells_class, class_mask in zip(classes, classes_masks):
+            class_size = len(cells_class)
+            mined_class_polynomial = [0] + [math.comb(class_size, j) for j in range(1, class_size + 1)]
+            next_placements = {}
+            for mask, polynomial in placements.items():
+                _add_polynomial(next_placements, mask, polynomial)
+                _add_polynomial(
+                    next_placements, mask | class_mask, _multiply_polynomials(polynomial, mined_class_polynomial)
+                )
+            placements = next_placements
+        return placements.get(all_constraints_mask, [0])
+
+    @staticmethod
+    def _get_disjoint_constraints_count(component: FrozenSet[Constraint]) -> int:
+        # Each of the disjoint constraints needs its own mine, so it is a lower bound of mines inside the component.
+        used_cells = set()
+        disjoint_constraints = 0
+        for constraint in sorted(component, key=len):
+            if used_cells.isdisjoint(constraint):
+                used_cells.update(constraint)
+                disjoint_constraints += 1
+        return disjoint_constraints
+
+    def __repr__(self):
+        return "ConstraintSweeper(mine_field=MineField())"
+
+
+def _multiply_polynomials(polynomial_1: List[int], polynomial_2: List[int]) -> List[int]:
+    product = [0] * (len(polynomial_1) + len(polynomial_2) - 1)
+    for power_1, coefficient_1 in enumerate(polynomial_1):
+        if coefficient_1:
+            for power_2, coefficient_2 in enumerate(polynomial_2):
+                product[power_1 + power_2] += coefficient_1 * coefficient_2
+    return product
+
+
+def _add_polynomial(polynomials: Dict[int, List[int]], key: int, polynomial: List[int]) -> None:
+    if key not in polynomials:
+        polynomials[key] = list(polynomial)
+        return
+
+    total_polynomial = _pad_polynomial(polynomials[key], len(polynomial))
+    for power, coefficient in enumerate(polynomial):
+        total_polynomial[power] += coefficient
+    polynomials[key] = total_polynomial
+
+
+def _pad_polynomial(polynomial: List[int], length: int) -> List[int]:
+    return polynomial + [0] * (length - len(polynomial))
+
+
+def _get_combinations(n: int, k: int) -> int:
+    if k < 0 or n < 0 or k > n:
+        return 0
+    return math.comb(n, k)
@@ -0,0 +1,43 @@
+from typing import Any, Dict, Optional
+
+from app.classes.metrics import Metrics
+from app.classes.abstract.storage import AbstractStorage
+
+
+class MeteredStorage(AbstractStorage):
+    """
+    Measures duration of calls made to another storage as `storage_*` stages of the metrics.
+    """
+
+    def __init__(self, storage: AbstractStorage, metrics: Metrics):
+        """
+        :param (AbstractStorage) storage: Measured storage.
+        :param (Metrics) metrics: Metrics to report durations to.
+        """
+
+        self._storage = storage
+        self._metrics = metrics
+
+    def get(self, object_id: str) -> Any:
+        with self._metrics.time("storage_get"):
+            return self._storage.get(object_id)
+
+    def set(self, object_id: str, data: Any) -> None:
+        with self._metrics.time("storage_set"):
+            self._storage.set(object_id, data)
+
+    def set_many(self, objects: Dict[str, Any]) -> None:
+        with self._metrics.time("storage_set_many"):
+            self._storage.set_many(objects)
+
+    def compare_and_set(self, object_id: str, data: Any, expected_version: Optional[int]) -> bool:
+        with self._metrics.time("storage_compare_and_set"):
+            return self._storage.compare_and_set(object_id, data, expected_version)
+
+    def compare_and_set_many(self, objects: Dict[str, Any], object_id: str, expected_version: Optional[int]) -> bool:
+        with self._metrics.time("storage_compare_and_set"):
+            return self._storage.compare_and_set_many(objects, object_id, expected_version)
+
+    def __getattr__(self, name: str) -> Any:
+        # Methods specific to the measured storage (like `flush()` of the cached one) stay available.
+        return getattr(self._storage, name)
@@ -0,0 +1,127 @@
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from contextlib import nullcontext
+from typing import ContextManager, Dict, List, Optional, Sequence
+
+# Most of the stages take from tens of microseconds to tens of milliseconds.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+COUNTERS = {
+    "games_created": "Number of created games.",
+    "games_won": "Number of won games.",
+    "games_lost": "Number of lost games.",
+    "storage_read_bytes": "Number of bytes read from the storage.",
+    "storage_written_bytes": "Number of bytes written to the storage."
+}
+METRIC_NAME_PREFIX = "grid_solver_"
+DISABLED_TIMER = nullcontext()
+
+
+class StageTimer:
+    def __init__(self, metrics: "Metrics", stage: str):
+        self._metrics = metrics
+        self._stage = stage
+        self._started_at = None
+
+    def __enter__(self) -> "StageTimer":
+        self._started_at = perf_counter()
+        return self
+
+    def __exit__(self, *exception_info) -> None:
+        self._metrics.observe(self._stage, perf_counter() - self._started_at)
+
+
+class Metrics:
+    """
+    Collects duration histograms of request handling stages (like storage reads or mine field updates)
+    along with counters of games and storage traffic, and renders them in Prometheus text format.
+
+    When disabled, timers and counters do nothing, so instrumented code pays only for a method call.
+    Metrics are kept in memory of the process, each process of the service reports its own ones.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        :param (bool) enabled: Whether metrics are collected.
+        :param (Sequence[float]) buckets: Sorted upper bounds (in seconds) of histogram buckets.
+        """
+
+        self.enabled = enabled
+        self._buckets = tuple(buckets)
+        self._histograms: Dict[str, List] = {}
+        self._counters = dict.fromkeys(COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def time(self, stage: str) -> ContextManager:
+        """
+        Measures duration of the `with` block as the stage.
+
+        :param (str) stage: Name of the stage.
+        :return (ContextManager): Timer of the stage.
+        """
+
+        if not self.enabled:
+            return DISABLED_TIMER
+        return StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                # Bucket counts (the last one is +Inf) along with sum of observed durations.
+                histogram = self._histograms[stage] = [[0] * (len(self._buckets) + 1), 0.0]
+            histogram[0][bisect_left(self._buckets, seconds)] += 1
+            histogram[1] += seconds
+
+    def increment(self, counter: str, value: int = 1) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._counters[counter] += value
+
+    def get_counter(self, counter: str) -> int:
+        with self._lock:
+            return self._counters[counter]
+
+    def get_stage_count(self, stage: str) -> int:
+        with self._lock:
+            histogram: Optional[List] = self._histograms.get(stage)
+            return sum(histogram[0]) if histogram else 0
+
+    def to_prometheus(self) -> str:
+        """
+        Renders collected metrics in Prometheus text exposition format.
+
+        :return (str): Metrics text, empty when metrics are disabled.
+        """
+
+        if not self.enabled:
+            return ""
+
+        with self._lock:
+            histograms = {stage: (list(counts), total,) for stage, (counts, total) in self._histograms.items()}
+            counters = dict(self._counters)
+
+        name = f"{METRIC_NAME_PREFIX}stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Duration of request handling stages.",
+            f"# TYPE {name} histogram"
+        ]
+        for stage, (counts, total) in sorted(histograms.items()):
+            cumulative_count = 0
+            for upper_bound, count in zip([*map(repr, self._buckets), "+Inf"], counts):
+                cumulative_count += count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{upper_bound}"}} {cumulative_count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {cumulative_count}')
+
+        for counter, description in COUNTERS.items():
+            name = f"{METRIC_NAME_PREFIX}{counter}_total"
+            lines.extend([f"# HELP {name} {description}", f"# TYPE {name} counter", f"{name} {counters[counter]}"])
+        return "\n".join(lines) + "\n"
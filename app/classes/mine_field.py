@@ -1,20 +1,61 @@
-from typing import Dict, List, Union
+import random
+import struct
+from typing import Dict, List, Optional, Tuple, Union
 
-from tabulate import tabulate
+import numpy as np
 
 import config
 from app.classes.game_state import GameState
-from app.field_utils import get_distance, generate_random_coordinates
+from app.field_utils import get_flood_region, get_max_distance, get_mine_distance_map, generate_random_cell_indices
+
+# Cells are stored as small integers: positive values are distances to the nearest mine, negative ones are codes below.
+UNKNOWN_CELL_CODE = -1
+EMPTY_CELL_CODE = -2
+MINE_CELL_CODE = -3
+
+# Binary format header: magic, format version, horizontal size, vertical size,
+# discoverable radius, mines, opened cells, game state index and board version (since format version 2).
+# It is followed by mines and discovered cells bitsets.
+BINARY_FORMAT_MAGIC = b"MFLD"
+BINARY_FORMAT_VERSION = 2
+BINARY_FORMAT_PREFIX = struct.Struct(">4sB")
+BINARY_FORMAT_HEADERS = {
+    1: struct.Struct(">4sBQQQQQB"),
+    2: struct.Struct(">4sBQQQQQBQ")
+}
+BINARY_FORMAT_HEADER = BINARY_FORMAT_HEADERS[BINARY_FORMAT_VERSION]
+
+# Separators of the run-length encoded rows, see `MineField.to_rows()`.
+ROW_CELLS_SEPARATOR = ","
+ROW_RUN_SEPARATOR = "*"
+GAME_STATES = [game_state.value for game_state in GameState]
 
 
 class MineField:
+    # Lots of mine fields are kept in memory by caches and pools, slots save a dictionary per each of them.
+    __slots__ = (
+        "_game_state",
+        "_version",
+        "_unsaved_moves",
+        "_discoverable_radius",
+        "_opened_cells",
+        "_horizontal_field_size",
+        "_vertical_field_size",
+        "_mines",
+        "_mine_field",
+        "_mines_cells",
+        "_mine_distances",
+        "_unknown_cells"
+    )
+
     def __init__(
         self,
         horizontal_size: int,
         vertical_size: int,
         mines: int,
         discoverable_radius: int,
-        opened_cells: int
+        opened_cells: int,
+        seed: Optional[int] = None
     ):
         """
         Initializes mine field with the given parameters.
@@ -24,6 +65,8 @@ class MineField:
         :param (int) mines: Number of mines to set on the field. Can be any positive number.
         :param (int) discoverable_radius:  Distance from the current cell where nearest mine cells are looked for.
         :param (int) opened_cells: Cells to open on the mine field before game starts.
+        :param (Optional[int]) seed: Seed of the random generator placing mines and opened cells,
+            same seeds give same mine fields. Module level `random` generator is used when not set.
         """
 
         self._validate_init(
@@ -34,9 +77,8 @@ class MineField:
             opened_cells=opened_cells
         )
         self._game_state = GameState.InProgress.value
-        self._empty_cell = config.EMPTY_CELL
-        self._mine_cell = config.MINE_CELL
-        self._unknown_cell = config.UNKNOWN_CELL
+        self._version = 0
+        self._unsaved_moves = None
 
         self._discoverable_radius = discoverable_radius
         self._opened_cells = opened_cells
@@ -44,11 +86,12 @@ class MineField:
         self._vertical_field_size = vertical_size
 
         self._mines = mines
-        self._mines_cells_coordinates = set()
-        self._mine_field = self._generate_mine_field()
+        self._mine_field, self._mines_cells = self._generate_mine_field(
+            random.Random(seed) if seed is not None else random
+        )
         self._update_mine_field()
 
-    def discover_cell(self, x: int, y: int) -> None:
+    def discover_cell(self, x: int, y: int, flood: bool = False) -> List[Tuple[int, int]]:
         """
         Discovers cell by the given coordinates.
 
@@ -68,33 +111,164 @@ class MineField:
 
         :param (int) x: Cell x-axis coordinate to discover.
         :param (int) y: Cell y-axis coordinate to discover.
-        :return (None):
+        :param (bool) flood: Whether to discover all the cells known to be safe once the discovered cell is empty,
+            see `get_flood_region()`. Whole region is discovered by a single move.
+        :return (List[Tuple[int, int]]): Coordinates of cells changed by the discovery.
+            Board version is increased only when there are changed cells.
         """
 
         self._validate_discovery(x, y)
-        if (x, y,) in self._mines_cells_coordinates:
+        if self._mines_cells[y, x]:
             self._game_state = GameState.Lost.value
-            for x, y in self._mines_cells_coordinates:
-                self._mine_field[y][x] = self._mine_cell
+            self._mine_field[self._mines_cells] = MINE_CELL_CODE
+            self._unknown_cells -= self._mines
+            self._version += 1
+            self._record_move(x, y, flood)
+            ys, xs = np.nonzero(self._mines_cells)
+            return list(zip(xs.tolist(), ys.tolist()))
+
+        if self._mine_field[y, x] != UNKNOWN_CELL_CODE:
+            return []
+        shortest_mine_distance = self._mine_distances[y, x]
+        if flood and not shortest_mine_distance:
+            changed_cells = self._discover_flood_region(x, y)
         else:
-            self._mine_field[y][x] = self._empty_cell
-        self._update_mine_field()
+            self._mine_field[y, x] = shortest_mine_distance if shortest_mine_distance else EMPTY_CELL_CODE
+            changed_cells = [(x, y,)]
+        self._unknown_cells -= len(changed_cells)
+        self._version += 1
+        self._record_move(x, y, flood)
+        self._check_game_completion()
+        return changed_cells
+
+    def discover_cells(
+        self, cells_coordinates: List[Tuple[int, int]], flood: bool = False
+    ) -> List[List[Tuple[int, int]]]:
+        """
+        Discovers cells one by one in the given order, stopping once the game is over.
+        All coordinates are validated before the first discovery, so either no cells or all of them are discovered
+        (apart from the ones left after the end of the game).
+
+        :param (List[Tuple[int, int]]) cells_coordinates: Coordinates of cells to discover.
+        :param (bool) flood: Whether empty cells make safe cells around them discovered, see `discover_cell()`.
+        :return (List[List[Tuple[int, int]]]): Coordinates of cells changed by each discovery made.
+        """
+
+        for index, (x, y) in enumerate(cells_coordinates):
+            try:
+                self._validate_discovery(x, y)
+            except ValueError as error:
+                raise ValueError(f"move {index}: {error}")
+
+        changed_cells = []
+        for x, y in cells_coordinates:
+            if self._game_state != GameState.InProgress.value:
+                break
+            changed_cells.append(self.discover_cell(x, y, flood))
+        return changed_cells
 
     def get_game_state(self) -> str:
         return self._game_state
 
+    def get_mines(self) -> int:
+        return self._mines
+
+    def get_discoverable_radius(self) -> int:
+        return self._discoverable_radius
+
+    def get_opened_cells(self) -> int:
+        return self._opened_cells
+
+    def get_size(self) -> Tuple[int, int]:
+        """
+        :return (Tuple[int, int]): Horizontal and vertical size of the mine field.
+        """
+
+        return self._horizontal_field_size, self._vertical_field_size
+
+    def get_version(self) -> int:
+        """
+        Board version is increased by every discovery which changes any cell, so clients can tell whether
+        the board they have seen is still up to date.
+
+        :return (int): Board version.
+        """
+
+        return self._version
+
+    def record_moves(self) -> None:
+        """
+        Starts recording discoveries which change the board, moves recorded before are dropped.
+        Used by storages keeping move logs (see `MoveLogStorage`) once the mine field is read or saved,
+        other mine fields do not record moves at all.
+        """
+
+        self._unsaved_moves = []
+
+    def get_unsaved_moves(self) -> List[Tuple[int, int, bool]]:
+        """
+        Returns discoveries recorded since the last `record_moves()` call, each of them increased board version by 1.
+
+        :return (List[Tuple[int, int, bool]]): Coordinates of discovered cells along with flood flags
+            (see `discover_cell()`) in the order of discoveries, empty when moves are not recorded.
+        """
+
+        return self._unsaved_moves or []
+
     def get_field_state(self) -> List[List[Union[str, int]]]:
-        return self._mine_field
+        return get_field_state(self._mine_field)
+
+    def get_cell(self, x: int, y: int) -> Union[str, int]:
+        """
+        Returns state of a single cell without building the whole field state.
+
+        :param (int) x: Cell x-axis coordinate.
+        :param (int) y: Cell y-axis coordinate.
+        :return (Union[str, int]): Distance to the nearest mine or one of the unknown, empty or mine cell values.
+        """
+
+        return get_cell_value(int(self._mine_field[y, x]))
+
+    def get_cells(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Returns cell codes of the region, see `encode_rows()` to turn them into compact rows.
+
+        :param (int) x0: X-axis coordinate of the first region column.
+        :param (int) y0: Y-axis coordinate of the first region row.
+        :param (int) x1: X-axis coordinate of the column after the last region column.
+        :param (int) y1: Y-axis coordinate of the row after the last region row.
+        :return (np.ndarray): Cell codes of the region, they should not be changed.
+        """
+
+        return self._mine_field[y0:y1, x0:x1]
+
+    def get_unknown_cells_coordinates(self) -> List[Tuple[int, int]]:
+        ys, xs = np.nonzero(self._mine_field == UNKNOWN_CELL_CODE)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def get_cells_layout(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns arrays the mine field is made of, they should not be changed.
+
+        :return (Tuple[np.ndarray, np.ndarray, np.ndarray]): Mine cells map, discovered cells map
+            and nearest mine distances map (0 when there is no mine inside the discoverable radius).
+        """
+
+        discovered_cells = (self._mine_field != UNKNOWN_CELL_CODE) & (self._mine_field != MINE_CELL_CODE)
+        return self._mines_cells, discovered_cells, self._mine_distances
 
     def to_dict(self) -> Dict:
-        dict_representation = {}
-        for y_index, y in enumerate(self._mine_field):
-            for x_index, cell in enumerate(self._mine_field[y_index]):
-                dict_representation.update({
-                    f"x_{x_index}^y_{y_index}": cell
-                })
+        return field_state_to_dict(self.get_field_state())
 
-        return dict_representation
+    def to_rows(self) -> List[str]:
+        """
+        Encodes field state into compact rows, which are much cheaper to build and transfer than `to_dict()`.
+        See `encode_rows()` for the format.
+
+        :return (List[str]): Encoded rows, from top to the bottom.
+        """
+
+        return encode_rows(self._mine_field)
 
     def set_pre_defined_field_map(self, mine_field_map: List[List[Union[str, int]]]) -> None:
         """
@@ -105,63 +279,139 @@ class MineField:
         :return (None):
         """
 
-        mine_cells_coordinates = set()
-        mines = 0
-
-        self._mine_field = mine_field_map
-        for y, row in enumerate(mine_field_map):
-            for x, cell in enumerate(row):
-                if cell == config.MINE_CELL:
-                    mine_cells_coordinates.add((x, y,))
-                    self._mine_field[y][x] = config.UNKNOWN_CELL
-                    mines += 1
-        self._mines_cells_coordinates = mine_cells_coordinates
         self._horizontal_field_size = len(mine_field_map[0])
         self._vertical_field_size = len(mine_field_map)
-        self._mines = mines
+        cells = np.array(mine_field_map, dtype=object)
+        self._mines_cells = cells == config.MINE_CELL
+        self._mine_field = np.full(cells.shape, EMPTY_CELL_CODE, dtype=self._get_cell_dtype())
+        self._mine_field[(cells == config.UNKNOWN_CELL) | self._mines_cells] = UNKNOWN_CELL_CODE
+        self._mines = int(np.count_nonzero(self._mines_cells))
         self._update_mine_field()
 
-    def _generate_mine_field(self) -> List[List[Union[str, int]]]:
-        empty_cell_coordinates = set()
-        mine_field = [
-            [self._unknown_cell for _ in range(self._horizontal_field_size)] for _ in range(self._vertical_field_size)
-        ]
+    def to_bytes(self) -> bytes:
+        """
+        Encodes mine field into compact binary format.
+        Only the layout is stored: mines and discovered cells are packed into bitsets,
+        distances are restored on decoding.
 
-        while len(self._mines_cells_coordinates) < self._mines:
-            self._mines_cells_coordinates.add(
-                generate_random_coordinates(self._horizontal_field_size, self._vertical_field_size)
-            )
+        :return (bytes): Encoded mine field.
+        """
+
+        _, discovered_cells, _ = self.get_cells_layout()
+        header = BINARY_FORMAT_HEADER.pack(
+            BINARY_FORMAT_MAGIC,
+            BINARY_FORMAT_VERSION,
+            self._horizontal_field_size,
+            self._vertical_field_size,
+            self._discoverable_radius,
+            self._mines,
+            self._opened_cells,
+            GAME_STATES.index(self._game_state),
+            self._version
+        )
+        return header + np.packbits(self._mines_cells).tobytes() + np.packbits(discovered_cells).tobytes()
 
-        while len(empty_cell_coordinates) < self._opened_cells:
-            x, y = generate_random_coordinates(self._horizontal_field_size, self._vertical_field_size)
-            if (x, y,) not in self._mines_cells_coordinates:
-                empty_cell_coordinates.add((x, y,))
-                mine_field[y][x] = self._empty_cell
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MineField":
+        """
+        Decodes mine field encoded by `to_bytes()`.
+
+        :param (bytes) data: Encoded mine field.
+        :return (MineField): Decoded mine field.
+        """
 
+        if len(data) < BINARY_FORMAT_PREFIX.size or not data.startswith(BINARY_FORMAT_MAGIC):
+            raise ValueError("data is not an encoded mine field")
+        _, version = BINARY_FORMAT_PREFIX.unpack_from(data)
+        if version not in BINARY_FORMAT_HEADERS:
+            raise ValueError(f"mine field binary format version {version} is not supported")
+        header = BINARY_FORMAT_HEADERS[version]
+        if len(data) < header.size:
+            raise ValueError("data is not an encoded mine field")
+        (
+            _, _, horizontal_size, vertical_size, discoverable_radius, mines, opened_cells, game_state_index,
+            *board_version
+        ) = header.unpack_from(data)
+
+        shape = (vertical_size, horizontal_size,)
+        cells = vertical_size * horizontal_size
+        bitset_size = (cells + 7) // 8
+        mines_bitset_offset = header.size
+        discovered_bitset_offset = mines_bitset_offset + bitset_size
+
+        mine_field = cls.__new__(cls)
+        mine_field._game_state = GAME_STATES[game_state_index]
+        # Board versions are not kept by format version 1.
+        mine_field._version = board_version[0] if board_version else 0
+        mine_field._unsaved_moves = None
+        mine_field._discoverable_radius = discoverable_radius
+        mine_field._opened_cells = opened_cells
+        mine_field._horizontal_field_size = horizontal_size
+        mine_field._vertical_field_size = vertical_size
+        mine_field._mines = mines
+        mine_field._mines_cells = unpack_bitset(data, mines_bitset_offset, cells).reshape(shape)
+        discovered_cells = unpack_bitset(data, discovered_bitset_offset, cells).reshape(shape)
+        mine_field._mine_field = np.full(shape, UNKNOWN_CELL_CODE, dtype=mine_field._get_cell_dtype())
+        mine_field._mine_field[discovered_cells] = EMPTY_CELL_CODE
+        if mine_field._game_state == GameState.Lost.value:
+            mine_field._mine_field[mine_field._mines_cells] = MINE_CELL_CODE
+        mine_field._update_mine_field()
         return mine_field
 
+    def _generate_mine_field(self, rng: random.Random) -> Tuple[np.ndarray, np.ndarray]:
+        # Mines and opened cells are sampled together, so they never overlap.
+        cells_indices = generate_random_cell_indices(
+            self._horizontal_field_size * self._vertical_field_size, self._mines + self._opened_cells, rng
+        )
+
+        shape = (self._vertical_field_size, self._horizontal_field_size,)
+        mine_field = np.full(shape, UNKNOWN_CELL_CODE, dtype=self._get_cell_dtype())
+        mines_cells = np.zeros(shape, dtype=bool)
+        mines_cells.flat[cells_indices[:self._mines]] = True
+        mine_field.flat[cells_indices[self._mines:]] = EMPTY_CELL_CODE
+        return mine_field, mines_cells
+
     def _update_mine_field(self) -> None:
-        undiscovered_mines = 0
-        for x in range(self._horizontal_field_size):
-            for y in range(self._vertical_field_size):
-                if self._mine_field[y][x] == self._unknown_cell:
-                    undiscovered_mines += 1
-                elif self._mine_field[y][x] == self._empty_cell:
-                    shortest_mine_distance = self._get_shortest_mine_distance(x, y)
-                    if shortest_mine_distance:
-                        self._mine_field[y][x] = shortest_mine_distance
-
-        if self._mines == undiscovered_mines and self._game_state == GameState.InProgress.value:
+        """
+        Builds nearest mine distances map and fills distances of all opened cells.
+        Called only once the field layout is set, single discoveries are handled inside `discover_cell()`.
+        """
+
+        self._mine_distances = get_mine_distance_map(self._mines_cells, self._discoverable_radius).astype(
+            self._mine_field.dtype
+        )
+        distance_cells = (self._mine_field == EMPTY_CELL_CODE) & (self._mine_distances > 0)
+        self._mine_field[distance_cells] = self._mine_distances[distance_cells]
+        self._unknown_cells = int(np.count_nonzero(self._mine_field == UNKNOWN_CELL_CODE))
+        self._check_game_completion()
+
+    def _discover_flood_region(self, x: int, y: int) -> List[Tuple[int, int]]:
+        xs, ys = get_flood_region(x, y, self._mines_cells.shape, self._discoverable_radius, self._is_empty)
+        unknown_cells = self._mine_field[ys, xs] == UNKNOWN_CELL_CODE
+        xs, ys = xs[unknown_cells], ys[unknown_cells]
+        mine_distances = self._mine_distances[ys, xs]
+        self._mine_field[ys, xs] = np.where(mine_distances > 0, mine_distances, EMPTY_CELL_CODE)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def _is_empty(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        # Mine cells have 0 distance as well.
+        return (self._mine_distances[ys, xs] == 0) & ~self._mines_cells[ys, xs]
+
+    def _record_move(self, x: int, y: int, flood: bool) -> None:
+        if self._unsaved_moves is not None:
+            self._unsaved_moves.append((x, y, flood,))
+
+    def _check_game_completion(self) -> None:
+        # Every cell which is left unknown is a mine, so there is nothing left to discover.
+        if self._mines == self._unknown_cells and self._game_state == GameState.InProgress.value:
             self._game_state = GameState.Won.value
 
-    def _get_shortest_mine_distance(self, x: int, y: int) -> int:
-        nearest_distance = None
-        for coordinate in self._mines_cells_coordinates:
-            distance = get_distance((x, y,), coordinate)
-            if nearest_distance is None or distance < nearest_distance:
-                if distance <= self._discoverable_radius:
-                    nearest_distance = distance
-        return nearest_distance
+    def _get_cell_dtype(self) -> type:
+        # Distances are never bigger than the field diagonal, so in most cases 2 bytes per cell are enough.
+        max_distance = get_max_distance(self._horizontal_field_size, self._vertical_field_size)
+        if min(self._discoverable_radius, max_distance) <= np.iinfo(np.int16).max:
+            return np.int16
+        return np.int32
 
     def _validate_discovery(self, x, y) -> None:
         if not (x in range(self._horizontal_field_size) and y in range(self._vertical_field_size)):
@@ -189,8 +439,41 @@ class MineField:
         if discoverable_radius < 0:
             raise ValueError("discoverable radius can not be negative")
 
+    def __getstate__(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: Dict) -> None:
+        # Mine fields pickled before switching to arrays keep cells in lists and mines in a set of coordinates.
+        if "_mines_cells_coordinates" not in state:
+            # Older mine fields were pickled without versions and unsaved moves, but with cell constants
+            # (like `_empty_cell`), which are not kept anymore.
+            state = {"_version": 0, "_unsaved_moves": None, **state}
+            for name in self.__slots__:
+                setattr(self, name, state[name])
+            return
+
+        self._game_state = state["_game_state"]
+        self._version = 0
+        self._unsaved_moves = None
+        self._discoverable_radius = state["_discoverable_radius"]
+        self._opened_cells = state["_opened_cells"]
+        self._horizontal_field_size = state["_horizontal_field_size"]
+        self._vertical_field_size = state["_vertical_field_size"]
+        self._mines = state["_mines"]
+        cells = np.array(state["_mine_field"], dtype=object)
+        self._mines_cells = np.zeros(cells.shape, dtype=bool)
+        for x, y in state["_mines_cells_coordinates"]:
+            self._mines_cells[y, x] = True
+        self._mine_field = np.full(cells.shape, EMPTY_CELL_CODE, dtype=self._get_cell_dtype())
+        self._mine_field[cells == config.UNKNOWN_CELL] = UNKNOWN_CELL_CODE
+        self._mine_field[cells == config.MINE_CELL] = MINE_CELL_CODE
+        self._update_mine_field()
+
     def __str__(self) -> str:
-        return tabulate(self._mine_field)
+        # Mine fields are printed only by scripts, so servers and solvers do not spend time importing tabulate.
+        from tabulate import tabulate
+
+        return tabulate(self.get_field_state())
 
     def __repr__(self) -> str:
         return "Grid(" \
@@ -199,3 +482,68 @@ class MineField:
                f"mines={self._mines}, " \
                f"discoverable_radius={self._discoverable_radius}, " \
                f"opened_cells={self._opened_cells})"
+
+
+def get_cell_value(cell: int) -> Union[str, int]:
+    if cell == UNKNOWN_CELL_CODE:
+        return config.UNKNOWN_CELL
+    if cell == EMPTY_CELL_CODE:
+        return config.EMPTY_CELL
+    if cell == MINE_CELL_CODE:
+        return config.MINE_CELL
+    return cell
+
+
+def get_field_state(cells: np.ndarray) -> List[List[Union[str, int]]]:
+    """
+    Converts cell codes into cell values, see `MineField.get_field_state()`.
+
+    :param (np.ndarray) cells: Cell codes.
+    :return (List[List[Union[str, int]]]): Cell values, row by row.
+    """
+
+    field_state = cells.astype(object)
+    field_state[cells == UNKNOWN_CELL_CODE] = config.UNKNOWN_CELL
+    field_state[cells == EMPTY_CELL_CODE] = config.EMPTY_CELL
+    field_state[cells == MINE_CELL_CODE] = config.MINE_CELL
+    return field_state.tolist()
+
+
+def field_state_to_dict(field_state: List[List[Union[str, int]]]) -> Dict:
+    dict_representation = {}
+    for y_index, row in enumerate(field_state):
+        for x_index, cell in enumerate(row):
+            dict_representation.update({
+                f"x_{x_index}^y_{y_index}": cell
+            })
+
+    return dict_representation
+
+
+def encode_rows(cells: np.ndarray) -> List[str]:
+    """
+    Encodes cell codes into compact rows.
+
+    Each row is a string of cell values separated by ",".
+    Runs of equal cells are written once along with the run length after "*".
+    For example, row ["?", "?", "?", 2, " "] is encoded as "?*3,2, ".
+
+    :param (np.ndarray) cells: Cell codes.
+    :return (List[str]): Encoded rows, from top to the bottom.
+    """
+
+    rows = []
+    for row in cells:
+        run_starts = np.flatnonzero(np.diff(row, prepend=row[0] - 1))
+        run_lengths = np.diff(run_starts, append=len(row))
+        runs = []
+        for cell, run_length in zip(row[run_starts].tolist(), run_lengths.tolist()):
+            value = str(get_cell_value(cell))
+            runs.append(value if run_length == 1 else f"{value}{ROW_RUN_SEPARATOR}{run_length}")
+        rows.append(ROW_CELLS_SEPARATOR.join(runs))
+    return rows
+
+
+def unpack_bitset(data: bytes, offset: int, bits: int) -> np.ndarray:
+    bitset = np.frombuffer(data, dtype=np.uint8, count=(bits + 7) // 8, offset=offset)
+    return np.unpackbits(bitset, count=bits).astype(bool)
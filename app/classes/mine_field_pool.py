@@ -0,0 +1,89 @@
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from app.classes.mine_field import MineField
+
+
+class MineFieldPool:
+    """
+    Keeps mine fields with frequently used settings generated ahead of time,
+    so creating a new game with these settings takes a mine field from the pool instead of generating it.
+
+    Pool is refilled in background once mine fields are taken from it.
+    Mine fields with any other settings are generated right away.
+    """
+
+    def __init__(self, settings: Optional[List[Dict]] = None, size: int = 100):
+        """
+        :param (Optional[List[Dict]]) settings: Settings of the pooled mine fields, each one with `MineField` arguments.
+        :param (int) size: Number of mine fields to keep generated for each of the settings.
+        """
+
+        for mine_field_settings in settings or []:
+            MineField._validate_init(**mine_field_settings)
+
+        self._size = size
+        self._mine_fields = {self._get_key(mine_field_settings): deque() for mine_field_settings in settings or []}
+        self._refill_event = threading.Event()
+        self._refill_thread = None
+        if self._mine_fields and size > 0:
+            self._refill_thread = threading.Thread(target=self._refill_periodically, daemon=True)
+            self._refill_thread.start()
+
+    def create(
+        self,
+        horizontal_size: int,
+        vertical_size: int,
+        mines: int,
+        discoverable_radius: int,
+        opened_cells: int
+    ) -> MineField:
+        """
+        Takes mine field with the given settings from the pool or generates it when the pool is empty.
+        Arguments are the same as the ones of `MineField`.
+
+        :return (MineField): New mine field.
+        """
+
+        settings = {
+            "horizontal_size": horizontal_size,
+            "vertical_size": vertical_size,
+            "mines": mines,
+            "discoverable_radius": discoverable_radius,
+            "opened_cells": opened_cells
+        }
+        mine_fields = self._mine_fields.get(self._get_key(settings))
+        if mine_fields is not None:
+            try:
+                return mine_fields.popleft()
+            except IndexError:
+                pass
+            finally:
+                # Refill is requested once the mine field is taken, so the refill never misses it.
+                self._refill_event.set()
+        return MineField(**settings)
+
+    def get_sizes(self) -> Dict[Tuple, int]:
+        return {key: len(mine_fields) for key, mine_fields in self._mine_fields.items()}
+
+    def fill(self) -> None:
+        """
+        Generates mine fields until pool of each of the settings is full.
+        """
+
+        for key, mine_fields in self._mine_fields.items():
+            while len(mine_fields) < self._size:
+                mine_fields.append(MineField(**dict(key)))
+
+    def _refill_periodically(self) -> None:
+        self.fill()
+        while True:
+            self._refill_event.wait()
+            # Event is cleared before refilling, so mine fields taken during the refill request another one.
+            self._refill_event.clear()
+            self.fill()
+
+    @staticmethod
+    def _get_key(settings: Dict) -> Tuple:
+        return tuple(sorted(settings.items()))
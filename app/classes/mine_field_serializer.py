@@ -0,0 +1,37 @@
+import pickle
+from typing import Union
+
+from app.metrics import metrics
+from libs.serializer import Serializer
+from app.classes.mine_field import MineField, BINARY_FORMAT_MAGIC
+from app.classes.mine_field_tile import MineFieldTile, TILE_FORMAT_MAGIC
+from app.classes.tiled_mine_field import TiledMineField, TILED_FORMAT_MAGIC
+
+SerializableObject = Union[MineField, TiledMineField, MineFieldTile]
+
+
+class MineFieldSerializer:
+    """
+    Serializes mine fields into compact binary format, see `MineField.to_bytes()`.
+    Tiled mine fields and their tiles (see `TiledStorage`) are told apart by their own format magic.
+    Serialized sizes are counted as storage traffic by the metrics.
+    Mine fields stored before the binary format was introduced (pickled and encoded by `Serializer`) are still readable.
+    """
+
+    def __init__(self):
+        self._legacy_serializer = Serializer()
+
+    def serialize(self, mine_field: SerializableObject) -> bytes:
+        serialized_mine_field = mine_field.to_bytes()
+        metrics.increment("storage_written_bytes", len(serialized_mine_field))
+        return serialized_mine_field
+
+    def deserialize(self, serialized_mine_field: bytes) -> SerializableObject:
+        metrics.increment("storage_read_bytes", len(serialized_mine_field))
+        if serialized_mine_field.startswith(BINARY_FORMAT_MAGIC):
+            return MineField.from_bytes(serialized_mine_field)
+        if serialized_mine_field.startswith(TILED_FORMAT_MAGIC):
+            return TiledMineField.from_bytes(serialized_mine_field)
+        if serialized_mine_field.startswith(TILE_FORMAT_MAGIC):
+            return MineFieldTile.from_bytes(serialized_mine_field)
+        return pickle.loads(self._legacy_serializer.deserialize(serialized_mine_field.decode()))
@@ -0,0 +1,123 @@
+import struct
+from typing import List, Tuple
+
+import numpy as np
+
+from app.classes.game_state import GameState
+from app.classes.mine_field import UNKNOWN_CELL_CODE, EMPTY_CELL_CODE, MINE_CELL_CODE, unpack_bitset
+
+# Tile binary format header: magic, format version, horizontal size, vertical size and size of a distance in bytes.
+# It is followed by mines and discovered cells bitsets and nearest mine distances.
+TILE_FORMAT_MAGIC = b"MFTL"
+TILE_FORMAT_VERSION = 1
+TILE_FORMAT_HEADER = struct.Struct(">4sBIIB")
+DISTANCE_DTYPES = {np.dtype(dtype).itemsize: np.dtype(dtype).newbyteorder(">") for dtype in (np.int16, np.int32,)}
+
+
+class MineFieldTile:
+    """
+    Rectangular part of the tiled mine field, see `TiledMineField`.
+    Nearest mine distances are kept along with the cells, since mines they are measured to can be located
+    inside other tiles.
+    """
+
+    def __init__(self, mines_cells: np.ndarray, discovered_cells: np.ndarray, mine_distances: np.ndarray):
+        """
+        :param (np.ndarray) mines_cells: Mine cells map of the tile.
+        :param (np.ndarray) discovered_cells: Discovered cells map of the tile.
+        :param (np.ndarray) mine_distances: Nearest mine distances of the tile cells.
+        """
+
+        self._mines_cells = mines_cells
+        self._discovered_cells = discovered_cells
+        self._mine_distances = mine_distances
+
+    def is_mine(self, x: int, y: int) -> bool:
+        return bool(self._mines_cells[y, x])
+
+    def discover_cell(self, x: int, y: int) -> bool:
+        """
+        :param (int) x: Cell x-axis coordinate inside the tile.
+        :param (int) y: Cell y-axis coordinate inside the tile.
+        :return (bool): Whether the cell was unknown before.
+        """
+
+        if self._discovered_cells[y, x]:
+            return False
+        self._discovered_cells[y, x] = True
+        return True
+
+    def discover_cells(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        :param (np.ndarray) xs: X-axis coordinates of cells inside the tile.
+        :param (np.ndarray) ys: Y-axis coordinates of cells inside the tile.
+        :return (np.ndarray): Which of the cells were unknown before.
+        """
+
+        unknown_cells = ~self._discovered_cells[ys, xs]
+        self._discovered_cells[ys, xs] = True
+        return unknown_cells
+
+    def is_empty(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        """
+        :param (np.ndarray) xs: X-axis coordinates of cells inside the tile.
+        :param (np.ndarray) ys: Y-axis coordinates of cells inside the tile.
+        :return (np.ndarray): Which of the cells have no mines inside the discoverable radius.
+        """
+
+        return (self._mine_distances[ys, xs] == 0) & ~self._mines_cells[ys, xs]
+
+    def get_cells(self, reveal_mines: bool) -> np.ndarray:
+        """
+        Builds cell codes of the tile, the same ones `MineField` keeps.
+
+        :param (bool) reveal_mines: Whether mine cells are shown (once the game is lost).
+        :return (np.ndarray): Cell codes.
+        """
+
+        cells = np.where(self._mine_distances > 0, self._mine_distances, EMPTY_CELL_CODE).astype(
+            self._mine_distances.dtype.newbyteorder("=")
+        )
+        cells[~self._discovered_cells] = UNKNOWN_CELL_CODE
+        if reveal_mines:
+            cells[self._mines_cells] = MINE_CELL_CODE
+        return cells
+
+    def get_mines_coordinates(self) -> List[Tuple[int, int]]:
+        ys, xs = np.nonzero(self._mines_cells)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def get_layout(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self._mines_cells, self._discovered_cells
+
+    def get_game_state(self) -> str:
+        # Tiles are not rewritten once the game is over, storages expire them along with their mine fields instead.
+        return GameState.InProgress.value
+
+    def to_bytes(self) -> bytes:
+        vertical_size, horizontal_size = self._mines_cells.shape
+        distance_dtype = DISTANCE_DTYPES[self._mine_distances.dtype.itemsize]
+        header = TILE_FORMAT_HEADER.pack(
+            TILE_FORMAT_MAGIC, TILE_FORMAT_VERSION, horizontal_size, vertical_size, distance_dtype.itemsize
+        )
+        return header + np.packbits(self._mines_cells).tobytes() + np.packbits(self._discovered_cells).tobytes() + \
+            self._mine_distances.astype(distance_dtype).tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "MineFieldTile":
+        if len(data) < TILE_FORMAT_HEADER.size or not data.startswith(TILE_FORMAT_MAGIC):
+            raise ValueError("data is not an encoded mine field tile")
+        _, version, horizontal_size, vertical_size, distance_size = TILE_FORMAT_HEADER.unpack_from(data)
+        if version != TILE_FORMAT_VERSION:
+            raise ValueError(f"mine field tile binary format version {version} is not supported")
+
+        shape = (vertical_size, horizontal_size,)
+        cells = vertical_size * horizontal_size
+        bitset_size = (cells + 7) // 8
+        offset = TILE_FORMAT_HEADER.size
+        mines_cells = unpack_bitset(data, offset, cells).reshape(shape)
+        discovered_cells = unpack_bitset(data, offset + bitset_size, cells).reshape(shape)
+        mine_distances = np.frombuffer(
+            data, dtype=DISTANCE_DTYPES[distance_size], count=cells, offset=offset + 2 * bitset_size
+        ).reshape(shape)
+        return cls(mines_cells, discovered_cells, mine_distances)
@@ -0,0 +1,192 @@
+import os
+import struct
+import threading
+from contextlib import contextmanager, suppress
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # File locks are not available on Windows.
+    fcntl = None
+
+import config
+from app.classes.mine_field import MineField
+from app.classes.abstract.storage import AbstractStorage
+
+# Move log binary format: header (magic, format version and board version of the initial layout)
+# followed by (x, y) records of discoveries, each of them increased board version by 1.
+# Flood discoveries (see `MineField.discover_cell()`) have the highest bit of x set.
+LOG_FORMAT_MAGIC = b"MLOG"
+LOG_FORMAT_VERSION = 1
+LOG_HEADER = struct.Struct(">4sBQ")
+LOG_RECORD = struct.Struct(">II")
+LOG_FLOOD_FLAG = 1 << 31
+LOG_FILE_EXTENSION = ".log"
+LAYOUT_ID_SUFFIX = ".layout"
+
+_log_lock = threading.Lock()
+
+
+class MoveLogStorage(AbstractStorage):
+    """
+    Keeps an append-only log of moves of each game along with periodic snapshots of its mine field.
+
+    A move appends a small record to the log of the game, the whole mine field is stored into another storage
+    only once every `snapshot_interval` moves. Reading a game takes its latest snapshot and replays moves made after it.
+    Initial layout of the game (mines and opened cells) is kept as well, so any game can be replayed from
+    the very beginning, see `get_replay()`.
+
+    Moves are taken from `MineField.get_unsaved_moves()`, mine fields start recording them once they are read
+    or stored by this storage (see `MineField.record_moves()`). When they do not continue the log
+    (e.g. a mine field set up by other means is stored), a new log is started with the mine field as its layout.
+    Logs are locked while they are changed, so compare-and-set is safe between processes as well.
+    """
+
+    def __init__(self, storage: AbstractStorage, snapshot_interval: int = 100, log_path: Optional[str] = None):
+        """
+        :param (AbstractStorage) storage: Storage keeping snapshots and initial layouts of games.
+        :param (int) snapshot_interval: Number of moves between snapshots.
+        :param (Optional[str]) log_path: Folder to keep logs in, defaults to the one set inside `config`.
+        """
+
+        if snapshot_interval < 1:
+            raise ValueError("snapshot interval should be positive")
+
+        self._storage = storage
+        self._snapshot_interval = snapshot_interval
+        self._log_path = log_path or f"{os.getcwd()}/{config.MOVE_LOG_FOLDER_NAME}"
+        os.makedirs(self._log_path, exist_ok=True)
+
+    def get(self, object_id: str) -> Any:
+        mine_field = self._storage.get(object_id)
+        if mine_field is None:
+            return None
+
+        with suppress(FileNotFoundError):
+            with open(self._get_log_file_path(object_id), "rb") as log_file:
+                base_version, log_version = self._read_log_versions(log_file)
+                version = mine_field.get_version()
+                # Games stored before the log was started are returned as they are.
+                if base_version is not None and base_version <= version <= log_version:
+                    log_file.seek(LOG_HEADER.size + (version - base_version) * LOG_RECORD.size)
+                    for x, y, flood in self._unpack_moves(log_file.read((log_version - version) * LOG_RECORD.size)):
+                        mine_field.discover_cell(x, y, flood)
+        mine_field.record_moves()
+        return mine_field
+
+    def set(self, object_id: str, data: MineField) -> None:
+        with self._lock_log(object_id) as log_file:
+            self._write(object_id, data, log_file)
+
+    def compare_and_set(self, object_id: str, data: MineField, expected_version: Optional[int]) -> bool:
+        with self._lock_log(object_id) as log_file:
+            _, log_version = self._read_log_versions(log_file)
+            if log_version is None:
+                log_version = self._get_version(self._storage.get(object_id))
+            if log_version != expected_version:
+                return False
+            self._write(object_id, data, log_file)
+            return True
+
+    def get_replay(self, object_id: str) -> Optional[Tuple[MineField, List[Tuple[int, int, bool]]]]:
+        """
+        Returns everything needed to replay the game from the very beginning.
+
+        :param (str) object_id: Game id.
+        :return (Optional[Tuple[MineField, List[Tuple[int, int, bool]]]]): Initial layout of the game
+            and coordinates of all the moves along with flood flags in the order they were made,
+            `None` when the game has no log.
+        """
+
+        layout = self._storage.get(f"{object_id}{LAYOUT_ID_SUFFIX}")
+        if layout is None:
+            return None
+        try:
+            with open(self._get_log_file_path(object_id), "rb") as log_file:
+                log_file.seek(LOG_HEADER.size)
+                return layout, self._unpack_moves(log_file.read())
+        except FileNotFoundError:
+            return None
+
+    def delete_logs(self, object_ids: List[str]) -> None:
+        """
+        Deletes logs of the games, e.g. once the games are expired by the storage of their snapshots
+        (see `SqliteStorage.add_expiration_listener()`). Initial layouts are kept inside that storage
+        and should be deleted along with the games by it.
+
+        :param (List[str]) object_ids: Game ids.
+        """
+
+        for object_id in object_ids:
+            with suppress(FileNotFoundError):
+                os.remove(self._get_log_file_path(object_id))
+
+    def get_logged_ids(self) -> Iterator[str]:
+        for file_name in sorted(os.listdir(self._log_path)):
+            if file_name.endswith(LOG_FILE_EXTENSION):
+                yield file_name[:-len(LOG_FILE_EXTENSION)]
+
+    def _write(self, object_id: str, mine_field: MineField, log_file: BinaryIO) -> None:
+        base_version, log_version = self._read_log_versions(log_file)
+        version = mine_field.get_version()
+        moves = mine_field.get_unsaved_moves()
+        first_move_version = version - len(moves)
+
+        if base_version is not None and first_move_version <= log_version <= version:
+            # Moves already logged (e.g. by the previous write of the same mine field) are skipped.
+            log_file.write(b"".join(
+                LOG_RECORD.pack(x | LOG_FLOOD_FLAG if flood else x, y)
+                for x, y, flood in moves[log_version - first_move_version:]
+            ))
+            log_file.flush()
+            if self._get_snapshot_number(base_version, version) > self._get_snapshot_number(base_version, log_version):
+                self._storage.set(object_id, mine_field)
+        else:
+            log_file.truncate(0)
+            log_file.write(LOG_HEADER.pack(LOG_FORMAT_MAGIC, LOG_FORMAT_VERSION, version))
+            log_file.flush()
+            self._storage.set_many({f"{object_id}{LAYOUT_ID_SUFFIX}": mine_field, object_id: mine_field})
+        mine_field.record_moves()
+
+    @staticmethod
+    def _unpack_moves(records: bytes) -> List[Tuple[int, int, bool]]:
+        return [(x & ~LOG_FLOOD_FLAG, y, bool(x & LOG_FLOOD_FLAG),) for x, y in LOG_RECORD.iter_unpack(records)]
+
+    def _get_snapshot_number(self, base_version: int, version: int) -> int:
+        return (version - base_version) // self._snapshot_interval
+
+    @staticmethod
+    def _read_log_versions(log_file: BinaryIO) -> Tuple[Optional[int], Optional[int]]:
+        """
+        :param (BinaryIO) log_file: Log file.
+        :return (Tuple[Optional[int], Optional[int]]): Board version of the initial layout and the one after
+            the last logged move, `None` when the log is empty.
+        """
+
+        log_file.seek(0)
+        header = log_file.read(LOG_HEADER.size)
+        if len(header) < LOG_HEADER.size:
+            return None, None
+        magic, log_format_version, base_version = LOG_HEADER.unpack(header)
+        if magic != LOG_FORMAT_MAGIC or log_format_version != LOG_FORMAT_VERSION:
+            raise ValueError("file is not a move log")
+        records = (log_file.seek(0, os.SEEK_END) - LOG_HEADER.size) // LOG_RECORD.size
+        return base_version, base_version + records
+
+    @contextmanager
+    def _lock_log(self, object_id: str) -> Iterator[BinaryIO]:
+        # Log is opened for appending, so records are never written over each other.
+        with open(self._get_log_file_path(object_id), "ab+") as log_file:
+            if fcntl is None:
+                with _log_lock:
+                    yield log_file
+                return
+
+            fcntl.flock(log_file, fcntl.LOCK_EX)
+            try:
+                yield log_file
+            finally:
+                fcntl.flock(log_file, fcntl.LOCK_UN)
+
+    def _get_log_file_path(self, object_id: str) -> str:
+        return f"{self._log_path}/{object_id}{LOG_FILE_EXTENSION}"
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SolveJobStatus(Enum):
+    Pending = "pending"
+    Finished = "finished"
+    Failed = "failed"
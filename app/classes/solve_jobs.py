@@ -0,0 +1,132 @@
+import random
+import threading
+from uuid import uuid4
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from app.classes.sweeper import Sweeper
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField
+from app.classes.solve_job_status import SolveJobStatus
+from app.classes.abstract.storage import AbstractStorage
+
+
+class SolveJobs:
+    """
+    Solves stored mine fields with `Sweeper` in background.
+
+    Games are solved on a pool of worker processes, so long solve jobs on big mine fields neither block threads
+    serving requests nor compete with them for the interpreter lock.
+    Solved mine field is written back to the storage once the job is finished,
+    unless the mine field was changed by other requests in the meantime (job fails then).
+
+    Jobs are tracked in memory of the process which created them, so their status is available there only.
+    Only the most recent jobs are kept.
+    """
+
+    def __init__(self, storage: AbstractStorage, workers: int = 2, max_pending_jobs: int = 100, max_jobs: int = 1000):
+        """
+        :param (AbstractStorage) storage: Storage where mine fields are kept.
+        :param (int) workers: Max number of games solved at the same time.
+        :param (int) max_pending_jobs: Max number of jobs waiting for the result, new jobs are rejected above it.
+        :param (int) max_jobs: Max number of jobs to keep, oldest finished jobs are forgotten first.
+        """
+
+        self._storage = storage
+        self._workers = workers
+        self._max_pending_jobs = max_pending_jobs
+        self._max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._pending_jobs = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, mine_field_id: str, mine_field: MineField) -> Optional[str]:
+        """
+        Enqueues the mine field to be solved.
+
+        :param (str) mine_field_id: Id of the stored mine field.
+        :param (MineField) mine_field: Stored mine field.
+        :return (Optional[str]): Job id, `None` when there are too many pending jobs already.
+        """
+
+        if mine_field.get_game_state() != GameState.InProgress.value:
+            raise ValueError(f"only `{GameState.InProgress.value}` mine fields can be solved")
+
+        with self._lock:
+            if self._pending_jobs >= self._max_pending_jobs:
+                return None
+            self._pending_jobs += 1
+
+            job_id = str(uuid4())
+            self._jobs[job_id] = {
+                "jobId": job_id,
+                "mineFieldId": mine_field_id,
+                "status": SolveJobStatus.Pending.value,
+                "moves": None,
+                "gameState": mine_field.get_game_state()
+            }
+            self._forget_old_jobs()
+            if not self._executor:
+                self._executor = ProcessPoolExecutor(self._workers, initializer=random.seed)
+
+        version = mine_field.get_version()
+        future = self._executor.submit(solve_mine_field, mine_field)
+        future.add_done_callback(lambda finished_future: self._finish(job_id, mine_field_id, version, finished_future))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        :param (str) job_id: Job id returned by `submit()`.
+        :return (Optional[Dict]): Job status, number of moves made and game state, `None` for unknown jobs.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown()
+
+    def _finish(self, job_id: str, mine_field_id: str, version: int, future: Future) -> None:
+        status = SolveJobStatus.Failed.value
+        moves, game_state = None, None
+        try:
+            if not future.cancelled() and not future.exception():
+                mine_field, moves = future.result()
+                # Solution is dropped when the mine field was changed by other requests while it was being solved.
+                if self._storage.compare_and_set(mine_field_id, mine_field, version):
+                    game_state = mine_field.get_game_state()
+                    status = SolveJobStatus.Finished.value
+        finally:
+            with self._lock:
+                self._pending_jobs -= 1
+                job = self._jobs.get(job_id)
+                if job:
+                    job["status"] = status
+                    job["moves"] = moves
+                    job["gameState"] = game_state or job["gameState"]
+
+    def _forget_old_jobs(self) -> None:
+        for job_id, job in list(self._jobs.items()):
+            if len(self._jobs) <= self._max_jobs:
+                break
+            if job["status"] != SolveJobStatus.Pending.value:
+                del self._jobs[job_id]
+
+
+def solve_mine_field(mine_field: MineField) -> Tuple[MineField, int]:
+    """
+    Solves mine field inside the worker process.
+
+    :param (MineField) mine_field: Mine field to solve.
+    :return (Tuple[MineField, int]): Solved mine field and number of moves made.
+    """
+
+    sweeper = Sweeper(mine_field)
+    sweeper.sweep()
+    return mine_field, sweeper.get_moves()
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+from time import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import config
+from app.classes.game_state import GameState
+from app.classes.abstract.storage import AbstractStorage
+from app.classes.mine_field_serializer import MineFieldSerializer
+
+CREATE_TABLE_QUERY = """
+    CREATE TABLE IF NOT EXISTS mine_fields (
+        id TEXT PRIMARY KEY,
+        data BLOB NOT NULL,
+        game_state TEXT NOT NULL,
+        updated_at REAL NOT NULL
+    )
+"""
+CREATE_INDEX_QUERY = "CREATE INDEX IF NOT EXISTS mine_fields_expiration ON mine_fields (game_state, updated_at)"
+SELECT_QUERY = "SELECT data FROM mine_fields WHERE id = ?"
+UPSERT_QUERY = """
+    INSERT INTO mine_fields (id, data, game_state, updated_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        data = excluded.data, game_state = excluded.game_state, updated_at = excluded.updated_at
+"""
+SELECT_FINISHED_QUERY = "SELECT id FROM mine_fields WHERE game_state IN (?, ?) AND updated_at < ?"
+DELETE_QUERY = "DELETE FROM mine_fields WHERE id = ?"
+# Objects kept along with a game (e.g. its tiles or initial layout) have ids starting with the game id and a dot,
+# so they are found by a range of primary keys: "." is followed by "/".
+DELETE_CHILDREN_QUERY = "DELETE FROM mine_fields WHERE id > ? || '.' AND id < ? || '/'"
+
+
+class SqliteStorage(AbstractStorage):
+    """
+    Keeps mine fields inside a single SQLite database instead of one file per mine field.
+
+    Database is used in WAL mode, so readers do not block the writer.
+    Each thread gets its own connection which is reused between requests,
+    queries are kept as constants so SQLite statement cache of the connection is hit every time.
+    Finished (won or lost) games are deleted once they have not been updated for the configured amount of time,
+    along with objects kept for them (ids starting with the game id and a dot, e.g. tiles and initial layouts).
+    Data kept for games outside of the database can be deleted by expiration listeners,
+    see `add_expiration_listener()`.
+    """
+
+    def __init__(
+        self,
+        database_path: Optional[str] = None,
+        finished_games_ttl: float = config.SQLITE_FINISHED_GAMES_TTL,
+        expiration_interval: float = config.SQLITE_EXPIRATION_INTERVAL
+    ):
+        """
+        :param (Optional[str]) database_path: Path to the database file, defaults to the one set inside `config`.
+        :param (float) finished_games_ttl: Number of seconds finished games are kept since their last update.
+        :param (float) expiration_interval: Min number of seconds between deletions of expired finished games.
+        """
+
+        self._database_path = database_path or f"{os.getcwd()}/{config.SQLITE_DATABASE_NAME}"
+        self._finished_games_ttl = finished_games_ttl
+        self._expiration_interval = expiration_interval
+        self._last_expiration_time = time()
+        self._expiration_listeners: List[Callable[[List[str]], None]] = []
+        self._connections = threading.local()
+        self._serializer = MineFieldSerializer()
+
+        connection = self._get_connection()
+        with connection:
+            connection.execute(CREATE_TABLE_QUERY)
+            connection.execute(CREATE_INDEX_QUERY)
+
+    def get(self, object_id: str) -> Any:
+        row = self._get_connection().execute(SELECT_QUERY, (object_id,)).fetchone()
+        if row:
+            return self._serializer.deserialize(row[0])
+
+    def set(self, object_id: str, data: Any) -> None:
+        self.set_many({object_id: data})
+
+    def set_many(self, objects: Dict[str, Any]) -> None:
+        updated_at = time()
+        rows = [self._get_row(object_id, data, updated_at) for object_id, data in objects.items()]
+        connection = self._get_connection()
+        with connection:
+            connection.executemany(UPSERT_QUERY, rows)
+        self._delete_expired_games_periodically(updated_at)
+
+    def compare_and_set_many(self, objects: Dict[str, Any], object_id: str, expected_version: Optional[int]) -> bool:
+        updated_at = time()
+        rows = [self._get_row(stored_id, data, updated_at) for stored_id, data in objects.items()]
+        connection = self._get_connection()
+        with connection:
+            # Write lock is taken right away, so other connections can not change the object till commit.
+            connection.execute("BEGIN IMMEDIATE")
+            stored_row = connection.execute(SELECT_QUERY, (object_id,)).fetchone()
+            stored_data = self._serializer.deserialize(stored_row[0]) if stored_row else None
+            if self._get_version(stored_data) != expected_version:
+                return False
+            connection.executemany(UPSERT_QUERY, rows)
+        self._delete_expired_games_periodically(updated_at)
+        return True
+
+    def add_expiration_listener(self, listener: Callable[[List[str]], None]) -> None:
+        """
+        :param (Callable[[List[str]], None]) listener: Function called with ids of games once they are deleted
+            as expired.
+        """
+
+        self._expiration_listeners.append(listener)
+
+    def delete_expired_games(self) -> int:
+        """
+        Deletes won and lost games which have not been updated for longer than finished games TTL.
+
+        :return (int): Number of deleted games.
+        """
+
+        connection = self._get_connection()
+        with connection:
+            # Games are not changed by other connections between selecting and deleting them.
+            connection.execute("BEGIN IMMEDIATE")
+            rows = connection.execute(
+                SELECT_FINISHED_QUERY,
+                (GameState.Won.value, GameState.Lost.value, time() - self._finished_games_ttl,)
+            ).fetchall()
+            object_ids = [object_id for object_id, in rows]
+            connection.executemany(DELETE_QUERY, rows)
+            connection.executemany(DELETE_CHILDREN_QUERY, [(object_id, object_id,) for object_id in object_ids])
+        if object_ids:
+            for listener in self._expiration_listeners:
+                listener(object_ids)
+        return len(object_ids)
+
+    def _delete_expired_games_periodically(self, now: float) -> None:
+        if now - self._last_expiration_time >= self._expiration_interval:
+            self._last_expiration_time = now
+            self.delete_expired_games()
+
+    def _get_row(self, object_id: str, data: Any, updated_at: float) -> Tuple[str, bytes, str, float]:
+        return object_id, self._serializer.serialize(data), data.get_game_state(), updated_at,
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._connections, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._database_path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # Durable enough in WAL mode: committed transactions can be lost only on power failure.
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connections.connection = connection
+        return connection
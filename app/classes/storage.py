@@ -1,11 +1,21 @@
 import os
-import pickle
-from typing import Any
+import zlib
+import tempfile
+from typing import Any, Dict, Optional
 from contextlib import suppress
 
+try:
+    import fcntl
+except ImportError:  # File locks are not available on Windows.
+    fcntl = None
+
 import config
-from libs.serializer import Serializer
 from app.classes.abstract.storage import AbstractStorage
+from app.classes.mine_field_serializer import MineFieldSerializer
+
+# Objects are locked by a fixed set of lock files picked by hashes of object ids, so lock files never pile up.
+# Objects sharing a lock file are just never changed at the same time.
+LOCK_FILES_NUMBER = 64
 
 
 class Storage(AbstractStorage):
@@ -13,25 +23,54 @@ class Storage(AbstractStorage):
     Implements basic storage functionality.
     Inside real-world applications, storing data into local file system should be replaced with
     key-value storage or DB or cloud-based object storage (like S3).
+
+    Files are written to a temporary file which then replaces the stored one, so readers never see half-written data.
+    Compare-and-set holds an exclusive lock of one of the lock files (see `LOCK_FILES_NUMBER`),
+    so it is safe between processes as well.
+    Objects stored by a single compare-and-set are written one by one though, so the process being killed
+    in the middle can leave some of them written (the checked object is written last).
     """
 
     def __init__(self):
         self._storage_path = f"{os.getcwd()}/{config.STORAGE_FOLDER_NAME}"
         self._init_storage(self._storage_path)
-        self._serializer = Serializer()
+        self._serializer = MineFieldSerializer()
 
     def get(self, object_id: str) -> Any:
         with suppress(FileNotFoundError):
-            with open(f"{self._storage_path}/{object_id}", "r") as file:
-                deserialized_data = self._serializer.deserialize(file.read())
-                return pickle.loads(deserialized_data)
+            with open(f"{self._storage_path}/{object_id}", "rb") as file:
+                return self._serializer.deserialize(file.read())
 
     def set(self, object_id: str, data: Any) -> None:
-        pickled_data = pickle.dumps(data)
-        # Serializing pickled data since file.write() accepts only string content but not bytes.
-        serialized_data = self._serializer.serialize(pickled_data)
-        with open(f"{self._storage_path}/{object_id}", "w") as file:
-            file.write(serialized_data)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self._storage_path, prefix=f".{object_id}.")
+        try:
+            with os.fdopen(file_descriptor, "wb") as file:
+                file.write(self._serializer.serialize(data))
+            os.replace(temporary_path, f"{self._storage_path}/{object_id}")
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(temporary_path)
+            raise
+
+    def compare_and_set_many(self, objects: Dict[str, Any], object_id: str, expected_version: Optional[int]) -> bool:
+        if fcntl is None:
+            return super().compare_and_set_many(objects, object_id, expected_version)
+
+        with open(self._get_lock_file_path(object_id), "ab") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if self._get_version(self.get(object_id)) != expected_version:
+                    return False
+                # Checked object goes last, so it never refers to other objects which are not stored yet.
+                for stored_id, data in sorted(objects.items(), key=lambda item: item[0] == object_id):
+                    self.set(stored_id, data)
+                return True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _get_lock_file_path(self, object_id: str) -> str:
+        # Built-in hash of strings differs between processes, so a stable one is used.
+        return f"{self._storage_path}/.lock.{zlib.crc32(object_id.encode()) % LOCK_FILES_NUMBER}"
 
     @staticmethod
     def _init_storage(storage_path: str) -> None:
@@ -1,9 +1,10 @@
 import random
+from collections import deque
 
-from typing import Tuple, List, Union
+from typing import Optional, Tuple, Union
 
 import config
-from app.field_utils import get_distance
+from app.field_utils import get_radius_stencil
 from app.classes.game_state import GameState
 from app.classes.mine_field import MineField
 
@@ -21,16 +22,44 @@ class Sweeper:
     | ?   | 2   | ... |
     | ... | ... | ... |
     Example mine field map extract.
+
+    Instead of scanning the whole mine field before each move, sweeper keeps a queue of safe cells
+    which is updated only around the newly discovered cells, along with a list of unknown cells used for random guesses.
     """
 
-    def __init__(self, mine_field: MineField):
+    def __init__(self, mine_field: MineField, flood: bool = False, rng: Optional[random.Random] = None):
+        """
+        :param (MineField) mine_field: Mine field to clean.
+        :param (bool) flood: Whether discoveries of empty cells discover safe cells around them at once,
+            see `MineField.discover_cell()`.
+        :param (Optional[random.Random]) rng: Random generator of guesses,
+            module level `random` generator is used when not set.
+        """
+
+        field_state = mine_field.get_field_state()
         self._mine_field = mine_field
-        self._horizontal_field_size = len(mine_field.get_field_state()[0])
-        self._vertical_field_size = len(mine_field.get_field_state())
+        self._flood = flood
+        self._random = rng or random
+        self._horizontal_field_size = len(field_state[0])
+        self._vertical_field_size = len(field_state)
         self._mine_cell = config.MINE_CELL
         self._empty_cell = config.EMPTY_CELL
         self._unknown_cell = config.UNKNOWN_CELL
         self._non_distance_cells = [self._mine_cell, self._empty_cell, self._unknown_cell]
+        self._moves = 0
+
+        # Unknown cells are kept in a list for uniform random choice, indices allow removing them in O(1).
+        self._unknown_cells_coordinates = []
+        self._unknown_cells_indices = {}
+        self._safe_cells_coordinates = deque()
+        for y, row in enumerate(field_state):
+            for x, cell in enumerate(row):
+                if cell == self._unknown_cell:
+                    self._unknown_cells_indices[(x, y,)] = len(self._unknown_cells_coordinates)
+                    self._unknown_cells_coordinates.append((x, y,))
+        for y, row in enumerate(field_state):
+            for x, cell in enumerate(row):
+                self._add_safe_cells(x, y, cell)
 
     def sweep(self) -> str:
         """
@@ -57,38 +86,54 @@ class Sweeper:
             if safe_cell_coordinates:
                 next_move_coordinates = safe_cell_coordinates
             else:
-                unknown_cells_coordinates = self._get_unknown_cells_coordinates(self._mine_field.get_field_state())
-                random_unknown_cell_coordinate_index = random.randint(0, len(unknown_cells_coordinates) - 1)
-                next_move_coordinates = unknown_cells_coordinates[random_unknown_cell_coordinate_index]
-            self._mine_field.discover_cell(next_move_coordinates[0], next_move_coordinates[1])
+                next_move_coordinates = self._guess_cell_coordinates()
+            x, y = next_move_coordinates
+            changed_cells = self._mine_field.discover_cell(x, y, self._flood)
+            self._moves += 1
             game_state = self._mine_field.get_game_state()
+            if game_state == GameState.Lost.value:
+                break
+            for x, y in changed_cells:
+                self._remove_unknown_cell(x, y)
+                self._add_safe_cells(x, y, self._mine_field.get_cell(x, y))
         return game_state
 
+    def get_moves(self) -> int:
+        return self._moves
+
     def _find_next_safe_cell_coordinates(self) -> Union[Tuple[int, int], None]:
-        field_state = self._mine_field.get_field_state()
-        for y, row in enumerate(field_state):
-            for x, cell in enumerate(row):
-                if cell not in self._non_distance_cells:  # Cell contains distance to mine.
-                    mine_distance = cell
-                    if mine_distance > 1:
-                        coordinates = self._get_unknown_cell_inside_radius(field_state, x, y, mine_distance)
-                        if coordinates and field_state[coordinates[1]][coordinates[0]] == self._unknown_cell:
-                            return coordinates
-
-    def _get_unknown_cell_inside_radius(self, field_state, x1, y1, radius) -> Union[Tuple[int, int], None]:
-        for y2, row in enumerate(field_state):
-            for x2, cell in enumerate(row):
-                distance = get_distance((x1, y1,), (x2, y2,))
-                if distance < radius and cell == self._unknown_cell:
-                    return x2, y2
-
-    def _get_unknown_cells_coordinates(self, field_state) -> List[Tuple[int, int]]:
-        unknown_cells_coordinates = []
-        for y, row in enumerate(field_state):
-            for x, cell in enumerate(row):
-                if cell == self._unknown_cell:
-                    unknown_cells_coordinates.append((x, y,))
-        return unknown_cells_coordinates
+        while self._safe_cells_coordinates:
+            coordinates = self._safe_cells_coordinates.popleft()
+            # Same cell can be queued by several discovered cells, so it may be already discovered.
+            if coordinates in self._unknown_cells_indices:
+                return coordinates
+
+    def _guess_cell_coordinates(self) -> Tuple[int, int]:
+        random_unknown_cell_coordinate_index = self._random.randint(0, len(self._unknown_cells_coordinates) - 1)
+        return self._unknown_cells_coordinates[random_unknown_cell_coordinate_index]
+
+    def _add_safe_cells(self, x: int, y: int, cell: Union[str, int]) -> None:
+        if cell in self._non_distance_cells:
+            return
+
+        # Cells located closer than the nearest mine cell are safe.
+        mine_distance = cell
+        if mine_distance > 1:
+            for dx, dy, _ in get_radius_stencil(mine_distance - 1):
+                coordinates = (x + dx, y + dy,)
+                if coordinates in self._unknown_cells_indices:
+                    self._safe_cells_coordinates.append(coordinates)
+
+    def _remove_unknown_cell(self, x: int, y: int) -> None:
+        index = self._unknown_cells_indices.pop((x, y,), None)
+        if index is None:
+            return
+
+        # Moving last unknown cell into the place of removed one to avoid shifting the whole list.
+        last_coordinates = self._unknown_cells_coordinates.pop()
+        if index < len(self._unknown_cells_coordinates):
+            self._unknown_cells_coordinates[index] = last_coordinates
+            self._unknown_cells_indices[last_coordinates] = index
 
     def __repr__(self):
         return "Sweeper(mine_field=MineField())"
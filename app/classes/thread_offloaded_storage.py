@@ -0,0 +1,38 @@
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.classes.abstract.storage import AbstractStorage
+from app.classes.abstract.async_storage import AbstractAsyncStorage
+
+
+class ThreadOffloadedStorage(AbstractAsyncStorage):
+    """
+    Makes blocking storage (like file or SQLite one) usable from the event loop:
+    each call is made on a pool of threads, so the event loop keeps serving other clients while it waits for I/O.
+    """
+
+    def __init__(self, storage: AbstractStorage, threads: int = 32):
+        """
+        :param (AbstractStorage) storage: Blocking storage.
+        :param (int) threads: Max number of storage calls made at the same time.
+        """
+
+        self._storage = storage
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix="storage")
+
+    async def set(self, object_id: str, data: Any) -> None:
+        await self._run(self._storage.set, object_id, data)
+
+    async def get(self, object_id: str) -> Any:
+        return await self._run(self._storage.get, object_id)
+
+    async def set_many(self, objects: Dict[str, Any]) -> None:
+        await self._run(self._storage.set_many, objects)
+
+    async def compare_and_set(self, object_id: str, data: Any, expected_version: Optional[int]) -> bool:
+        return await self._run(self._storage.compare_and_set, object_id, data, expected_version)
+
+    async def _run(self, function: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
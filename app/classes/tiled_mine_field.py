@@ -0,0 +1,395 @@
+import struct
+from copy import deepcopy
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.field_utils import get_flood_region
+from app.classes.game_state import GameState
+from app.classes.mine_field_tile import MineFieldTile
+from app.classes.mine_field import (
+    MineField, BINARY_FORMAT_MAGIC, BINARY_FORMAT_VERSION, BINARY_FORMAT_HEADER, GAME_STATES, encode_rows,
+    field_state_to_dict, get_cell_value, get_field_state
+)
+
+# Tiled mine field binary format header: magic, format version, horizontal size, vertical size, discoverable radius,
+# mines, opened cells, game state index, board version, number of unknown cells and tile size.
+# Tiles themselves are stored separately, see `MineFieldTile`.
+TILED_FORMAT_MAGIC = b"MFTI"
+TILED_FORMAT_VERSION = 1
+TILED_FORMAT_HEADER = struct.Struct(">4sBQQQQQBQQQ")
+
+TileLoader = Callable[[int, int], MineFieldTile]
+
+
+class TiledMineField:
+    """
+    Mine field split into square tiles which are loaded only when cells inside them are accessed,
+    so a move or a view of a small region of a huge mine field does not need the whole field.
+    Tiles changed by discoveries are tracked, so only they have to be stored again.
+
+    Encoded tiled mine field (see `to_bytes()`) keeps game settings and state only, tiles are stored separately
+    and loaded with the tile loader, see `TiledStorage`.
+    """
+
+    def __init__(
+        self,
+        horizontal_size: int,
+        vertical_size: int,
+        mines: int,
+        discoverable_radius: int,
+        opened_cells: int,
+        game_state: str,
+        version: int,
+        unknown_cells: int,
+        tile_size: int
+    ):
+        self._horizontal_field_size = horizontal_size
+        self._vertical_field_size = vertical_size
+        self._mines = mines
+        self._discoverable_radius = discoverable_radius
+        self._opened_cells = opened_cells
+        self._game_state = game_state
+        self._version = version
+        self._unknown_cells = unknown_cells
+        self._tile_size = tile_size
+        self._tiles: Dict[Tuple[int, int], MineFieldTile] = {}
+        self._dirty_tiles = set()
+        self._tile_loader: Optional[TileLoader] = None
+
+    @classmethod
+    def from_mine_field(cls, mine_field: MineField, tile_size: int) -> "TiledMineField":
+        """
+        Splits the mine field into tiles, all of them are treated as changed ones.
+
+        :param (MineField) mine_field: Mine field to split.
+        :param (int) tile_size: Max number of cells along each side of a tile.
+        :return (TiledMineField): Tiled mine field.
+        """
+
+        if tile_size < 1:
+            raise ValueError("tile size should be positive")
+
+        mines_cells, discovered_cells, mine_distances = mine_field.get_cells_layout()
+        vertical_size, horizontal_size = mines_cells.shape
+        tiled_mine_field = cls(
+            horizontal_size=horizontal_size,
+            vertical_size=vertical_size,
+            mines=mine_field.get_mines(),
+            discoverable_radius=mine_field.get_discoverable_radius(),
+            opened_cells=mine_field.get_opened_cells(),
+            game_state=mine_field.get_game_state(),
+            version=mine_field.get_version(),
+            unknown_cells=int(np.count_nonzero(~discovered_cells)),
+            tile_size=tile_size
+        )
+        if tiled_mine_field._game_state == GameState.Lost.value:
+            tiled_mine_field._unknown_cells -= tiled_mine_field._mines
+        for tile_x, tile_y, tile_region in tiled_mine_field._get_tiles_regions():
+            tiled_mine_field._tiles[tile_x, tile_y] = MineFieldTile(
+                mines_cells[tile_region].copy(),
+                discovered_cells[tile_region].copy(),
+                mine_distances[tile_region].copy()
+            )
+        tiled_mine_field._dirty_tiles = set(tiled_mine_field._tiles)
+        return tiled_mine_field
+
+    def set_tile_loader(self, tile_loader: TileLoader) -> None:
+        """
+        :param (TileLoader) tile_loader: Function loading the tile by its x-axis and y-axis index.
+        """
+
+        self._tile_loader = tile_loader
+
+    def discover_cell(self, x: int, y: int, flood: bool = False) -> List[Tuple[int, int]]:
+        """
+        Discovers cell by the given coordinates, see `MineField.discover_cell()`.
+        Only the tile of the cell is loaded, unless the cell is a mine: coordinates of all mines are returned then.
+        Flood discovery loads tiles overlapping with the discovered region as well.
+
+        :param (int) x: Cell x-axis coordinate to discover.
+        :param (int) y: Cell y-axis coordinate to discover.
+        :param (bool) flood: Whether to discover all the cells known to be safe once the discovered cell is empty.
+        :return (List[Tuple[int, int]]): Coordinates of cells changed by the discovery.
+        """
+
+        self._validate_discovery(x, y)
+        tile_index = (x // self._tile_size, y // self._tile_size,)
+        tile = self._get_tile(*tile_index)
+        tile_x, tile_y = x % self._tile_size, y % self._tile_size
+        if tile.is_mine(tile_x, tile_y):
+            # Mines are revealed once the game is lost, so no tiles have to be changed.
+            self._game_state = GameState.Lost.value
+            self._unknown_cells -= self._mines
+            self._version += 1
+            return self._get_mines_coordinates()
+
+        if not tile.discover_cell(tile_x, tile_y):
+            return []
+        self._dirty_tiles.add(tile_index)
+        changed_cells = [(x, y,)]
+        if flood and tile.is_empty(tile_x, tile_y):
+            changed_cells.extend(self._discover_flood_region(x, y))
+        self._unknown_cells -= len(changed_cells)
+        self._version += 1
+        if self._mines == self._unknown_cells:
+            self._game_state = GameState.Won.value
+        return changed_cells
+
+    def discover_cells(
+        self, cells_coordinates: List[Tuple[int, int]], flood: bool = False
+    ) -> List[List[Tuple[int, int]]]:
+        """
+        Discovers cells one by one in the given order, see `MineField.discover_cells()`.
+
+        :param (List[Tuple[int, int]]) cells_coordinates: Coordinates of cells to discover.
+        :param (bool) flood: Whether empty cells make safe cells around them discovered, see `discover_cell()`.
+        :return (List[List[Tuple[int, int]]]): Coordinates of cells changed by each discovery made.
+        """
+
+        for index, (x, y) in enumerate(cells_coordinates):
+            try:
+                self._validate_discovery(x, y)
+            except ValueError as error:
+                raise ValueError(f"move {index}: {error}")
+
+        changed_cells = []
+        for x, y in cells_coordinates:
+            if self._game_state != GameState.InProgress.value:
+                break
+            changed_cells.append(self.discover_cell(x, y, flood))
+        return changed_cells
+
+    def get_game_state(self) -> str:
+        return self._game_state
+
+    def get_mines(self) -> int:
+        return self._mines
+
+    def get_discoverable_radius(self) -> int:
+        return self._discoverable_radius
+
+    def get_opened_cells(self) -> int:
+        return self._opened_cells
+
+    def get_size(self) -> Tuple[int, int]:
+        """
+        :return (Tuple[int, int]): Horizontal and vertical size of the mine field.
+        """
+
+        return self._horizontal_field_size, self._vertical_field_size
+
+    def get_version(self) -> int:
+        return self._version
+
+    def get_tile_size(self) -> int:
+        return self._tile_size
+
+    def get_cell(self, x: int, y: int) -> Union[str, int]:
+        return get_cell_value(int(self.get_cells(x, y, x + 1, y + 1)[0, 0]))
+
+    def get_cells(self, x0: int, y0: int, x1: int, y1: int) -> np.ndarray:
+        """
+        Builds cell codes of the region, only tiles overlapping with it are loaded.
+
+        :param (int) x0: X-axis coordinate of the first region column.
+        :param (int) y0: Y-axis coordinate of the first region row.
+        :param (int) x1: X-axis coordinate of the column after the last region column.
+        :param (int) y1: Y-axis coordinate of the row after the last region row.
+        :return (np.ndarray): Cell codes of the region, see `MineField`.
+        """
+
+        cells = None
+        reveal_mines = self._game_state == GameState.Lost.value
+        for tile_y in range(y0 // self._tile_size, (y1 - 1) // self._tile_size + 1):
+            for tile_x in range(x0 // self._tile_size, (x1 - 1) // self._tile_size + 1):
+                tile_cells = self._get_tile(tile_x, tile_y).get_cells(reveal_mines)
+                if cells is None:
+                    cells = np.empty((y1 - y0, x1 - x0,), dtype=tile_cells.dtype)
+                # Tile cells overlapping with the region, in mine field coordinates.
+                left, top = max(x0, tile_x * self._tile_size), max(y0, tile_y * self._tile_size)
+                right, bottom = min(x1, (tile_x + 1) * self._tile_size), min(y1, (tile_y + 1) * self._tile_size)
+                cells[top - y0:bottom - y0, left - x0:right - x0] = tile_cells[
+                    top - tile_y * self._tile_size:bottom - tile_y * self._tile_size,
+                    left - tile_x * self._tile_size:right - tile_x * self._tile_size
+                ]
+        return cells
+
+    def get_field_state(self) -> List[List[Union[str, int]]]:
+        return get_field_state(self.get_cells(0, 0, self._horizontal_field_size, self._vertical_field_size))
+
+    def to_dict(self) -> Dict:
+        return field_state_to_dict(self.get_field_state())
+
+    def to_rows(self) -> List[str]:
+        return encode_rows(self.get_cells(0, 0, self._horizontal_field_size, self._vertical_field_size))
+
+    def to_mine_field(self) -> MineField:
+        """
+        Loads all the tiles and joins them into a regular mine field.
+
+        :return (MineField): Mine field with the same cells and state.
+        """
+
+        shape = (self._vertical_field_size, self._horizontal_field_size,)
+        mines_cells = np.zeros(shape, dtype=bool)
+        discovered_cells = np.zeros(shape, dtype=bool)
+        for tile_x, tile_y, tile_region in self._get_tiles_regions():
+            mines_cells[tile_region], discovered_cells[tile_region] = self._get_tile(tile_x, tile_y).get_layout()
+
+        header = BINARY_FORMAT_HEADER.pack(
+            BINARY_FORMAT_MAGIC,
+            BINARY_FORMAT_VERSION,
+            self._horizontal_field_size,
+            self._vertical_field_size,
+            self._discoverable_radius,
+            self._mines,
+            self._opened_cells,
+            GAME_STATES.index(self._game_state),
+            self._version
+        )
+        bitsets = np.packbits(mines_cells).tobytes() + np.packbits(discovered_cells).tobytes()
+        return MineField.from_bytes(header + bitsets)
+
+    def get_dirty_tiles(self) -> Dict[Tuple[int, int], MineFieldTile]:
+        """
+        :return (Dict[Tuple[int, int], MineFieldTile]): Tiles changed since the last `mark_clean()` call,
+            by their x-axis and y-axis indices.
+        """
+
+        return {tile_index: self._tiles[tile_index] for tile_index in sorted(self._dirty_tiles)}
+
+    def mark_clean(self) -> None:
+        self._dirty_tiles = set()
+
+    def without_tiles(self) -> "TiledMineField":
+        """
+        :return (TiledMineField): Copy of the game settings and state without any tiles loaded.
+        """
+
+        return self.from_bytes(self.to_bytes())
+
+    def to_bytes(self) -> bytes:
+        return TILED_FORMAT_HEADER.pack(
+            TILED_FORMAT_MAGIC,
+            TILED_FORMAT_VERSION,
+            self._horizontal_field_size,
+            self._vertical_field_size,
+            self._discoverable_radius,
+            self._mines,
+            self._opened_cells,
+            GAME_STATES.index(self._game_state),
+            self._version,
+            self._unknown_cells,
+            self._tile_size
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "TiledMineField":
+        if len(data) < TILED_FORMAT_HEADER.size or not data.startswith(TILED_FORMAT_MAGIC):
+            raise ValueError("data is not an encoded tiled mine field")
+        (
+            _, version, horizontal_size, vertical_size, discoverable_radius, mines, opened_cells, game_state_index,
+            board_version, unknown_cells, tile_size
+        ) = TILED_FORMAT_HEADER.unpack_from(data)
+        if version != TILED_FORMAT_VERSION:
+            raise ValueError(f"tiled mine field binary format version {version} is not supported")
+
+        return cls(
+            horizontal_size=horizontal_size,
+            vertical_size=vertical_size,
+            mines=mines,
+            discoverable_radius=discoverable_radius,
+            opened_cells=opened_cells,
+            game_state=GAME_STATES[game_state_index],
+            version=board_version,
+            unknown_cells=unknown_cells,
+            tile_size=tile_size
+        )
+
+    def _get_tile(self, tile_x: int, tile_y: int) -> MineFieldTile:
+        tile = self._tiles.get((tile_x, tile_y,))
+        if tile is None:
+            if self._tile_loader is None:
+                raise ValueError("tiles of the mine field can not be loaded")
+            tile = self._tiles[tile_x, tile_y] = self._tile_loader(tile_x, tile_y)
+        return tile
+
+    def _discover_flood_region(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """
+        :param (int) x: X-axis coordinate of the discovered empty cell.
+        :param (int) y: Y-axis coordinate of the discovered empty cell.
+        :return (List[Tuple[int, int]]): Coordinates of cells discovered around it, see `get_flood_region()`.
+        """
+
+        shape = (self._vertical_field_size, self._horizontal_field_size,)
+        xs, ys = get_flood_region(x, y, shape, self._discoverable_radius, self._is_empty)
+        changed_cells = np.zeros(xs.shape, dtype=bool)
+        for tile_index, tile_cells in self._group_cells_by_tiles(xs, ys):
+            changed_cells[tile_cells] = self._get_tile(*tile_index).discover_cells(
+                xs[tile_cells] % self._tile_size, ys[tile_cells] % self._tile_size
+            )
+            if changed_cells[tile_cells].any():
+                self._dirty_tiles.add(tile_index)
+        return list(zip(xs[changed_cells].tolist(), ys[changed_cells].tolist()))
+
+    def _is_empty(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        empty_cells = np.empty(xs.shape, dtype=bool)
+        for tile_index, tile_cells in self._group_cells_by_tiles(xs, ys):
+            empty_cells[tile_cells] = self._get_tile(*tile_index).is_empty(
+                xs[tile_cells] % self._tile_size, ys[tile_cells] % self._tile_size
+            )
+        return empty_cells
+
+    def _group_cells_by_tiles(
+        self, xs: np.ndarray, ys: np.ndarray
+    ) -> Iterator[Tuple[Tuple[int, int], np.ndarray]]:
+        """
+        :param (np.ndarray) xs: X-axis coordinates of cells.
+        :param (np.ndarray) ys: Y-axis coordinates of cells.
+        :return (Iterator[Tuple[Tuple[int, int], np.ndarray]]): Index of each tile containing any of the cells
+            along with indices of cells inside it.
+        """
+
+        tiles_per_row = (self._horizontal_field_size - 1) // self._tile_size + 1
+        tiles_ids = (ys // self._tile_size) * tiles_per_row + xs // self._tile_size
+        cells_order = np.argsort(tiles_ids, kind="stable")
+        tiles_ids, tiles_starts = np.unique(tiles_ids[cells_order], return_index=True)
+        for tile_id, tile_cells in zip(tiles_ids.tolist(), np.split(cells_order, tiles_starts[1:])):
+            yield (tile_id % tiles_per_row, tile_id // tiles_per_row,), tile_cells
+
+    def _get_mines_coordinates(self) -> List[Tuple[int, int]]:
+        mines_coordinates = []
+        for tile_x, tile_y, _ in self._get_tiles_regions():
+            # Tiles which are not loaded yet are not kept, so memory is not exhausted by huge mine fields.
+            tile = self._tiles.get((tile_x, tile_y,)) or self._tile_loader(tile_x, tile_y)
+            mines_coordinates.extend(
+                (tile_x * self._tile_size + x, tile_y * self._tile_size + y,) for x, y in tile.get_mines_coordinates()
+            )
+        return sorted(mines_coordinates, key=lambda coordinates: (coordinates[1], coordinates[0],))
+
+    def _get_tiles_regions(self) -> Iterator[Tuple[int, int, Tuple[slice, slice]]]:
+        for tile_y in range(0, (self._vertical_field_size - 1) // self._tile_size + 1):
+            for tile_x in range(0, (self._horizontal_field_size - 1) // self._tile_size + 1):
+                yield tile_x, tile_y, (
+                    slice(tile_y * self._tile_size, (tile_y + 1) * self._tile_size),
+                    slice(tile_x * self._tile_size, (tile_x + 1) * self._tile_size)
+                )
+
+    def _validate_discovery(self, x, y) -> None:
+        if not (x in range(self._horizontal_field_size) and y in range(self._vertical_field_size)):
+            raise ValueError("it is not allowed to discover cells outside of the mine field")
+
+        if self.get_game_state() != GameState.InProgress.value:
+            raise ValueError(f"only interactions with `{GameState.InProgress.value}` mine fields are allowed")
+
+    def __deepcopy__(self, memo: Dict) -> "TiledMineField":
+        tiled_mine_field = self.without_tiles()
+        tiled_mine_field._tiles = deepcopy(self._tiles, memo)
+        tiled_mine_field._dirty_tiles = set(self._dirty_tiles)
+        tiled_mine_field._tile_loader = self._tile_loader
+        return tiled_mine_field
+
+    def __reduce__(self) -> Tuple:
+        # Tile loader can not be pickled, so the mine field is passed to other processes (like solvers) as a whole.
+        return MineField.from_bytes, (self.to_mine_field().to_bytes(),)
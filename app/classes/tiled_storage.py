@@ -0,0 +1,89 @@
+from typing import Any, Dict, Optional
+
+from app.classes.mine_field import MineField
+from app.classes.mine_field_tile import MineFieldTile
+from app.classes.tiled_mine_field import TiledMineField
+from app.classes.abstract.storage import AbstractStorage
+
+
+class TiledStorage(AbstractStorage):
+    """
+    Keeps mine fields in another storage split into tiles (see `TiledMineField`), each tile is a separate object.
+    A move rewrites only the tile of the discovered cell and a small object with the game state,
+    and reading a region of the mine field loads only tiles overlapping with it.
+
+    Changed tiles and the game state are stored together by a single compare-and-set of the underlying storage
+    keyed on the version of the game state (see `AbstractStorage.compare_and_set_many()`), so concurrent moves
+    never overwrite tiles of each other (atomic within a single transaction with the SQLite storage).
+    Mine fields stored as a whole (e.g. before tiles were enabled) are still readable.
+    Tiles are deleted by the SQLite storage along with their finished games once they are expired.
+    """
+
+    def __init__(self, storage: AbstractStorage, tile_size: int = 256):
+        """
+        :param (AbstractStorage) storage: Storage keeping the game states and tiles.
+        :param (int) tile_size: Max number of cells along each side of a tile.
+        """
+
+        if tile_size < 1:
+            raise ValueError("tile size should be positive")
+
+        self._storage = storage
+        self._tile_size = tile_size
+
+    def get(self, object_id: str) -> Any:
+        data = self._storage.get(object_id)
+        if isinstance(data, TiledMineField):
+            data.set_tile_loader(lambda tile_x, tile_y: self._get_tile(object_id, tile_x, tile_y))
+        return data
+
+    def set(self, object_id: str, data: Any) -> None:
+        self.set_many({object_id: data})
+
+    def set_many(self, objects: Dict[str, Any]) -> None:
+        tiled_mine_fields = self._get_tiled_mine_fields(objects)
+        self._storage.set_many(self._get_stored_objects(tiled_mine_fields))
+        for tiled_mine_field in tiled_mine_fields.values():
+            tiled_mine_field.mark_clean()
+
+    def compare_and_set_many(self, objects: Dict[str, Any], object_id: str, expected_version: Optional[int]) -> bool:
+        tiled_mine_fields = self._get_tiled_mine_fields(objects)
+        if not self._storage.compare_and_set_many(
+            self._get_stored_objects(tiled_mine_fields), object_id, expected_version
+        ):
+            return False
+        for tiled_mine_field in tiled_mine_fields.values():
+            tiled_mine_field.mark_clean()
+        return True
+
+    def _get_tiled_mine_fields(self, objects: Dict[str, Any]) -> Dict[str, TiledMineField]:
+        return {
+            object_id: TiledMineField.from_mine_field(data, self._tile_size) if isinstance(data, MineField) else data
+            for object_id, data in objects.items()
+        }
+
+    def _get_stored_objects(self, tiled_mine_fields: Dict[str, TiledMineField]) -> Dict[str, Any]:
+        """
+        :param (Dict[str, TiledMineField]) tiled_mine_fields: Mine fields by their ids.
+        :return (Dict[str, Any]): Changed tiles followed by game states of the mine fields, by their ids.
+        """
+
+        tiles = {}
+        for object_id, tiled_mine_field in tiled_mine_fields.items():
+            for (tile_x, tile_y), tile in tiled_mine_field.get_dirty_tiles().items():
+                tiles[self._get_tile_id(object_id, tile_x, tile_y)] = tile
+        # Tiles go first, so stored game state never refers to tiles which are not stored yet.
+        return {**tiles, **{
+            object_id: tiled_mine_field.without_tiles() for object_id, tiled_mine_field in tiled_mine_fields.items()
+        }}
+
+    def _get_tile(self, object_id: str, tile_x: int, tile_y: int) -> MineFieldTile:
+        tile_id = self._get_tile_id(object_id, tile_x, tile_y)
+        tile = self._storage.get(tile_id)
+        if tile is None:
+            raise LookupError(f"tile `{tile_id}` of the mine field is not found")
+        return tile
+
+    @staticmethod
+    def _get_tile_id(object_id: str, tile_x: int, tile_y: int) -> str:
+        return f"{object_id}.tile.{tile_x}.{tile_y}"
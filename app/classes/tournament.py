@@ -0,0 +1,216 @@
+import os
+import json
+import random
+from collections import Counter
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, Optional, Set
+
+from app.classes.sweeper import Sweeper
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField
+from app.classes.constraint_sweeper import ConstraintSweeper
+
+STRATEGIES = {
+    "basic": Sweeper,
+    "constraint": ConstraintSweeper
+}
+
+
+class Tournament:
+    """
+    Plays lots of games with the same settings using one of the sweeper strategies.
+
+    Games are split into shards which are played on a pool of worker processes.
+    Random generator of each shard is seeded with tournament seed and shard index,
+    so results are reproducible no matter how many workers are used and in which order shards are finished.
+
+    Results of finished shards can be appended to the checkpoint file (JSON lines),
+    so interrupted tournament can be resumed later skipping already played shards.
+    """
+
+    def __init__(
+        self,
+        horizontal_size: int,
+        vertical_size: int,
+        mines: int,
+        discoverable_radius: int,
+        opened_cells: int,
+        games: int,
+        strategy: str = "basic",
+        shard_size: int = 1000,
+        workers: Optional[int] = None,
+        seed: int = 0,
+        checkpoint_path: Optional[str] = None
+    ):
+        """
+        Initializes tournament with the given parameters.
+
+        :param (int) horizontal_size: Horizontal size of the mine field. Can be any positive number.
+        :param (int) vertical_size: Vertical size of the mine field. Can be any positive number.
+        :param (int) mines: Number of mines to set on the field. Can be any positive number.
+        :param (int) discoverable_radius:  Distance from the current cell where nearest mine cells are looked for.
+        :param (int) opened_cells: Cells to open on the mine field before game starts.
+        :param (int) games: Number of games to play.
+        :param (str) strategy: Name of the sweeper strategy, one of `STRATEGIES` keys.
+        :param (int) shard_size: Number of games played by worker at once.
+        :param (Optional[int]) workers: Number of worker processes, defaults to the number of CPUs.
+        :param (int) seed: Tournament seed, same seeds give same results.
+        :param (Optional[str]) checkpoint_path: Path to the file where results of finished shards are kept.
+        """
+
+        MineField._validate_init(
+            horizontal_size=horizontal_size,
+            vertical_size=vertical_size,
+            mines=mines,
+            discoverable_radius=discoverable_radius,
+            opened_cells=opened_cells
+        )
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy, should be one of: {', '.join(STRATEGIES)}")
+        if games < 1 or shard_size < 1:
+            raise ValueError("number of games and shard size should be positive")
+
+        self._settings = {
+            "horizontal_size": horizontal_size,
+            "vertical_size": vertical_size,
+            "mines": mines,
+            "discoverable_radius": discoverable_radius,
+            "opened_cells": opened_cells,
+            "games": games,
+            "strategy": strategy,
+            "shard_size": shard_size,
+            "seed": seed
+        }
+        self._workers = workers or os.cpu_count()
+        self._checkpoint_path = checkpoint_path
+
+    def play(self) -> Iterator[Dict]:
+        """
+        Plays the tournament yielding aggregated results each time one more shard is finished.
+        Last yielded results are the final ones.
+
+        Usage example:
+
+        ```
+            from app.classes.tournament import Tournament
+
+            tournament = Tournament(
+                horizontal_size=5, vertical_size=5, mines=4, discoverable_radius=2, opened_cells=5, games=100000
+            )
+            for results in tournament.play():
+                print(results["won"], results["lost"])
+        ```
+
+        :return (Iterator[Dict]): Number of games played, won and lost, along with moves histograms of won/lost games.
+        """
+
+        results = {
+            "games": 0,
+            "won": 0,
+            "lost": 0,
+            "moves": {GameState.Won.value: Counter(), GameState.Lost.value: Counter()}
+        }
+        finished_shards = set()
+        for shard_results in self._load_checkpoint():
+            finished_shards.add(shard_results["shard"])
+            self._merge_results(results, shard_results)
+        if finished_shards:
+            yield results
+
+        shards = self._get_shards(finished_shards)
+        if not shards:
+            return
+
+        if self._workers == 1:
+            shards_results = map(play_shard, shards)
+            yield from self._collect_results(results, shards_results)
+        else:
+            with Pool(min(self._workers, len(shards))) as pool:
+                yield from self._collect_results(results, pool.imap_unordered(play_shard, shards))
+
+    def _collect_results(self, results: Dict, shards_results: Iterator[Dict]) -> Iterator[Dict]:
+        for shard_results in shards_results:
+            self._save_checkpoint(shard_results)
+            self._merge_results(results, shard_results)
+            yield results
+
+    def _get_shards(self, finished_shards: Set[int]) -> List[Dict]:
+        shards = []
+        games = self._settings["games"]
+        shard_size = self._settings["shard_size"]
+        for shard_index, first_game in enumerate(range(0, games, shard_size)):
+            if shard_index not in finished_shards:
+                shards.append({
+                    **self._settings,
+                    "shard": shard_index,
+                    "games": min(shard_size, games - first_game)
+                })
+        return shards
+
+    def _load_checkpoint(self) -> List[Dict]:
+        if not self._checkpoint_path or not os.path.exists(self._checkpoint_path):
+            return []
+
+        with open(self._checkpoint_path, "r") as file:
+            lines = [json.loads(line) for line in file if line.strip()]
+        if not lines:
+            return []
+        if lines[0] != self._settings:
+            raise ValueError("checkpoint file was created for a tournament with different settings")
+        return lines[1:]
+
+    def _save_checkpoint(self, shard_results: Dict) -> None:
+        if not self._checkpoint_path:
+            return
+
+        is_new_checkpoint = not os.path.exists(self._checkpoint_path)
+        with open(self._checkpoint_path, "a") as file:
+            if is_new_checkpoint:
+                file.write(json.dumps(self._settings) + "\n")
+            file.write(json.dumps(shard_results) + "\n")
+
+    @staticmethod
+    def _merge_results(results: Dict, shard_results: Dict) -> None:
+        results["games"] += shard_results["won"] + shard_results["lost"]
+        results["won"] += shard_results["won"]
+        results["lost"] += shard_results["lost"]
+        for game_state, moves_histogram in shard_results["moves"].items():
+            # JSON keeps keys as strings only, so moves are converted back after loading from checkpoint.
+            results["moves"][game_state].update({int(moves): games for moves, games in moves_histogram.items()})
+
+    def __repr__(self) -> str:
+        return "Tournament(" + ", ".join(f"{key}={value}" for key, value in self._settings.items()) + ")"
+
+
+def play_shard(shard: Dict) -> Dict:
+    """
+    Plays games of a single tournament shard.
+    Mine fields and sweeper guesses are generated by a random generator seeded per shard,
+    module level `random` generator is left untouched.
+
+    :param (Dict) shard: Tournament settings, along with the shard index and number of games to play.
+    :return (Dict): Number of games won and lost, along with moves histograms of won/lost games.
+    """
+
+    rng = random.Random(f"{shard['seed']}-{shard['shard']}")
+    sweeper_class = STRATEGIES[shard["strategy"]]
+    moves = {GameState.Won.value: Counter(), GameState.Lost.value: Counter()}
+    for _ in range(shard["games"]):
+        mine_field = MineField(
+            horizontal_size=shard["horizontal_size"],
+            vertical_size=shard["vertical_size"],
+            mines=shard["mines"],
+            discoverable_radius=shard["discoverable_radius"],
+            opened_cells=shard["opened_cells"],
+            seed=rng.getrandbits(64)
+        )
+        sweeper = sweeper_class(mine_field, rng=rng)
+        game_state = sweeper.sweep()
+        moves[game_state][sweeper.get_moves()] += 1
+
+    return {
+        "shard": shard["shard"],
+        "won": sum(moves[GameState.Won.value].values()),
+        "lost": sum(moves[GameState.Lost.value].values()),
+        "moves": moves
+    }
@@ -1,14 +1,238 @@
 import math
 import random
 
-from typing import Tuple
+from types import ModuleType
+from functools import lru_cache
+from typing import Callable, Tuple, Union
+
+import numpy as np
+
+# Samples bigger than this are picked with numpy, smaller ones are faster to pick with `random` module.
+MAX_PYTHON_SAMPLE_SIZE = 1000
+# Offsets of the cells sharing a side with the (0, 0) cell.
+NEIGHBOR_OFFSETS = np.array([(-1, 0,), (1, 0,), (0, -1,), (0, 1,)], dtype=np.int64)
+# Distance maps for radii up to this one are built with the table of distances, see `get_distance_table()`.
+MAX_DISTANCE_TABLE_RADIUS = 255
 
 
 def get_distance(coordinate_1: Tuple[int, int], coordinate_2: Tuple[int, int]) -> int:
-    return int(math.sqrt((coordinate_2[0] - coordinate_1[0]) ** 2 + (coordinate_2[1] - coordinate_1[1]) ** 2))
+    # Integer square root truncates the distance exactly, no matter how big the coordinates are.
+    return math.isqrt((coordinate_2[0] - coordinate_1[0]) ** 2 + (coordinate_2[1] - coordinate_1[1]) ** 2)
+
+
+def get_max_distance(horizontal_size: int, vertical_size: int) -> int:
+    """
+    :param (int) horizontal_size: Horizontal size of the mine field.
+    :param (int) vertical_size: Vertical size of the mine field.
+    :return (int): Distance between the farthest cells of the mine field (along its diagonal),
+        there is no need to look for mines any further.
+    """
+
+    return get_distance((0, 0,), (horizontal_size - 1, vertical_size - 1,))
+
+
+def generate_random_cell_indices(
+    board_size: int,
+    cells: int,
+    rng: Union[random.Random, ModuleType] = random
+) -> np.ndarray:
+    """
+    Picks distinct random cells of the board, each cell is equally likely to be picked.
+    Cells are sampled by flat (row-major) indices without replacement,
+    so no retries are needed no matter how full the board is.
+
+    Picking lots of cells one by one in Python is slow, so they are sampled with numpy generator
+    seeded from the given one, which keeps results reproducible.
+
+    :param (int) board_size: Number of cells on the board.
+    :param (int) cells: Number of cells to pick.
+    :param (Union[random.Random, ModuleType]) rng: Random generator, `random` module by default.
+    :return (np.ndarray): Flat indices of picked cells, in the order they were picked.
+    """
+
+    if cells <= MAX_PYTHON_SAMPLE_SIZE:
+        return np.array(rng.sample(range(board_size), cells), dtype=np.int64)
+    return np.random.default_rng(rng.getrandbits(64)).choice(board_size, cells, replace=False)
+
+
+@lru_cache(maxsize=32)
+def get_radius_stencil(radius: int) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    Returns relative offsets of all cells located within the given radius from the (0, 0) cell.
+    Each offset is represented as (dx, dy, distance) tuple, offsets are sorted by distance in ascending order.
+
+    :param (int) radius: Max distance from the (0, 0) cell to include into stencil.
+    :return (Tuple): Offsets within radius.
+    """
+
+    # Truncated distance does not exceed the radius while squared distance is below (radius + 1) ** 2,
+    # so the widest row of the stencil is found without computing distances of the cells outside of it.
+    squared_distance_limit = (radius + 1) ** 2
+    offsets = []
+    for dy in range(-radius, radius + 1):
+        half_width = math.isqrt(squared_distance_limit - 1 - dy * dy)
+        for dx in range(-half_width, half_width + 1):
+            offsets.append((dx, dy, math.isqrt(dx * dx + dy * dy),))
+    return tuple(sorted(offsets, key=lambda offset: offset[2]))
+
+
+@lru_cache(maxsize=32)
+def get_radius_ring(radius: int) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    :param (int) radius: Distance from the (0, 0) cell.
+    :return (Tuple): Offsets of the radius stencil (see `get_radius_stencil()`) located exactly at the given distance.
+    """
+
+    return tuple(offset for offset in get_radius_stencil(radius) if offset[2] == radius)
+
+
+@lru_cache(maxsize=32)
+def get_radius_stencil_offsets(radius: int) -> np.ndarray:
+    """
+    :param (int) radius: Max distance from the (0, 0) cell to include into stencil.
+    :return (np.ndarray): Read only array of (dx, dy) rows of the radius stencil, see `get_radius_stencil()`.
+    """
+
+    offsets = np.array(get_radius_stencil(radius), dtype=np.int64)[:, :2]
+    offsets.flags.writeable = False
+    return offsets
+
+
+@lru_cache(maxsize=8)
+def get_distance_table(radius: int) -> np.ndarray:
+    """
+    Returns truncated distances indexed by squared distances, so no square roots are needed to find them:
+    squared distances from k ** 2 up to (k + 1) ** 2 (exclusive) are at k distance.
+    The last entry is 0, it stands for all the squared distances beyond the radius.
+
+    :param (int) radius: Max distance to put into the table.
+    :return (np.ndarray): Read only table of (radius + 1) ** 2 + 1 distances.
+    """
+
+    distances = np.arange(radius + 1, dtype=np.int64)
+    table = np.append(np.repeat(distances, 2 * distances + 1), 0)
+    table.flags.writeable = False
+    return table
+
+
+def get_mine_distance_map(mines_cells: np.ndarray, radius: int) -> np.ndarray:
+    """
+    Builds map of distances from every cell to the nearest mine cell located inside the given radius.
+    Cells without mines inside the radius, as well as mine cells themselves, get 0 distance.
+
+    Euclidean distance transform is done in 2 separable passes:
+    vertical distances to the nearest mine in the same column are found first,
+    then they are combined with columns located within the radius to the left and to the right.
+
+    Stacked mine fields are supported as well, in that case the last 2 axes are treated as mine field axes.
+
+    :param (np.ndarray) mines_cells: Boolean map (or stack of maps) where mine cells are set to `True`.
+    :param (int) radius: Max distance to the mine cell to put on the map.
+    :return (np.ndarray): Map of distances with the same shape as mine cells map.
+    """
+
+    vertical_size, horizontal_size = mines_cells.shape[-2:]
+    radius = min(radius, get_max_distance(horizontal_size, vertical_size))
+
+    # Distances beyond the radius are never put on the map, so capping them keeps squared values small.
+    out_of_radius_distance = radius + 1
+    vertical_distances = np.empty(mines_cells.shape, dtype=np.int64)
+    previous_row = np.full(mines_cells[..., 0, :].shape, out_of_radius_distance, dtype=np.int64)
+    for y in range(vertical_size):
+        previous_row = np.where(mines_cells[..., y, :], 0, np.minimum(previous_row + 1, out_of_radius_distance))
+        vertical_distances[..., y, :] = previous_row
+    for y in range(vertical_size - 2, -1, -1):
+        np.minimum(vertical_distances[..., y, :], vertical_distances[..., y + 1, :] + 1,
+                   out=vertical_distances[..., y, :])
+
+    squared_vertical_distances = vertical_distances ** 2
+    squared_distances = squared_vertical_distances.copy()
+    for dx in range(1, min(radius, horizontal_size - 1) + 1):
+        shifted_distances = squared_vertical_distances + dx ** 2
+        np.minimum(squared_distances[..., dx:], shifted_distances[..., :-dx], out=squared_distances[..., dx:])
+        np.minimum(squared_distances[..., :-dx], shifted_distances[..., dx:], out=squared_distances[..., :-dx])
+
+    out_of_radius_squared_distance = out_of_radius_distance ** 2
+    if radius <= MAX_DISTANCE_TABLE_RADIUS:
+        # Squared distances beyond the radius are capped, so all of them take the last entry of the table.
+        np.minimum(squared_distances, out_of_radius_squared_distance, out=squared_distances)
+        return get_distance_table(radius)[squared_distances]
+
+    # Truncating the same way `get_distance()` does.
+    distances = np.sqrt(squared_distances).astype(np.int64)
+    distances[squared_distances >= out_of_radius_squared_distance] = 0
+    return distances
+
+
+def get_flood_region(
+    x: int,
+    y: int,
+    shape: Tuple[int, int],
+    radius: int,
+    is_empty: Callable[[np.ndarray, np.ndarray], np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds cells which are safe to discover once the given empty cell (one without mines inside the radius) is known.
+    Every cell inside the radius of an empty cell is safe, and empty ones among them make the region grow further,
+    so the whole connected region of empty cells is found along with cells inside the radius of them.
+
+    Region is walked breadth first, cells of a whole level are handled at once.
+    Stencil of an empty cell surrounded by empty cells is covered by stencils of its neighbors
+    (each stencil cell is 1 step closer to one of them), so empty cells are walked through their neighbors
+    and only the ones next to non-empty cells are expanded with the whole radius stencil.
+
+    :param (int) x: X-axis coordinate of the empty cell to start from.
+    :param (int) y: Y-axis coordinate of the empty cell to start from.
+    :param (Tuple[int, int]) shape: Vertical and horizontal size of the mine field.
+    :param (int) radius: Discoverable radius of the mine field.
+    :param (Callable) is_empty: Function telling which of the cells (given by x-axis and y-axis coordinates) are empty.
+    :return (Tuple[np.ndarray, np.ndarray]): X-axis and y-axis coordinates of region cells, level by level.
+    """
+
+    vertical_size, horizontal_size = shape
+    radius = min(radius, get_max_distance(horizontal_size, vertical_size))
+    region_xs, region_ys = [np.array([x], dtype=np.int64)], [np.array([y], dtype=np.int64)]
+    if radius < 1:
+        return region_xs[0], region_ys[0]
+    stencil_offsets = get_radius_stencil_offsets(radius)
+
+    reached_cells = np.zeros(shape, dtype=bool)
+    reached_cells[y, x] = True
+    empty_xs, empty_ys = region_xs[0], region_ys[0]
+    while empty_xs.size:
+        neighbor_xs, neighbor_ys, inside = _get_offset_cells(empty_xs, empty_ys, NEIGHBOR_OFFSETS, shape)
+        empty_neighbors = np.ones(neighbor_xs.shape, dtype=bool)
+        empty_neighbors[inside] = is_empty(neighbor_xs[inside], neighbor_ys[inside])
+        border_cells = ~empty_neighbors.all(axis=1)
+        stencil_xs, stencil_ys, stencil_inside = _get_offset_cells(
+            empty_xs[border_cells], empty_ys[border_cells], stencil_offsets, shape
+        )
+
+        next_empty_xs, next_empty_ys = [], []
+        for xs, ys, cells_inside in ((neighbor_xs, neighbor_ys, inside,), (stencil_xs, stencil_ys, stencil_inside,)):
+            xs, ys = xs[cells_inside], ys[cells_inside]
+            # Most of the cells are reached before, so they are dropped before looking for duplicates.
+            new_cells = ~reached_cells[ys, xs]
+            ys, xs = np.divmod(np.unique(ys[new_cells] * horizontal_size + xs[new_cells]), horizontal_size)
+            reached_cells[ys, xs] = True
+            region_xs.append(xs)
+            region_ys.append(ys)
+            empty_cells = is_empty(xs, ys)
+            next_empty_xs.append(xs[empty_cells])
+            next_empty_ys.append(ys[empty_cells])
+        empty_xs, empty_ys = np.concatenate(next_empty_xs), np.concatenate(next_empty_ys)
+    return np.concatenate(region_xs), np.concatenate(region_ys)
+
 
+def _get_offset_cells(
+    xs: np.ndarray, ys: np.ndarray, offsets: np.ndarray, shape: Tuple[int, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    :return (Tuple[np.ndarray, np.ndarray, np.ndarray]): X-axis and y-axis coordinates of cells shifted by each
+        of the offsets (one row per given cell) along with the mask of cells located inside the mine field.
+    """
 
-def generate_random_coordinates(horizontal_board_size: int, vertical_board_size: int) -> Tuple[int, int]:
-    x = random.randint(0, horizontal_board_size - 1)
-    y = random.randint(0, vertical_board_size - 1)
-    return x, y
+    offset_xs = xs[:, np.newaxis] + offsets[:, 0]
+    offset_ys = ys[:, np.newaxis] + offsets[:, 1]
+    inside = (offset_xs >= 0) & (offset_xs < shape[1]) & (offset_ys >= 0) & (offset_ys < shape[0])
+    return offset_xs, offset_ys, inside
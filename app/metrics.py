@@ -0,0 +1,5 @@
+import config
+from app.classes.metrics import Metrics
+
+# Metrics shared by the whole process, see `config.METRICS_ENABLED`.
+metrics = Metrics(enabled=config.METRICS_ENABLED)
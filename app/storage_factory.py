@@ -0,0 +1,45 @@
+import config
+from app.metrics import metrics
+from app.classes.storage import Storage
+from app.classes.tiled_storage import TiledStorage
+from app.classes.move_log_storage import MoveLogStorage
+from app.classes.cached_storage import CachedStorage
+from app.classes.sqlite_storage import SqliteStorage
+from app.classes.metered_storage import MeteredStorage
+from app.classes.abstract.storage import AbstractStorage
+
+STORAGE_BACKENDS = {
+    "file": Storage,
+    "sqlite": SqliteStorage
+}
+
+
+def create_storage() -> AbstractStorage:
+    """
+    Creates storage configured inside `config` module.
+
+    :return (AbstractStorage): Storage instance to be shared between requests.
+    """
+
+    if config.STORAGE_BACKEND not in STORAGE_BACKENDS:
+        raise ValueError(f"unknown storage backend, should be one of: {', '.join(STORAGE_BACKENDS)}")
+    if config.STORAGE_TILE_SIZE and config.MOVE_LOG_ENABLED:
+        raise ValueError("tiled storage can not be used along with move logs")
+
+    storage = backend = STORAGE_BACKENDS[config.STORAGE_BACKEND]()
+    if config.STORAGE_CACHE_SIZE:
+        storage = CachedStorage(
+            storage,
+            max_size=config.STORAGE_CACHE_SIZE,
+            ttl=config.STORAGE_CACHE_TTL,
+            flush_interval=config.STORAGE_CACHE_FLUSH_INTERVAL
+        )
+    if config.MOVE_LOG_ENABLED:
+        storage = MoveLogStorage(storage, snapshot_interval=config.MOVE_LOG_SNAPSHOT_INTERVAL)
+        if isinstance(backend, SqliteStorage):
+            backend.add_expiration_listener(storage.delete_logs)
+    if config.STORAGE_TILE_SIZE:
+        storage = TiledStorage(storage, tile_size=config.STORAGE_TILE_SIZE)
+    if metrics.enabled:
+        storage = MeteredStorage(storage, metrics)
+    return storage
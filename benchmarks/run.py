@@ -0,0 +1,294 @@
+"""
+Benchmark suite of mine field, sweeper, storages and HTTP API.
+
+Each benchmark is run for every combination of board size, mine density and discoverable radius,
+results are written as JSON, so they can be compared across commits.
+
+Usage example:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --compare results.json
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import tempfile
+import itertools
+import statistics
+import subprocess
+from time import perf_counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.classes.sweeper import Sweeper
+from app.classes.storage import Storage
+from app.classes.mine_field import MineField
+from app.classes.sqlite_storage import SqliteStorage
+
+BOARD_SIZES = [(10, 10,), (100, 100,), (500, 500,)]
+MINE_DENSITIES = [0.05, 0.2]
+DISCOVERABLE_RADIUSES = [1, 3, 10]
+QUICK_BOARD_SIZES = [(10, 10,), (100, 100,)]
+QUICK_DISCOVERABLE_RADIUSES = [2]
+# Full games are played on small boards only, otherwise a single game takes too long.
+MAX_SWEEP_BOARD_CELLS = 100 * 100
+OPENED_CELLS_DENSITY = 0.05
+
+
+def measure(function: Callable[[], object], min_time: float, max_repeats: int = 1000) -> Dict:
+    """
+    Calls the function repeatedly until `min_time` seconds pass (but at least 3 times).
+
+    :param (Callable) function: Function to measure.
+    :param (float) min_time: Min number of seconds to spend on measurements.
+    :param (int) max_repeats: Max number of calls.
+    :return (Dict): Number of calls along with min, median and mean call time in seconds.
+    """
+
+    timings = []
+    started_at = perf_counter()
+    while len(timings) < 3 or (perf_counter() - started_at < min_time and len(timings) < max_repeats):
+        call_started_at = perf_counter()
+        function()
+        timings.append(perf_counter() - call_started_at)
+    return {
+        "repeats": len(timings),
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings)
+    }
+
+
+def get_settings(board_size: Tuple[int, int], mine_density: float, discoverable_radius: int) -> Dict:
+    horizontal_size, vertical_size = board_size
+    cells = horizontal_size * vertical_size
+    return {
+        "horizontal_size": horizontal_size,
+        "vertical_size": vertical_size,
+        "mines": max(1, int(cells * mine_density)),
+        "discoverable_radius": discoverable_radius,
+        "opened_cells": int(cells * OPENED_CELLS_DENSITY)
+    }
+
+
+def benchmark_generation(settings: Dict) -> Callable:
+    return lambda: MineField(**settings)
+
+
+def benchmark_discover_cell(settings: Dict) -> Callable:
+    # Each call discovers the next unknown cell of the fresh mine field, so games are rarely lost in between.
+    mine_fields = []
+
+    def discover_cell() -> None:
+        if not mine_fields or mine_fields[0].get_game_state() != "in progress" or not mine_fields[1]:
+            mine_field = MineField(**settings)
+            cells = mine_field.get_unknown_cells_coordinates()
+            random.shuffle(cells)
+            mine_fields[:] = [mine_field, cells]
+        mine_fields[0].discover_cell(*mine_fields[1].pop())
+
+    return discover_cell
+
+
+def benchmark_to_dict(settings: Dict) -> Callable:
+    return MineField(**settings).to_dict
+
+
+def benchmark_to_rows(settings: Dict) -> Callable:
+    return MineField(**settings).to_rows
+
+
+def benchmark_sweep(settings: Dict) -> Optional[Callable]:
+    if settings["horizontal_size"] * settings["vertical_size"] > MAX_SWEEP_BOARD_CELLS:
+        return None
+    return lambda: Sweeper(MineField(**settings)).sweep()
+
+
+def benchmark_file_storage_set(settings: Dict) -> Callable:
+    storage = Storage()
+    mine_field = MineField(**settings)
+    return lambda: storage.set("benchmark", mine_field)
+
+
+def benchmark_file_storage_get(settings: Dict) -> Callable:
+    storage = Storage()
+    storage.set("benchmark", MineField(**settings))
+    return lambda: storage.get("benchmark")
+
+
+def benchmark_sqlite_storage_set(settings: Dict) -> Callable:
+    storage = SqliteStorage(f"{os.getcwd()}/benchmark.sqlite3")
+    mine_field = MineField(**settings)
+    return lambda: storage.set("benchmark", mine_field)
+
+
+def benchmark_sqlite_storage_get(settings: Dict) -> Callable:
+    storage = SqliteStorage(f"{os.getcwd()}/benchmark.sqlite3")
+    storage.set("benchmark", MineField(**settings))
+    return lambda: storage.get("benchmark")
+
+
+def benchmark_api_create(settings: Dict) -> Callable:
+    client = get_api_client()
+    payload = get_api_payload(settings)
+    return lambda: client.post("/mine_field/", json=payload)
+
+
+def benchmark_api_update(settings: Dict) -> Callable:
+    client = get_api_client()
+    payload = get_api_payload(settings)
+    games = []
+
+    def update() -> None:
+        # New game is started once the previous one is finished, so only moves changing the board are measured.
+        if not games or games[2] != "in progress" or not games[1]:
+            response = client.post("/mine_field/?view=rows", json=payload).get_json()
+            cells = [(x, y,) for x in range(settings["horizontal_size"]) for y in range(settings["vertical_size"])]
+            random.shuffle(cells)
+            games[:] = [response["mineFieldId"], cells, response["gameState"]]
+        x, y = games[1].pop()
+        response = client.put(f"/mine_field/{games[0]}", json={"x": x, "y": y})
+        assert response.status_code == 200, response.get_json()
+        games[2] = response.get_json()["gameState"]
+
+    return update
+
+
+def get_api_client():
+    # Application is imported lazily, since its storage is created inside the current directory on import.
+    from handlers.web import app
+    return app.test_client()
+
+
+def flush_api_storage() -> None:
+    # Cached storage of the application writes its dirty entries on exit, while benchmark directory is gone by then.
+    if "handlers.api.mine_field" in sys.modules:
+        storage = sys.modules["handlers.api.mine_field"].storage
+        if hasattr(storage, "flush"):
+            storage.flush()
+
+
+def get_api_payload(settings: Dict) -> Dict:
+    return {
+        "horizontalFieldSize": settings["horizontal_size"],
+        "verticalFieldSize": settings["vertical_size"],
+        "mines": settings["mines"],
+        "discoverableRadius": settings["discoverable_radius"],
+        "openedCells": settings["opened_cells"]
+    }
+
+
+BENCHMARKS = {
+    "mine_field.generation": benchmark_generation,
+    "mine_field.discover_cell": benchmark_discover_cell,
+    "mine_field.to_dict": benchmark_to_dict,
+    "mine_field.to_rows": benchmark_to_rows,
+    "sweeper.sweep": benchmark_sweep,
+    "storage.file.set": benchmark_file_storage_set,
+    "storage.file.get": benchmark_file_storage_get,
+    "storage.sqlite.set": benchmark_sqlite_storage_set,
+    "storage.sqlite.get": benchmark_sqlite_storage_get,
+    "api.create": benchmark_api_create,
+    "api.update": benchmark_api_update
+}
+
+
+def run_benchmarks(names: List[str], quick: bool, min_time: float, seed: int) -> Iterator[Dict]:
+    board_sizes = QUICK_BOARD_SIZES if quick else BOARD_SIZES
+    discoverable_radiuses = QUICK_DISCOVERABLE_RADIUSES if quick else DISCOVERABLE_RADIUSES
+    for name in names:
+        for board_size, mine_density, discoverable_radius in itertools.product(
+            board_sizes, MINE_DENSITIES, discoverable_radiuses
+        ):
+            random.seed(seed)
+            settings = get_settings(board_size, mine_density, discoverable_radius)
+            function = BENCHMARKS[name](settings)
+            if function is None:
+                continue
+            yield {
+                "name": name,
+                "params": {
+                    "board_size": f"{board_size[0]}x{board_size[1]}",
+                    "mine_density": mine_density,
+                    "discoverable_radius": discoverable_radius
+                },
+                **measure(function, min_time)
+            }
+
+
+def get_environment() -> Dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def get_result_key(result: Dict) -> Tuple:
+    return (result["name"], *sorted(result["params"].items()))
+
+
+def print_results(results: List[Dict], baseline: Optional[Dict]) -> None:
+    baseline_results = {get_result_key(result): result for result in (baseline or {}).get("results", [])}
+    for result in results:
+        params = ", ".join(f"{key}={value}" for key, value in result["params"].items())
+        line = f"{result['name']:<26} {params:<60} median: {result['median'] * 1000:10.3f} ms"
+        baseline_result = baseline_results.get(get_result_key(result))
+        if baseline_result:
+            line += f"  ({result['median'] / baseline_result['median']:.2f}x of baseline)"
+        print(line)
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Runs benchmarks and writes results as JSON.")
+    parser.add_argument(
+        "--benchmark", action="append", choices=list(BENCHMARKS), help="Benchmarks to run, all by default."
+    )
+    parser.add_argument("--quick", action="store_true", help="Run benchmarks on smaller set of parameters.")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Min number of seconds to spend on each benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of mine field generation.")
+    parser.add_argument("--output", default=None, help="File to write JSON results to.")
+    parser.add_argument("--compare", default=None, help="File with JSON results to compare with.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    baseline = None
+    if arguments.compare:
+        with open(arguments.compare, "r") as file:
+            baseline = json.load(file)
+
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as benchmark_directory:
+        # Storages keep their files inside the current directory.
+        os.chdir(benchmark_directory)
+        try:
+            results = []
+            for result in run_benchmarks(
+                arguments.benchmark or list(BENCHMARKS), arguments.quick, arguments.min_time, arguments.seed
+            ):
+                print_results([result], baseline)
+                results.append(result)
+            flush_api_storage()
+        finally:
+            os.chdir(working_directory)
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump({"environment": get_environment(), "results": results}, file, indent=2)
+        print(f"results were written to {arguments.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
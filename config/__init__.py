@@ -2,4 +2,45 @@ EMPTY_CELL = " "
 UNKNOWN_CELL = "?"
 MINE_CELL = "X"
 
+MAX_BATCH_MOVES = 10000  # Max number of moves accepted by a single batch request.
+MAX_BULK_MINE_FIELDS = 100  # Max number of mine fields created by a single bulk request.
+MAX_UPDATE_ATTEMPTS = 5  # Max number of attempts to store a move when the same mine field is changed concurrently.
+
+# Mine fields with these settings are generated ahead of time, so new games are taken from the pool.
+# Each of the settings should have `MineField` arguments, for example:
+# {"horizontal_size": 5, "vertical_size": 5, "mines": 4, "discoverable_radius": 2, "opened_cells": 5}
+MINE_FIELD_POOL_SETTINGS = []
+MINE_FIELD_POOL_SIZE = 100  # Number of mine fields kept for each of the settings.
+
+# Mine fields are solved in background on a pool of worker processes.
+SOLVE_WORKERS = 2  # Max number of mine fields solved at the same time.
+SOLVE_MAX_PENDING_JOBS = 100  # New solve jobs are rejected once there are this many unfinished ones.
+SOLVE_MAX_JOBS = 1000  # Max number of solve jobs which status is kept.
+
+# Durations of request handling stages and counters of games exposed by `/metrics` route in Prometheus format.
+METRICS_ENABLED = False
+
+ASYNC_STORAGE_THREADS = 32  # Max number of storage calls made at the same time by async (ASGI) application.
+
+STORAGE_BACKEND = "file"  # One of: "file" (one file per mine field), "sqlite".
 STORAGE_FOLDER_NAME = "storage"  # Should be located in the project root.
+# Mine fields are stored split into square tiles of this size, so moves rewrite single tiles only.
+# Set to 0 to store each mine field as a whole.
+STORAGE_TILE_SIZE = 0
+
+# Moves of each game are appended to its log, while the whole mine field is stored once every few moves only.
+# Logs allow to replay any game from the beginning, see `python -m scripts.replay`. Can not be used with tiles.
+MOVE_LOG_ENABLED = False
+MOVE_LOG_FOLDER_NAME = "move_logs"  # Should be located in the project root.
+MOVE_LOG_SNAPSHOT_INTERVAL = 100  # Number of moves between stored mine fields.
+
+SQLITE_DATABASE_NAME = "storage.sqlite3"  # Should be located in the project root.
+SQLITE_FINISHED_GAMES_TTL = 24 * 60 * 60  # Seconds finished games are kept since their last update.
+SQLITE_EXPIRATION_INTERVAL = 60  # Min seconds between deletions of expired finished games.
+
+# In-memory write-behind cache in front of the storage, disabled by default (size is 0).
+# Enable it only when a single server process is running: moves are flushed to the storage in background,
+# so other processes may read stale mine fields and unflushed moves are lost when the process is killed.
+STORAGE_CACHE_SIZE = 0
+STORAGE_CACHE_TTL = 60.0  # Seconds.
+STORAGE_CACHE_FLUSH_INTERVAL = 1.0  # Seconds.
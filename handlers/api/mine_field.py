@@ -1,71 +1,334 @@
 from uuid import uuid4
-from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, make_response, request
 
-from app.classes.storage import Storage
+import config
+from app.metrics import metrics
+from app.classes.game_state import GameState
 from app.classes.mine_field import MineField
-from handlers.response_messages import MessageType
-from handlers.validators import NEW_MINE_FIELD, EXISTING_MINE_FIELD, MINE_FIELD_ID
+from app.classes.tiled_mine_field import TiledMineField
+from app.classes.solve_jobs import SolveJobs
+from app.classes.mine_field_pool import MineFieldPool
+from app.storage_factory import create_storage
+from handlers import responses
+from handlers.validators import (
+    NEW_MINE_FIELD, NEW_MINE_FIELDS, EXISTING_MINE_FIELD, MINE_FIELD_MOVES, MINE_FIELD_ID, MINE_FIELD_VIEW,
+    MINE_FIELD_UPDATE_VIEW, MINE_FIELD_REGION, SOLVE_JOB_ID
+)
+
+
+class ConcurrentUpdateError(Exception):
+    pass
+
 
 bp = Blueprint("mine_field", __name__)
+storage = create_storage()
+mine_field_pool = MineFieldPool(config.MINE_FIELD_POOL_SETTINGS, size=config.MINE_FIELD_POOL_SIZE)
+solve_jobs = SolveJobs(
+    storage,
+    workers=config.SOLVE_WORKERS,
+    max_pending_jobs=config.SOLVE_MAX_PENDING_JOBS,
+    max_jobs=config.SOLVE_MAX_JOBS
+)
 
 
 @bp.route("/", methods=["POST"])
 def create_mine_field():
     json_data = request.get_json()
-    NEW_MINE_FIELD.check(json_data)
-    new_mine_field_id = uuid4()
+    count, view = check_new_mine_fields_request(json_data, request.args, bulk=False)
+
+    try:
+        mine_field_id, mine_field = create_mine_fields(json_data, count).popitem()
+    except ValueError as error:
+        return to_json_response(responses.get_incorrect_input_response(error))
+
+    storage.set(mine_field_id, mine_field)
+    return to_json_response(responses.get_mine_field_created_response(mine_field_id, mine_field, view))
+
+
+@bp.route("/bulk", methods=["POST"])
+def create_bulk_mine_fields():
+    json_data = request.get_json()
+    count, view = check_new_mine_fields_request(json_data, request.args, bulk=True)
 
     try:
-        mine_field = MineField(
-            horizontal_size=json_data["horizontalFieldSize"],
-            vertical_size=json_data["verticalFieldSize"],
-            mines=json_data["mines"],
-            discoverable_radius=json_data["discoverableRadius"],
-            opened_cells=json_data["openedCells"]
-        )
+        mine_fields = create_mine_fields(json_data, count)
     except ValueError as error:
-        return jsonify({
-            "message": MessageType.IncorrectInput.value,
-            "error": str(error)
-        }), HTTPStatus.UNPROCESSABLE_ENTITY
+        return to_json_response(responses.get_incorrect_input_response(error))
 
-    Storage().set(new_mine_field_id, mine_field)
-    return jsonify({
-        "message": MessageType.FieldCreated.value,
-        "mineFieldId": new_mine_field_id,
-        "gameState": mine_field.get_game_state(),
-        "mineField": mine_field.to_dict()
-    }), HTTPStatus.CREATED
+    storage.set_many(mine_fields)
+    return to_json_response(responses.get_mine_fields_created_response(mine_fields, view))
+
+
+@bp.route("/<mine_field_id>", methods=["GET"])
+def get_mine_field(mine_field_id: str):
+    region_args = check_region_request(mine_field_id, request.args.to_dict())
+    region_response, etag = get_region_response(
+        mine_field_id, storage.get(mine_field_id), region_args, request.headers.get("If-None-Match")
+    )
+
+    response = make_response(to_json_response(region_response))
+    if etag:
+        response.headers["ETag"] = etag
+    return response
 
 
 @bp.route("/<mine_field_id>", methods=["PUT"])
 def update_mine_field(mine_field_id: str):
+    view, update = check_cell_discovery_request(mine_field_id, request.get_json(), request.args)
+
+    try:
+        mine_field, changed_cells = update_stored_mine_field(mine_field_id, update)
+    except ValueError as error:
+        return to_json_response(responses.get_incorrect_input_response(error))
+
+    if not mine_field:
+        return to_json_response(responses.get_mine_field_not_found_response(mine_field_id))
+    return to_json_response(responses.get_cell_discovered_response(mine_field_id, mine_field, view, changed_cells))
+
+
+@bp.route("/<mine_field_id>/moves", methods=["PUT"])
+def apply_mine_field_moves(mine_field_id: str):
+    view, cells_coordinates, update = check_moves_request(mine_field_id, request.get_json(), request.args)
+
+    try:
+        mine_field, moves_changed_cells = update_stored_mine_field(mine_field_id, update)
+    except ValueError as error:
+        return to_json_response(responses.get_incorrect_input_response(error))
+
+    if not mine_field:
+        return to_json_response(responses.get_mine_field_not_found_response(mine_field_id))
+    return to_json_response(
+        responses.get_moves_applied_response(mine_field_id, mine_field, view, cells_coordinates, moves_changed_cells)
+    )
+
+
+@bp.route("/<mine_field_id>/solve", methods=["POST"])
+def solve_mine_field(mine_field_id: str):
     MINE_FIELD_ID.check(mine_field_id)
-    json_data = request.get_json()
-    EXISTING_MINE_FIELD.check(json_data)
-    storage = Storage()
     mine_field = storage.get(mine_field_id)
 
     if not mine_field:
-        return jsonify({
-            "message": MessageType.IncorrectInput.value,
-            "error": f"no mine field with `{mine_field_id}` was found"
-        }), HTTPStatus.CONFLICT
+        return to_json_response(responses.get_mine_field_not_found_response(mine_field_id))
 
     try:
-        mine_field.discover_cell(json_data["x"], json_data["y"])
+        job_id = solve_jobs.submit(mine_field_id, mine_field)
     except ValueError as error:
-        return jsonify({
-            "message": MessageType.IncorrectInput.value,
-            "error": str(error)
-        }), HTTPStatus.UNPROCESSABLE_ENTITY
+        return to_json_response(responses.get_incorrect_input_response(error))
 
-    storage.set(mine_field_id, mine_field)
-    return jsonify({
-        "message": MessageType.CellDiscovered.value,
-        "mineFieldId": mine_field_id,
-        "gameState": mine_field.get_game_state(),
-        "mineField": mine_field.to_dict()
-    })
+    if not job_id:
+        return to_json_response(responses.get_too_many_solve_jobs_response())
+    return to_json_response(responses.get_solve_job_created_response(mine_field_id, job_id))
+
+
+@bp.route("/<mine_field_id>/solve/<job_id>", methods=["GET"])
+def get_solve_job(mine_field_id: str, job_id: str):
+    MINE_FIELD_ID.check(mine_field_id)
+    SOLVE_JOB_ID.check(job_id)
+    job = solve_jobs.get(job_id)
+
+    if not job or job["mineFieldId"] != mine_field_id:
+        return to_json_response(responses.get_solve_job_not_found_response(job_id))
+    return to_json_response(responses.get_solve_job_response(job))
+
+
+@bp.errorhandler(ConcurrentUpdateError)
+def handle_concurrent_updates(error):
+    return to_json_response(responses.get_concurrent_update_response(error))
+
+
+def check_new_mine_fields_request(json_data: Any, args: Dict, bulk: bool) -> Tuple[int, str]:
+    """
+    Validates request creating new mine fields, shared by WSGI and ASGI applications.
+
+    :param (Any) json_data: Request payload.
+    :param (Dict) args: Query parameters.
+    :param (bool) bulk: Whether several mine fields are created by the request.
+    :return (Tuple[int, str]): Number of mine fields to create and their view.
+    """
+
+    (NEW_MINE_FIELDS if bulk else NEW_MINE_FIELD).check(json_data)
+    view = MINE_FIELD_VIEW.check(args.get("view", "full"))
+    return json_data["count"] if bulk else 1, view
+
+
+def check_region_request(mine_field_id: str, args: Dict) -> Dict:
+    """
+    Validates request reading a region of the mine field, shared by WSGI and ASGI applications.
+
+    :param (str) mine_field_id: Mine field id.
+    :param (Dict) args: Query parameters.
+    :return (Dict): Validated region bounds, see `get_region()`.
+    """
+
+    MINE_FIELD_ID.check(mine_field_id)
+    return MINE_FIELD_REGION.check(args)
+
+
+def check_cell_discovery_request(
+    mine_field_id: str,
+    json_data: Any,
+    args: Dict
+) -> Tuple[str, Callable[[MineField], List[Tuple[int, int]]]]:
+    """
+    Validates request discovering a cell, shared by WSGI and ASGI applications.
+
+    :param (str) mine_field_id: Mine field id.
+    :param (Any) json_data: Request payload.
+    :param (Dict) args: Query parameters.
+    :return (Tuple[str, Callable]): View of the mine field and the update to apply to it
+        (see `update_stored_mine_field()`).
+    """
+
+    MINE_FIELD_ID.check(mine_field_id)
+    EXISTING_MINE_FIELD.check(json_data)
+    view = MINE_FIELD_UPDATE_VIEW.check(args.get("view", "full"))
+    flood = json_data.get("flood", False)
+    return view, lambda mine_field: mine_field.discover_cell(json_data["x"], json_data["y"], flood)
+
+
+def check_moves_request(
+    mine_field_id: str,
+    json_data: Any,
+    args: Dict
+) -> Tuple[str, List[Tuple[int, int]], Callable[[MineField], List[List[Tuple[int, int]]]]]:
+    """
+    Validates request applying several moves, shared by WSGI and ASGI applications.
+
+    :param (str) mine_field_id: Mine field id.
+    :param (Any) json_data: Request payload.
+    :param (Dict) args: Query parameters.
+    :return (Tuple[str, List[Tuple[int, int]], Callable]): View of the mine field, coordinates of the moves
+        and the update to apply to the mine field (see `update_stored_mine_field()`).
+    """
+
+    MINE_FIELD_ID.check(mine_field_id)
+    MINE_FIELD_MOVES.check(json_data)
+    view = MINE_FIELD_UPDATE_VIEW.check(args.get("view", "full"))
+    cells_coordinates = [(move["x"], move["y"],) for move in json_data["moves"]]
+    flood = json_data.get("flood", False)
+    return view, cells_coordinates, lambda mine_field: mine_field.discover_cells(cells_coordinates, flood)
+
+
+def create_mine_fields(json_data: Dict, count: int) -> Dict[str, MineField]:
+    """
+    Creates new mine fields (or takes them from the pool) with settings of the request.
+
+    :param (Dict) json_data: Validated request payload with mine field settings.
+    :param (int) count: Number of mine fields to create.
+    :return (Dict[str, MineField]): New mine fields by their ids.
+    """
+
+    with metrics.time("generation"):
+        mine_fields = {
+            str(uuid4()): mine_field_pool.create(
+                horizontal_size=json_data["horizontalFieldSize"],
+                vertical_size=json_data["verticalFieldSize"],
+                mines=json_data["mines"],
+                discoverable_radius=json_data["discoverableRadius"],
+                opened_cells=json_data["openedCells"]
+            )
+            for _ in range(count)
+        }
+    metrics.increment("games_created", count)
+    return mine_fields
+
+
+def get_region(mine_field: Union[MineField, TiledMineField], region_args: Dict) -> responses.Region:
+    """
+    Fills region bounds missing from the request with the mine field bounds and checks them.
+
+    :param (Union[MineField, TiledMineField]) mine_field: Mine field to read the region of.
+    :param (Dict) region_args: Validated `x0`, `y0`, `x1` and `y1` query parameters, `x1` and `y1` are exclusive.
+    :return (responses.Region): Region bounds.
+    """
+
+    horizontal_size, vertical_size = mine_field.get_size()
+    x0, y0 = region_args.get("x0", 0), region_args.get("y0", 0)
+    x1, y1 = region_args.get("x1", horizontal_size), region_args.get("y1", vertical_size)
+    if not (x0 < x1 <= horizontal_size and y0 < y1 <= vertical_size):
+        raise ValueError("region should be a non-empty rectangle inside the mine field")
+    return x0, y0, x1, y1
+
+
+def get_region_response(
+    mine_field_id: str,
+    mine_field: Optional[Union[MineField, TiledMineField]],
+    region_args: Dict,
+    if_none_match: Optional[str]
+) -> Tuple[responses.Response, Optional[str]]:
+    """
+    Builds response to the request reading a region of the mine field, shared by WSGI and ASGI applications.
+
+    :param (str) mine_field_id: Mine field id.
+    :param (Optional[Union[MineField, TiledMineField]]) mine_field: Stored mine field, `None` when it does not exist.
+    :param (Dict) region_args: Validated region bounds, see `check_region_request()`.
+    :param (Optional[str]) if_none_match: Value of `If-None-Match` request header.
+    :return (Tuple[responses.Response, Optional[str]]): Response and value of `ETag` header to send along with it.
+    """
+
+    if not mine_field:
+        return responses.get_mine_field_not_found_response(mine_field_id), None
+
+    try:
+        region = get_region(mine_field, region_args)
+    except ValueError as error:
+        return responses.get_incorrect_input_response(error), None
+
+    etag = responses.get_mine_field_etag(mine_field, region)
+    if responses.is_etag_matched(if_none_match, etag):
+        return responses.get_not_modified_response(), etag
+    return responses.get_mine_field_region_response(mine_field_id, mine_field, region), etag
+
+
+def update_stored_mine_field(mine_field_id: str, update: Callable[[MineField], Any]) -> Tuple[Optional[MineField], Any]:
+    """
+    Applies the update to the stored mine field and stores it back with compare-and-set,
+    so updates of the same mine field made at the same time by other threads or processes are never lost.
+    When another update was stored first, mine field is read again and the update is retried.
+
+    :param (str) mine_field_id: Id of the stored mine field.
+    :param (Callable[[MineField], Any]) update: Function changing the mine field, it can raise `ValueError`.
+    :return (Tuple[Optional[MineField], Any]): Updated mine field (`None` when it does not exist) and update result.
+    """
+
+    for _ in range(config.MAX_UPDATE_ATTEMPTS):
+        mine_field = storage.get(mine_field_id)
+        if not mine_field:
+            return None, None
+
+        version = mine_field.get_version()
+        game_state = mine_field.get_game_state()
+        with metrics.time("update"):
+            result = update(mine_field)
+        # Mine field is not stored again when nothing was changed.
+        if mine_field.get_version() == version or storage.compare_and_set(mine_field_id, mine_field, version):
+            count_finished_game(game_state, mine_field)
+            return mine_field, result
+    raise ConcurrentUpdateError(f"mine field `{mine_field_id}` is changed by other requests, please try again")
+
+
+def count_finished_game(previous_game_state: str, mine_field: MineField) -> None:
+    """
+    Counts the game as won or lost by the metrics when the stored update has finished it.
+
+    :param (str) previous_game_state: Game state before the update.
+    :param (MineField) mine_field: Updated mine field.
+    """
+
+    game_state = mine_field.get_game_state()
+    if game_state == previous_game_state:
+        return
+    if game_state == GameState.Won.value:
+        metrics.increment("games_won")
+    elif game_state == GameState.Lost.value:
+        metrics.increment("games_lost")
+
+
+def to_json_response(response: responses.Response) -> Tuple[Any, int]:
+    payload, status = response
+    if payload is None:
+        return "", status
+    with metrics.time("json_encoding"):
+        return jsonify(payload), status
@@ -0,0 +1,266 @@
+import json
+import asyncio
+import logging
+from http import HTTPStatus
+from urllib.parse import parse_qs
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+import trafaret as t
+from flask_cors.core import get_cors_headers, get_cors_options
+from werkzeug.datastructures import Headers
+from werkzeug.exceptions import MethodNotAllowed, NotFound
+from werkzeug.routing import RequestRedirect
+
+import config
+from app.metrics import metrics
+from app.classes.thread_offloaded_storage import ThreadOffloadedStorage
+from handlers import responses
+from handlers.api import mine_field as mine_field_api
+from handlers.api.mine_field import ConcurrentUpdateError, create_mine_fields, update_stored_mine_field
+from handlers.validators import MINE_FIELD_ID, SOLVE_JOB_ID
+from handlers.web import app as wsgi_app
+
+"""
+Async (ASGI) application serving the same routes as `handlers/web.py` with the same responses.
+Requests are routed by the URL map of WSGI application and validated by the same functions,
+storage calls and updates of mine fields are made without blocking the event loop,
+so a single process can keep lots of slow clients connected.
+
+Launch it with any ASGI server, for example: `uvicorn handlers.asgi:app`
+"""
+
+logger = logging.getLogger(__name__)
+storage = ThreadOffloadedStorage(mine_field_api.storage, threads=config.ASYNC_STORAGE_THREADS)
+
+
+class BadRequestError(Exception):
+    pass
+
+
+class Request:
+    def __init__(self, scope: Dict, body: bytes):
+        self.method = scope["method"]
+        self.scheme = scope.get("scheme", "http")
+        self.path = scope["path"]
+        self.headers = Headers([(name.decode("latin-1"), value.decode("latin-1"),) for name, value in scope["headers"]])
+        self.query_string = scope.get("query_string", b"").decode("latin-1")
+        self.args = {name: values[0] for name, values in parse_qs(self.query_string).items()}
+        self._body = body
+
+    def get_json(self) -> Any:
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type != "application/json" and not (
+            content_type.startswith("application/") and content_type.endswith("+json")
+        ):
+            raise BadRequestError("request content type is not json")
+        try:
+            return json.loads(self._body)
+        except ValueError:
+            raise BadRequestError("unable to parse json payload")
+
+
+async def index_route(request: Request) -> responses.Response:
+    return responses.get_health_response()
+
+
+async def metrics_route(request: Request) -> Tuple[str, HTTPStatus]:
+    return responses.get_metrics_response()
+
+
+async def create_mine_field(request: Request) -> responses.Response:
+    json_data = request.get_json()
+    count, view = mine_field_api.check_new_mine_fields_request(json_data, request.args, bulk=False)
+
+    try:
+        mine_field_id, mine_field = (await run_in_thread(create_mine_fields, json_data, count)).popitem()
+    except ValueError as error:
+        return responses.get_incorrect_input_response(error)
+
+    await storage.set(mine_field_id, mine_field)
+    return responses.get_mine_field_created_response(mine_field_id, mine_field, view)
+
+
+async def create_bulk_mine_fields(request: Request) -> responses.Response:
+    json_data = request.get_json()
+    count, view = mine_field_api.check_new_mine_fields_request(json_data, request.args, bulk=True)
+
+    try:
+        mine_fields = await run_in_thread(create_mine_fields, json_data, count)
+    except ValueError as error:
+        return responses.get_incorrect_input_response(error)
+
+    await storage.set_many(mine_fields)
+    return responses.get_mine_fields_created_response(mine_fields, view)
+
+
+async def get_mine_field(request: Request, mine_field_id: str) -> Tuple[Optional[Dict], int, List[Tuple[str, str]]]:
+    region_args = mine_field_api.check_region_request(mine_field_id, request.args)
+    response, etag = mine_field_api.get_region_response(
+        mine_field_id, await storage.get(mine_field_id), region_args, request.headers.get("If-None-Match")
+    )
+    return (*response, [("etag", etag,)] if etag else [],)
+
+
+async def update_mine_field(request: Request, mine_field_id: str) -> responses.Response:
+    view, update = mine_field_api.check_cell_discovery_request(mine_field_id, request.get_json(), request.args)
+
+    try:
+        mine_field, changed_cells = await run_in_thread(update_stored_mine_field, mine_field_id, update)
+    except ValueError as error:
+        return responses.get_incorrect_input_response(error)
+
+    if not mine_field:
+        return responses.get_mine_field_not_found_response(mine_field_id)
+    return responses.get_cell_discovered_response(mine_field_id, mine_field, view, changed_cells)
+
+
+async def apply_mine_field_moves(request: Request, mine_field_id: str) -> responses.Response:
+    view, cells_coordinates, update = mine_field_api.check_moves_request(
+        mine_field_id, request.get_json(), request.args
+    )
+
+    try:
+        mine_field, moves_changed_cells = await run_in_thread(update_stored_mine_field, mine_field_id, update)
+    except ValueError as error:
+        return responses.get_incorrect_input_response(error)
+
+    if not mine_field:
+        return responses.get_mine_field_not_found_response(mine_field_id)
+    return responses.get_moves_applied_response(mine_field_id, mine_field, view, cells_coordinates, moves_changed_cells)
+
+
+async def solve_mine_field(request: Request, mine_field_id: str) -> responses.Response:
+    MINE_FIELD_ID.check(mine_field_id)
+    mine_field = await storage.get(mine_field_id)
+
+    if not mine_field:
+        return responses.get_mine_field_not_found_response(mine_field_id)
+
+    try:
+        job_id = mine_field_api.solve_jobs.submit(mine_field_id, mine_field)
+    except ValueError as error:
+        return responses.get_incorrect_input_response(error)
+
+    if not job_id:
+        return responses.get_too_many_solve_jobs_response()
+    return responses.get_solve_job_created_response(mine_field_id, job_id)
+
+
+async def get_solve_job(request: Request, mine_field_id: str, job_id: str) -> responses.Response:
+    MINE_FIELD_ID.check(mine_field_id)
+    SOLVE_JOB_ID.check(job_id)
+    job = mine_field_api.solve_jobs.get(job_id)
+
+    if not job or job["mineFieldId"] != mine_field_id:
+        return responses.get_solve_job_not_found_response(job_id)
+    return responses.get_solve_job_response(job)
+
+
+async def run_in_thread(function: Callable, *args) -> Any:
+    # CPU heavy work (like generation of big mine fields or updates of them) and blocking storage calls
+    # should not block the event loop.
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+# Handlers of the endpoints of WSGI application, so requests are routed by its URL map the same way as by Flask.
+HANDLERS: Dict[str, Callable[..., Awaitable[responses.Response]]] = {
+    "index_route": index_route,
+    "metrics_route": metrics_route,
+    "mine_field.create_mine_field": create_mine_field,
+    "mine_field.create_bulk_mine_fields": create_bulk_mine_fields,
+    "mine_field.get_mine_field": get_mine_field,
+    "mine_field.update_mine_field": update_mine_field,
+    "mine_field.apply_mine_field_moves": apply_mine_field_moves,
+    "mine_field.solve_mine_field": solve_mine_field,
+    "mine_field.get_solve_job": get_solve_job,
+}
+url_map = wsgi_app.url_map
+# Same options as the ones of Flask-CORS extension of WSGI application.
+cors_options = get_cors_options(wsgi_app)
+
+
+async def handle_request(request: Request) -> Tuple[Union[Dict, str, None], int, List[Tuple[str, str]]]:
+    """
+    Finds route of the request and handles it the same way as WSGI application does.
+
+    :param (Request) request: Request to handle.
+    :return (Tuple): Response payload (`None` for empty body, text for metrics), HTTP status code and extra headers.
+    """
+
+    url_adapter = url_map.bind(request.headers.get("Host", "localhost"), url_scheme=request.scheme)
+    try:
+        endpoint, arguments = url_adapter.match(request.path, request.method, query_args=request.query_string)
+    except RequestRedirect as redirect:
+        # Flask redirects to the route with trailing slash when it is missing.
+        return None, redirect.code, [("location", redirect.new_url)]
+    except NotFound as error:
+        return (*responses.get_not_found_response(error), [],)
+    except MethodNotAllowed as error:
+        return (*responses.get_method_not_allowed_response(error), [],)
+
+    if request.method == "OPTIONS":
+        return None, HTTPStatus.OK, [("allow", ", ".join(url_adapter.allowed_methods(request.path)),)]
+    return await _call_handler(HANDLERS[endpoint], request, arguments)
+
+
+async def app(scope: Dict, receive: Callable, send: Callable) -> None:
+    if scope["type"] == "lifespan":
+        # Nothing is set up on startup or torn down on shutdown, each step is just acknowledged.
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+    request = Request(scope, body)
+    payload, status, headers = await handle_request(request)
+    if payload is None:
+        content = b""
+    elif isinstance(payload, str):
+        content = payload.encode()
+        headers.append(("content-type", responses.METRICS_CONTENT_TYPE))
+    else:
+        with metrics.time("json_encoding"):
+            # Same encoding as the one of Flask `jsonify()`.
+            content = (json.dumps(payload, sort_keys=True, separators=(",", ":",)) + "\n").encode()
+        headers.append(("content-type", "application/json"))
+    headers.append(("content-length", str(len(content))))
+    headers.extend(get_cors_headers(cors_options, request.headers, request.method).items(multi=True))
+
+    await send({
+        "type": "http.response.start",
+        "status": int(status),
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+    })
+    await send({"type": "http.response.body", "body": b"" if request.method == "HEAD" else content})
+
+
+async def _call_handler(
+    handler: Callable,
+    request: Request,
+    arguments: Dict[str, str]
+) -> Tuple[Union[Dict, str, None], int, List[Tuple[str, str]]]:
+    # Handlers return extra headers along with the response only when they have any.
+    try:
+        response = await handler(request, **arguments)
+    except t.DataError as error:
+        response = responses.get_validation_error_response(error)
+    except BadRequestError:
+        response = responses.get_bad_request_response()
+    except ConcurrentUpdateError as error:
+        response = responses.get_concurrent_update_response(error)
+    except Exception:
+        logger.exception("failed to process the request")
+        response = responses.get_server_error_response()
+    return response if len(response) == 3 else (*response, [],)
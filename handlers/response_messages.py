@@ -4,7 +4,14 @@ from enum import Enum
 class MessageType(Enum):
     ServiceHealth = "service is up and running"
     FieldCreated = "mine field was successfully created"
+    FieldsCreated = "mine fields were successfully created"
     CellDiscovered = "cell was discovered"
+    FieldRegion = "mine field region"
+    MovesApplied = "moves were applied"
+    SolveJobCreated = "solve job was created"
+    SolveJobStatus = "solve job status"
+    TooManyRequests = "too many requests"
+    ConcurrentUpdate = "concurrent update"
     NotFound = "url not found"
     ValidationError = "validation error"
     IncorrectInput = "incorrect input data"
@@ -0,0 +1,231 @@
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple, Union
+
+import trafaret as t
+
+from app.metrics import metrics
+from app.classes.mine_field import MineField, encode_rows
+from app.classes.tiled_mine_field import TiledMineField
+from handlers.response_messages import MessageType
+
+"""
+Response payloads shared by WSGI (`handlers/web.py`) and ASGI (`handlers/asgi.py`) applications,
+so both of them respond exactly the same way.
+Each function returns response payload along with HTTP status code.
+"""
+
+Response = Tuple[Optional[Dict], HTTPStatus]
+Region = Tuple[int, int, int, int]
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def get_health_response() -> Response:
+    return {"message": MessageType.ServiceHealth.value}, HTTPStatus.OK
+
+
+def get_mine_field_created_response(mine_field_id: str, mine_field: MineField, view: str) -> Response:
+    return {
+        "message": MessageType.FieldCreated.value,
+        "mineFieldId": mine_field_id,
+        "gameState": mine_field.get_game_state(),
+        **get_mine_field_view(mine_field, view)
+    }, HTTPStatus.CREATED
+
+
+def get_mine_fields_created_response(mine_fields: Dict[str, MineField], view: str) -> Response:
+    return {
+        "message": MessageType.FieldsCreated.value,
+        "mineFields": [
+            {
+                "mineFieldId": mine_field_id,
+                "gameState": mine_field.get_game_state(),
+                **get_mine_field_view(mine_field, view)
+            }
+            for mine_field_id, mine_field in mine_fields.items()
+        ]
+    }, HTTPStatus.CREATED
+
+
+def get_cell_discovered_response(
+    mine_field_id: str,
+    mine_field: MineField,
+    view: str,
+    changed_cells: List[Tuple[int, int]]
+) -> Response:
+    return {
+        "message": MessageType.CellDiscovered.value,
+        "mineFieldId": mine_field_id,
+        "gameState": mine_field.get_game_state(),
+        **get_mine_field_view(mine_field, view, changed_cells)
+    }, HTTPStatus.OK
+
+
+def get_moves_applied_response(
+    mine_field_id: str,
+    mine_field: MineField,
+    view: str,
+    cells_coordinates: List[Tuple[int, int]],
+    moves_changed_cells: List[List[Tuple[int, int]]]
+) -> Response:
+    changed_cells = [coordinates for move_changed_cells in moves_changed_cells for coordinates in move_changed_cells]
+    moves = [
+        {"x": x, "y": y, "value": mine_field.get_cell(x, y)}
+        for x, y in cells_coordinates[:len(moves_changed_cells)]
+    ]
+    return {
+        "message": MessageType.MovesApplied.value,
+        "mineFieldId": mine_field_id,
+        "gameState": mine_field.get_game_state(),
+        "moves": moves,
+        **get_mine_field_view(mine_field, view, changed_cells)
+    }, HTTPStatus.OK
+
+
+def get_mine_field_region_response(
+    mine_field_id: str,
+    mine_field: Union[MineField, TiledMineField],
+    region: Region
+) -> Response:
+    x0, y0, x1, y1 = region
+    with metrics.time("view_region"):
+        mine_field_rows = encode_rows(mine_field.get_cells(x0, y0, x1, y1))
+    return {
+        "message": MessageType.FieldRegion.value,
+        "mineFieldId": mine_field_id,
+        "gameState": mine_field.get_game_state(),
+        "version": mine_field.get_version(),
+        "region": {"x0": x0, "y0": y0, "x1": x1, "y1": y1},
+        "mineFieldRows": mine_field_rows
+    }, HTTPStatus.OK
+
+
+def get_not_modified_response() -> Response:
+    # Response to the conditional request has no body.
+    return None, HTTPStatus.NOT_MODIFIED
+
+
+def get_solve_job_created_response(mine_field_id: str, job_id: str) -> Response:
+    return {
+        "message": MessageType.SolveJobCreated.value,
+        "mineFieldId": mine_field_id,
+        "jobId": job_id
+    }, HTTPStatus.ACCEPTED
+
+
+def get_solve_job_response(job: Dict) -> Response:
+    return {"message": MessageType.SolveJobStatus.value, **job}, HTTPStatus.OK
+
+
+def get_metrics_response() -> Tuple[str, HTTPStatus]:
+    # Unlike others, payload is Prometheus text (see `METRICS_CONTENT_TYPE`) rather than JSON.
+    return metrics.to_prometheus(), HTTPStatus.OK
+
+
+def get_incorrect_input_response(error: Exception) -> Response:
+    return {
+        "message": MessageType.IncorrectInput.value,
+        "error": str(error)
+    }, HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def get_mine_field_not_found_response(mine_field_id: str) -> Response:
+    return {
+        "message": MessageType.IncorrectInput.value,
+        "error": f"no mine field with `{mine_field_id}` was found"
+    }, HTTPStatus.CONFLICT
+
+
+def get_solve_job_not_found_response(job_id: str) -> Response:
+    return {
+        "message": MessageType.IncorrectInput.value,
+        "error": f"no solve job with `{job_id}` was found"
+    }, HTTPStatus.CONFLICT
+
+
+def get_too_many_solve_jobs_response() -> Response:
+    return {
+        "message": MessageType.TooManyRequests.value,
+        "error": "too many mine fields are being solved, please try again later"
+    }, HTTPStatus.TOO_MANY_REQUESTS
+
+
+def get_concurrent_update_response(error: Exception) -> Response:
+    return {
+        "message": MessageType.ConcurrentUpdate.value,
+        "error": str(error)
+    }, HTTPStatus.CONFLICT
+
+
+def get_validation_error_response(error: t.DataError) -> Response:
+    return {"message": MessageType.ValidationError.value, "error": error.as_dict()}, HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def get_bad_request_response() -> Response:
+    return {"message": MessageType.RequestError.value, "error": "unable to parse json payload"}, HTTPStatus.BAD_REQUEST
+
+
+def get_not_found_response(error: Exception) -> Response:
+    return {"message": MessageType.NotFound.value, "error": f"{error}".lower()}, HTTPStatus.NOT_FOUND
+
+
+def get_method_not_allowed_response(error: Exception) -> Response:
+    return {"message": MessageType.NotAllowed.value, "error": f"{error}".lower()}, HTTPStatus.METHOD_NOT_ALLOWED
+
+
+def get_server_error_response() -> Response:
+    return {
+        "message": MessageType.ServerError.value,
+        "error": "failed to process the request"
+    }, HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def get_mine_field_etag(mine_field: Union[MineField, TiledMineField], region: Region) -> str:
+    """
+    Board version is increased by every change of the mine field, so along with the region bounds
+    it identifies the returned representation.
+
+    :param (Union[MineField, TiledMineField]) mine_field: Mine field.
+    :param (Region) region: Bounds of the returned region, see `get_mine_field_region_response()`.
+    :return (str): Value of `ETag` header.
+    """
+
+    return f'"{mine_field.get_version()}-{"-".join(map(str, region))}"'
+
+
+def is_etag_matched(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Checks whether the client already has the current representation, so `304 Not Modified` can be returned.
+
+    :param (Optional[str]) if_none_match: Value of `If-None-Match` request header.
+    :param (str) etag: Current `ETag` value.
+    :return (bool): Whether any of the client entity tags (weak ones included) matches the current one.
+    """
+
+    if not if_none_match:
+        return False
+    entity_tags = [entity_tag.strip() for entity_tag in if_none_match.split(",")]
+    return "*" in entity_tags or any(
+        (entity_tag[2:] if entity_tag.startswith("W/") else entity_tag) == etag for entity_tag in entity_tags
+    )
+
+
+def get_mine_field_view(mine_field: MineField, view: str, changed_cells: List[Tuple[int, int]] = ()) -> Dict:
+    """
+    Builds mine field representation requested by the client with `view` query parameter.
+
+    :param (MineField) mine_field: Mine field to represent.
+    :param (str) view: "full" - dictionary with every cell, "rows" - compact rows, see `MineField.to_rows()`,
+        "delta" - only cells changed by the request.
+    :param (List[Tuple[int, int]]) changed_cells: Coordinates of cells changed by the request.
+    :return (Dict): Response fields with mine field representation.
+    """
+
+    with metrics.time(f"view_{view}"):
+        if view == "rows":
+            return {"version": mine_field.get_version(), "mineFieldRows": mine_field.to_rows()}
+        if view == "delta":
+            return {
+                "version": mine_field.get_version(),
+                "changedCells": [{"x": x, "y": y, "value": mine_field.get_cell(x, y)} for x, y in changed_cells]
+            }
+        return {"mineField": mine_field.to_dict()}
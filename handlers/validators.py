@@ -1,14 +1,27 @@
 import trafaret as t
 
+import config
+
 UUID4_LENGTH = 36
 
 
-EXISTING_MINE_FIELD = t.Dict(
+MINE_FIELD_CELL = t.Dict(
     {
         t.Key("x"): t.Int(),
         t.Key("y"): t.Int()
     }
 )
+EXISTING_MINE_FIELD = MINE_FIELD_CELL + t.Dict(
+    {
+        t.Key("flood", optional=True): t.Bool()
+    }
+)
+MINE_FIELD_MOVES = t.Dict(
+    {
+        t.Key("moves"): t.List(MINE_FIELD_CELL, min_length=1, max_length=config.MAX_BATCH_MOVES),
+        t.Key("flood", optional=True): t.Bool()
+    }
+)
 NEW_MINE_FIELD = t.Dict(
     {
         t.Key("horizontalFieldSize"): t.Int(),
@@ -18,4 +31,20 @@ NEW_MINE_FIELD = t.Dict(
         t.Key("openedCells"): t.Int()
     }
 )
+NEW_MINE_FIELDS = NEW_MINE_FIELD + t.Dict(
+    {
+        t.Key("count"): t.Int(gte=1, lte=config.MAX_BULK_MINE_FIELDS)
+    }
+)
+MINE_FIELD_REGION = t.Dict(
+    {
+        t.Key("x0", optional=True): t.ToInt(gte=0),
+        t.Key("y0", optional=True): t.ToInt(gte=0),
+        t.Key("x1", optional=True): t.ToInt(gte=1),
+        t.Key("y1", optional=True): t.ToInt(gte=1)
+    }
+).ignore_extra("*")
 MINE_FIELD_ID = t.String(min_length=UUID4_LENGTH, max_length=UUID4_LENGTH)
+SOLVE_JOB_ID = t.String(min_length=UUID4_LENGTH, max_length=UUID4_LENGTH)
+MINE_FIELD_VIEW = t.Enum("full", "rows")
+MINE_FIELD_UPDATE_VIEW = t.Enum("full", "rows", "delta")
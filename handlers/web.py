@@ -1,11 +1,10 @@
-from http import HTTPStatus
-
 import trafaret as t
 from flask_cors import CORS
-from flask import Flask, jsonify
+from flask import Flask, Response
 
+from handlers import responses
 from handlers.api import mine_field
-from handlers.response_messages import MessageType
+from handlers.api.mine_field import to_json_response
 
 app = Flask(__name__)
 app.register_blueprint(mine_field.bp, url_prefix="/mine_field")
@@ -14,37 +13,35 @@ CORS(app)
 
 @app.route("/", methods=["GET"])
 def index_route():
-    return jsonify({"message": MessageType.ServiceHealth.value})
+    return to_json_response(responses.get_health_response())
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_route():
+    payload, status = responses.get_metrics_response()
+    return Response(payload, status=status, content_type=responses.METRICS_CONTENT_TYPE)
 
 
 @app.errorhandler(t.DataError)
 def handle_validation_violations(error):
-    return jsonify(
-        {"message": MessageType.ValidationError.value, "error": error.as_dict()}
-    ), HTTPStatus.UNPROCESSABLE_ENTITY
+    return to_json_response(responses.get_validation_error_response(error))
 
 
 @app.errorhandler(400)
 def handle_bad_requests(error):
-    return jsonify(
-        {"message": MessageType.RequestError.value, "error": "unable to parse json payload"}
-    ), HTTPStatus.BAD_REQUEST
+    return to_json_response(responses.get_bad_request_response())
 
 
 @app.errorhandler(404)
 def handle_not_found_page_requests(error):
-    return jsonify({"message": MessageType.NotFound.value, "error": f"{error}".lower()}), HTTPStatus.NOT_FOUND
+    return to_json_response(responses.get_not_found_response(error))
 
 
 @app.errorhandler(405)
 def handle_not_found_method_requests(error):
-    return jsonify(
-        {"message": MessageType.NotAllowed.value, "error": f"{error}".lower()}
-    ), HTTPStatus.METHOD_NOT_ALLOWED
+    return to_json_response(responses.get_method_not_allowed_response(error))
 
 
 @app.errorhandler(500)
 def handle_server_errors(error):
-    return jsonify(
-        {"message": MessageType.ServerError.value, "error": "failed to process the request"}
-    ), HTTPStatus.INTERNAL_SERVER_ERROR
+    return to_json_response(responses.get_server_error_response())
@@ -0,0 +1,91 @@
+"""
+Command line entry point for replaying games recorded into move logs (see `config.MOVE_LOG_ENABLED`).
+
+Every game is replayed from its initial layout and compared with the stored one, which makes recorded games
+a regression test of `MineField`. With `--sweeper` the same layouts are played by `Sweeper` as well.
+
+Usage example:
+    python -m scripts.replay --sweeper
+"""
+
+import argparse
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from app.classes.sweeper import Sweeper
+from app.classes.mine_field import MineField
+from app.classes.game_state import GameState
+from app.classes.move_log_storage import MoveLogStorage
+from app.storage_factory import create_storage
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replays recorded games and checks they end up the same way.")
+    parser.add_argument("--sweeper", action="store_true", help="Play layouts of recorded games with sweeper as well.")
+    parser.add_argument("--limit", type=int, default=None, help="Max number of games to replay.")
+    return parser.parse_args()
+
+
+def replay_game(layout: MineField, moves: List[Tuple[int, int, bool]]) -> MineField:
+    """
+    :param (MineField) layout: Initial layout of the game, it is changed by the replay.
+    :param (List[Tuple[int, int, bool]]) moves: Coordinates and flood flags of the recorded moves.
+    :return (MineField): Mine field after all the moves.
+    """
+
+    for x, y, flood in moves:
+        layout.discover_cell(x, y, flood)
+    return layout
+
+
+def replay_games(storage: MoveLogStorage, sweeper: bool, limit: Optional[int] = None) -> Dict:
+    """
+    :param (MoveLogStorage) storage: Storage keeping move logs.
+    :param (bool) sweeper: Whether layouts are played by sweeper as well.
+    :param (Optional[int]) limit: Max number of games to replay, all by default.
+    :return (Dict): Numbers of replayed games, moves and mismatches along with replay durations and sweeper results.
+    """
+
+    results = {"games": 0, "moves": 0, "mismatches": [], "replay_time": 0.0, "won": 0, "lost": 0, "sweep_time": 0.0}
+    for mine_field_id in storage.get_logged_ids():
+        if limit is not None and results["games"] >= limit:
+            break
+        replay = storage.get_replay(mine_field_id)
+        if replay is None:
+            continue
+        layout, moves = replay
+
+        started_at = perf_counter()
+        mine_field = replay_game(MineField.from_bytes(layout.to_bytes()), moves)
+        results["replay_time"] += perf_counter() - started_at
+        results["games"] += 1
+        results["moves"] += len(moves)
+        if mine_field.to_bytes() != storage.get(mine_field_id).to_bytes():
+            results["mismatches"].append(mine_field_id)
+
+        if sweeper:
+            started_at = perf_counter()
+            game_state = Sweeper(layout).sweep()
+            results["sweep_time"] += perf_counter() - started_at
+            results["won" if game_state == GameState.Won.value else "lost"] += 1
+    return results
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    storage = create_storage()
+    if not hasattr(storage, "get_replay"):
+        raise SystemExit("move logs are not enabled, see `MOVE_LOG_ENABLED` inside `config` module")
+
+    results = replay_games(storage, arguments.sweeper, arguments.limit)
+    print(f"replayed games: {results['games']}, moves: {results['moves']}, time: {results['replay_time']:.3f}s")
+    for mine_field_id in results["mismatches"]:
+        print(f"replayed game differs from the stored one: {mine_field_id}")
+    if arguments.sweeper:
+        print(f"sweeper won: {results['won']}, lost: {results['lost']}, time: {results['sweep_time']:.3f}s")
+    if results["mismatches"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Command line entry point for playing sweeper tournaments.
+
+Usage example:
+    python -m scripts.tournament --mines 5 --games 1000000 --checkpoint tournament.jsonl
+"""
+
+import argparse
+
+from app.classes.tournament import STRATEGIES, Tournament
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Plays lots of sweeper games and prints won/lost statistics.")
+    parser.add_argument("--horizontal-size", type=int, default=5, help="Horizontal size of the mine field.")
+    parser.add_argument("--vertical-size", type=int, default=5, help="Vertical size of the mine field.")
+    parser.add_argument("--mines", type=int, default=5, help="Number of mines to set on the field.")
+    parser.add_argument("--discoverable-radius", type=int, default=2, help="Distance where mines are looked for.")
+    parser.add_argument("--opened-cells", type=int, default=5, help="Cells to open before game starts.")
+    parser.add_argument("--games", type=int, default=100000, help="Number of games to play.")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="basic", help="Sweeper strategy.")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Number of games played by worker at once.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes, all CPUs by default.")
+    parser.add_argument("--seed", type=int, default=0, help="Tournament seed, same seeds give same results.")
+    parser.add_argument("--checkpoint", default=None, help="File to keep finished shards in to be able to resume.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    arguments = parse_arguments()
+    tournament = Tournament(
+        horizontal_size=arguments.horizontal_size,
+        vertical_size=arguments.vertical_size,
+        mines=arguments.mines,
+        discoverable_radius=arguments.discoverable_radius,
+        opened_cells=arguments.opened_cells,
+        games=arguments.games,
+        strategy=arguments.strategy,
+        shard_size=arguments.shard_size,
+        workers=arguments.workers,
+        seed=arguments.seed,
+        checkpoint_path=arguments.checkpoint
+    )
+
+    results = None
+    for results in tournament.play():
+        print(f"played: {results['games']}/{arguments.games}, won: {results['won']}, lost: {results['lost']}")
+
+    print("| Mines on field | Games played  | Won   | Lost  | Won    |")
+    print("|:--------------:|:-------------:|:-----:|:-----:|:------:|")
+    print(
+        f"| {arguments.mines} | {results['games']} | {results['won']} | {results['lost']} "
+        f"| {results['won'] / results['games']:.2%} |"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import json
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from app.classes.mine_field import MineField, encode_rows
+
+NEW_MINE_FIELD = {
+    "horizontalFieldSize": 4,
+    "verticalFieldSize": 4,
+    "mines": 2,
+    "discoverableRadius": 2,
+    "openedCells": 3
+}
+
+
+@pytest.fixture
+def apps(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from handlers.web import app as wsgi_app
+    from handlers.asgi import app as asgi_app
+    return wsgi_app.test_client(), asgi_app
+
+
+def call_asgi(
+    asgi_app,
+    method: str,
+    path: str,
+    payload: Optional[Dict] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Tuple[int, bytes, List[Tuple[bytes, bytes]]]:
+    path, _, query_string = path.partition("?")
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query_string.encode(),
+        "headers": [(b"content-type", b"application/json",)] + [
+            (name.lower().encode(), value.encode(),) for name, value in (headers or {}).items()
+        ]
+    }
+    messages = [{"type": "http.request", "body": json.dumps(payload).encode() if payload else b""}]
+    sent_messages = []
+
+    async def receive() -> Dict:
+        return messages.pop(0)
+
+    async def send(message: Dict) -> None:
+        sent_messages.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    return sent_messages[0]["status"], sent_messages[1]["body"], sent_messages[0]["headers"]
+
+
+def test_same_responses(apps):
+    from handlers.api.mine_field import storage
+    wsgi_client, asgi_app = apps
+    status, _, _ = call_asgi(asgi_app, "POST", "/mine_field/?view=rows", NEW_MINE_FIELD)
+    assert status == 201
+
+    # Each application plays its own copy of the same mine field.
+    wsgi_mine_field_id, asgi_mine_field_id = "1" * 36, "2" * 36
+    for mine_field_id in (wsgi_mine_field_id, asgi_mine_field_id,):
+        storage.set(mine_field_id, MineField(
+            horizontal_size=4, vertical_size=4, mines=2, discoverable_radius=2, opened_cells=3, seed=1
+        ))
+
+    requests = [
+        ("GET", "/", None,),
+        ("GET", "/mine_field/<id>", None,),
+        ("GET", "/mine_field/<id>?x0=1&y0=2&x1=3", None,),
+        ("GET", "/mine_field/<id>?x0=3&x1=3", None,),
+        ("GET", "/mine_field/<id>?x0=a", None,),
+        ("PUT", "/mine_field/<id>?view=delta", {"x": 0, "y": 0},),
+        ("PUT", "/mine_field/<id>?view=delta", {"x": 3, "y": 0, "flood": True},),
+        ("PUT", "/mine_field/<id>", {"x": 3, "y": 0, "flood": "yes"},),
+        ("PUT", "/mine_field/<id>/moves?view=rows", {"moves": [{"x": 1, "y": 1}, {"x": 2, "y": 2}], "flood": True},),
+        ("PUT", "/mine_field/<id>", {"x": 10, "y": 0},),
+        ("PUT", "/mine_field/<id>", {"x": "x"},),
+        ("PUT", f"/mine_field/{'0' * 36}", {"x": 0, "y": 0},),
+        ("POST", "/mine_field/bulk", {**NEW_MINE_FIELD, "mines": 100, "count": 2},),
+        ("POST", "/mine_field/<id>", None,),
+        ("GET", "/unknown", None,),
+    ]
+    for method, path, payload in requests:
+        wsgi_response = wsgi_client.open(path.replace("<id>", wsgi_mine_field_id), method=method, json=payload)
+        status, body, _ = call_asgi(asgi_app, method, path.replace("<id>", asgi_mine_field_id), payload)
+        assert status == wsgi_response.status_code, path
+        assert body.replace(asgi_mine_field_id.encode(), wsgi_mine_field_id.encode()) == wsgi_response.data, path
+
+
+def test_region_etag(apps):
+    from handlers.api.mine_field import storage
+    wsgi_client, asgi_app = apps
+    mine_field_id = "3" * 36
+    mine_field = MineField(horizontal_size=4, vertical_size=4, mines=2, discoverable_radius=2, opened_cells=3, seed=1)
+    storage.set(mine_field_id, mine_field)
+
+    response = wsgi_client.get(f"/mine_field/{mine_field_id}?x0=1&x1=3&y1=2")
+    assert response.get_json()["mineFieldRows"] == encode_rows(mine_field.get_cells(1, 0, 3, 2))
+    assert response.get_json()["region"] == {"x0": 1, "y0": 0, "x1": 3, "y1": 2}
+    assert response.headers["ETag"] == '"0-1-0-3-2"'
+    region_etag = response.headers["ETag"]
+
+    for if_none_match in ('"0-0-0-4-4"', 'W/"5", W/"0-0-0-4-4"', "*"):
+        headers = {"If-None-Match": if_none_match}
+        assert wsgi_client.get(f"/mine_field/{mine_field_id}", headers=headers).status_code == 304
+        status, body, response_headers = call_asgi(asgi_app, "GET", f"/mine_field/{mine_field_id}", headers=headers)
+        assert (status, body,) == (304, b"",)
+        assert (b"etag", b'"0-0-0-4-4"',) in response_headers
+    response = wsgi_client.get(f"/mine_field/{mine_field_id}", headers={"If-None-Match": region_etag})
+    assert response.status_code == 200, "Other regions of the same board version should not match."
+
+    mines_cells = mine_field.get_cells_layout()[0]
+    x, y = next((x, y) for x, y in mine_field.get_unknown_cells_coordinates() if not mines_cells[y, x])
+    wsgi_client.put(f"/mine_field/{mine_field_id}", json={"x": x, "y": y})
+    response = wsgi_client.get(f"/mine_field/{mine_field_id}", headers={"If-None-Match": '"0-0-0-4-4"'})
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1-0-0-4-4"'
+
+
+def test_flood_discovery(apps):
+    from handlers.api.mine_field import storage
+    wsgi_client, asgi_app = apps
+    wsgi_mine_field_id, asgi_mine_field_id = "4" * 36, "5" * 36
+    for mine_field_id in (wsgi_mine_field_id, asgi_mine_field_id,):
+        storage.set(mine_field_id, MineField(
+            horizontal_size=10, vertical_size=10, mines=3, discoverable_radius=1, opened_cells=0, seed=2
+        ))
+    mines_cells, _, mine_distances = storage.get(wsgi_mine_field_id).get_cells_layout()
+    x, y = next((x, y) for y in range(10) for x in range(10) if not mine_distances[y, x] and not mines_cells[y, x])
+
+    payload = {"x": x, "y": y, "flood": True}
+    wsgi_response = wsgi_client.put(f"/mine_field/{wsgi_mine_field_id}?view=delta", json=payload)
+    status, body, _ = call_asgi(asgi_app, "PUT", f"/mine_field/{asgi_mine_field_id}?view=delta", payload)
+    assert wsgi_response.status_code == status == 200
+    assert body.replace(asgi_mine_field_id.encode(), wsgi_mine_field_id.encode()) == wsgi_response.data
+    assert len(wsgi_response.get_json()["changedCells"]) > 1
+    assert wsgi_response.get_json()["version"] == 1
+
+
+def test_same_routing(apps):
+    wsgi_client, asgi_app = apps
+    requests = [
+        ("POST", "/mine_field?view=rows", {},),
+        ("OPTIONS", "/mine_field/abc", {},),
+        ("OPTIONS", "/mine_field/", {"Origin": "http://example.com", "Access-Control-Request-Method": "POST"},),
+        ("DELETE", "/mine_field/", {},),
+        ("GET", "/", {"Origin": "http://example.com"},),
+        ("GET", "/unknown", {},),
+    ]
+    for method, path, headers in requests:
+        wsgi_response = wsgi_client.open(path, method=method, headers=headers)
+        status, body, response_headers = call_asgi(asgi_app, method, path, headers=headers)
+        assert status == wsgi_response.status_code, path
+        if status != 308:
+            assert body == wsgi_response.data, path
+        assert [
+            (name.decode(), value.decode(),) for name, value in response_headers
+            if name not in (b"content-type", b"content-length",)
+        ] == [
+            (name.lower(), value,) for name, value in wsgi_response.headers.items()
+            if name not in ("Content-Type", "Content-Length",)
+        ], path
+
+
+def test_updates_do_not_block_event_loop(apps, monkeypatch):
+    from handlers import asgi
+    from handlers.api.mine_field import storage
+    _, asgi_app = apps
+    mine_field_id = "6" * 36
+    storage.set(mine_field_id, MineField(
+        horizontal_size=4, vertical_size=4, mines=2, discoverable_radius=2, opened_cells=3, seed=1
+    ))
+    update_threads = []
+
+    def update_stored_mine_field(*args):
+        update_threads.append(threading.current_thread())
+        return asgi.mine_field_api.update_stored_mine_field(*args)
+
+    monkeypatch.setattr(asgi, "update_stored_mine_field", update_stored_mine_field)
+    status, _, _ = call_asgi(asgi_app, "PUT", f"/mine_field/{mine_field_id}", {"x": 0, "y": 0})
+    assert status == 200
+    assert update_threads and threading.main_thread() not in update_threads
+
+
+def test_lifespan(apps):
+    _, asgi_app = apps
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent_messages = []
+
+    async def receive() -> Dict:
+        return messages.pop(0)
+
+    async def send(message: Dict) -> None:
+        sent_messages.append(message)
+
+    asyncio.run(asgi_app({"type": "lifespan"}, receive, send))
+    assert sent_messages == [{"type": "lifespan.startup.complete"}, {"type": "lifespan.shutdown.complete"}]
@@ -0,0 +1,76 @@
+import numpy as np
+
+from app.field_utils import get_distance
+from app.classes.batch_sweeper import BatchSweeper
+
+
+def test_games_finished():
+    games = 100
+    result = BatchSweeper(
+        horizontal_size=5,
+        vertical_size=5,
+        mines=3,
+        discoverable_radius=2,
+        opened_cells=5,
+        games=games,
+        seed=1
+    ).sweep()
+    assert result["won"] + result["lost"] == games, "All games should be finished."
+    assert len(result["moves"]) == games
+    assert all(moves >= 1 for moves in result["moves"]), "At least 1 move should be made in each game."
+
+
+def test_reproducible_results():
+    results = [
+        BatchSweeper(
+            horizontal_size=4,
+            vertical_size=6,
+            mines=2,
+            discoverable_radius=3,
+            opened_cells=3,
+            games=50,
+            seed=42
+        ).sweep() for _ in range(2)
+    ]
+    assert results[0]["won"] == results[1]["won"]
+    assert results[0]["moves"].tolist() == results[1]["moves"].tolist()
+
+
+def test_mine_free_games_are_won():
+    result = BatchSweeper(
+        horizontal_size=3,
+        vertical_size=3,
+        mines=0,
+        discoverable_radius=1,
+        opened_cells=2,
+        games=10
+    ).sweep()
+    assert result["won"] == 10
+    assert result["moves"].tolist() == [7] * 10, "Every closed cell should be discovered once."
+
+
+def test_safe_cells_detection():
+    random = np.random.default_rng(0)
+    vertical_size, horizontal_size, discoverable_radius = 6, 7, 3
+    batch_sweeper = BatchSweeper(
+        horizontal_size=horizontal_size,
+        vertical_size=vertical_size,
+        mines=1,
+        discoverable_radius=discoverable_radius,
+        opened_cells=1,
+        games=1
+    )
+    discovered_cells = random.random((20, vertical_size, horizontal_size)) < 0.3
+    distances = random.integers(0, discoverable_radius + 1, (20, vertical_size, horizontal_size))
+
+    safe_cells = batch_sweeper._get_safe_cells(discovered_cells, distances)
+
+    for game in range(20):
+        for y in range(vertical_size):
+            for x in range(horizontal_size):
+                expected_safe = not discovered_cells[game, y, x] and any(
+                    discovered_cells[game, y2, x2] and distances[game, y2, x2] > 1
+                    and get_distance((x, y,), (x2, y2,)) < distances[game, y2, x2]
+                    for y2 in range(vertical_size) for x2 in range(horizontal_size)
+                )
+                assert safe_cells[game, y, x] == expected_safe
@@ -0,0 +1,94 @@
+from typing import Any
+
+from app.classes import cached_storage
+from app.classes.mine_field import MineField
+from app.classes.cached_storage import CachedStorage
+from app.classes.abstract.storage import AbstractStorage
+
+
+class MemoryStorage(AbstractStorage):
+    def __init__(self):
+        self.objects = {}
+        self.reads = 0
+        self.writes = 0
+
+    def set(self, object_id: str, data: Any) -> None:
+        self.writes += 1
+        self.objects[object_id] = data
+
+    def get(self, object_id: str) -> Any:
+        self.reads += 1
+        return self.objects.get(object_id)
+
+
+def test_cache_hits():
+    storage = MemoryStorage()
+    storage.objects["game"] = "state"
+    cache = CachedStorage(storage, flush_interval=None)
+
+    assert cache.get("game") == "state"
+    assert cache.get("game") == "state"
+    assert cache.get("unknown") is None
+    assert storage.reads == 2, "Cached object should be read from the underlying storage once."
+    assert cache.get_metrics()["hits"] == 1
+    assert cache.get_metrics()["misses"] == 2
+
+
+def test_write_behind():
+    storage = MemoryStorage()
+    cache = CachedStorage(storage, flush_interval=None)
+
+    cache.set("game", "state 1")
+    cache.set("game", "state 2")
+    assert cache.get("game") == "state 2"
+    assert storage.writes == 0, "Writes should be delayed till flush."
+
+    cache.flush()
+    assert storage.objects == {"game": "state 2"}
+    assert storage.writes == 1
+
+
+def test_least_recently_used_eviction():
+    storage = MemoryStorage()
+    cache = CachedStorage(storage, max_size=2, flush_interval=None)
+
+    cache.set("game 1", "state 1")
+    cache.set("game 2", "state 2")
+    cache.get("game 1")
+    cache.set("game 3", "state 3")
+
+    assert storage.objects == {"game 2": "state 2"}, "Evicted object should be flushed right away."
+    assert cache.get_metrics()["evictions"] == 1
+    assert cache.get_metrics()["size"] == 2
+
+
+def test_expiration(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(cached_storage, "monotonic", lambda: now[0])
+    storage = MemoryStorage()
+    cache = CachedStorage(storage, ttl=10, flush_interval=None)
+
+    cache.set("game 1", "state 1")
+    now[0] = 20.0
+    cache.set("game 2", "state 2")
+
+    assert storage.objects == {"game 1": "state 1"}, "Expired object should be flushed and evicted."
+    assert cache.get("game 1") == "state 1"
+    assert storage.reads == 1
+
+
+def test_compare_and_set():
+    storage = MemoryStorage()
+    cache = CachedStorage(storage, flush_interval=None)
+    mine_field = MineField(horizontal_size=3, vertical_size=3, mines=1, discoverable_radius=2, opened_cells=0)
+    cache.set("game", mine_field)
+
+    first_copy = cache.get("game")
+    second_copy = cache.get("game")
+    assert first_copy is not second_copy, "Each read should get its own copy."
+
+    first_copy.discover_cells(first_copy.get_unknown_cells_coordinates())
+    second_copy.discover_cells(second_copy.get_unknown_cells_coordinates())
+    assert cache.compare_and_set("game", first_copy, 0)
+    assert not cache.compare_and_set("game", second_copy, 0), "Second update of the same version should fail."
+    assert cache.get("game").get_version() == first_copy.get_version()
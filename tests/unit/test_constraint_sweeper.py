@@ -0,0 +1,78 @@
+import random
+import pytest
+from itertools import combinations
+
+import numpy as np
+
+from app.field_utils import get_mine_distance_map
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField
+from app.classes.constraint_sweeper import ConstraintSweeper
+
+
+def test_game_finished():
+    mine_field = MineField(
+        horizontal_size=5,
+        vertical_size=5,
+        mines=3,
+        discoverable_radius=2,
+        opened_cells=5
+    )
+    assert ConstraintSweeper(mine_field).sweep() in [GameState.Won.value, GameState.Lost.value]
+
+
+def test_mine_deduction():
+    mine_field = MineField(
+        horizontal_size=4,
+        vertical_size=1,
+        mines=1,
+        discoverable_radius=1,
+        opened_cells=1
+    )
+    # The only cell next to the opened one is a mine, so the rest of the cells are safe.
+    mine_field.set_pre_defined_field_map([[" ", "X", "?", "?"]])
+    sweeper = ConstraintSweeper(mine_field)
+
+    assert sweeper.sweep() == GameState.Won.value
+    assert sweeper.get_moves() == 2, "Only safe cells should be discovered."
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_mine_probabilities_match_enumeration(seed):
+    random.seed(seed)
+    mine_field = MineField(
+        horizontal_size=4,
+        vertical_size=4,
+        mines=random.randint(1, 4),
+        discoverable_radius=random.randint(1, 3),
+        opened_cells=4
+    )
+    sweeper = ConstraintSweeper(mine_field, max_component_classes=16)
+    mine_probabilities, are_probabilities_exact = sweeper._get_mine_probabilities()
+    assert are_probabilities_exact
+
+    # Enumerating all placements of mines which would give the same field state.
+    field_state = np.array(mine_field.get_field_state(), dtype=object)
+    unknown_cells = mine_field.get_unknown_cells_coordinates()
+    opened_cells = field_state != "?"
+    mines_counts = {coordinates: 0 for coordinates in unknown_cells}
+    placements = 0
+    for mines_cells_coordinates in combinations(unknown_cells, mine_field.get_mines()):
+        mines_cells = np.zeros(field_state.shape, dtype=bool)
+        for x, y in mines_cells_coordinates:
+            mines_cells[y, x] = True
+        distances = get_mine_distance_map(mines_cells, mine_field.get_discoverable_radius()).astype(object)
+        distances[distances == 0] = " "
+        if (distances[opened_cells] == field_state[opened_cells]).all():
+            placements += 1
+            for coordinates in mines_cells_coordinates:
+                mines_counts[coordinates] += 1
+
+    for coordinates in unknown_cells:
+        expected_mine_probability = mines_counts[coordinates] / placements
+        if coordinates in sweeper._known_mines_cells:
+            assert expected_mine_probability == 1
+        elif coordinates in sweeper._known_safe_cells:
+            assert expected_mine_probability == 0
+        else:
+            assert mine_probabilities[coordinates] == pytest.approx(expected_mine_probability)
@@ -0,0 +1,74 @@
+from app.classes.metrics import Metrics
+from app.classes.mine_field import MineField
+from app.classes.storage import Storage
+from app.classes.metered_storage import MeteredStorage
+
+NEW_MINE_FIELD = {
+    "horizontalFieldSize": 4,
+    "verticalFieldSize": 4,
+    "mines": 2,
+    "discoverableRadius": 2,
+    "openedCells": 3
+}
+
+
+def test_prometheus_text():
+    metrics = Metrics(buckets=(0.1, 1.0,))
+    metrics.observe("update", 0.05)
+    metrics.observe("update", 0.1)
+    metrics.observe("update", 5.0)
+    metrics.increment("games_created", 3)
+
+    lines = metrics.to_prometheus().splitlines()
+    assert "# TYPE grid_solver_stage_duration_seconds histogram" in lines
+    assert 'grid_solver_stage_duration_seconds_bucket{stage="update",le="0.1"} 2' in lines
+    assert 'grid_solver_stage_duration_seconds_bucket{stage="update",le="1.0"} 2' in lines
+    assert 'grid_solver_stage_duration_seconds_bucket{stage="update",le="+Inf"} 3' in lines
+    assert 'grid_solver_stage_duration_seconds_sum{stage="update"} 5.15' in lines
+    assert 'grid_solver_stage_duration_seconds_count{stage="update"} 3' in lines
+    assert "grid_solver_games_created_total 3" in lines
+    assert "grid_solver_games_lost_total 0" in lines
+
+
+def test_disabled_metrics():
+    metrics = Metrics(enabled=False)
+    with metrics.time("update"):
+        metrics.increment("games_created")
+
+    assert metrics.get_stage_count("update") == 0
+    assert metrics.get_counter("games_created") == 0
+    assert metrics.to_prometheus() == ""
+
+
+def test_metered_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    metrics = Metrics()
+    storage = MeteredStorage(Storage(), metrics)
+    mine_field = MineField(horizontal_size=4, vertical_size=4, mines=2, discoverable_radius=1, opened_cells=0)
+
+    storage.set("game", mine_field)
+    assert storage.compare_and_set("game", mine_field, mine_field.get_version())
+    assert storage.get("game").to_dict() == mine_field.to_dict()
+    assert metrics.get_stage_count("storage_set") == 1
+    assert metrics.get_stage_count("storage_compare_and_set") == 1
+    assert metrics.get_stage_count("storage_get") == 1
+
+
+def test_metrics_route(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from app.metrics import metrics
+    from handlers.web import app
+    monkeypatch.setattr(metrics, "enabled", True)
+    client = app.test_client()
+    games_created = metrics.get_counter("games_created")
+
+    mine_field_id = client.post("/mine_field/", json=NEW_MINE_FIELD).get_json()["mineFieldId"]
+    client.put(f"/mine_field/{mine_field_id}?view=delta", json={"x": 0, "y": 0})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.content_type == "text/plain; version=0.0.4; charset=utf-8"
+    assert metrics.get_counter("games_created") == games_created + 1
+    text = response.get_data(as_text=True)
+    for stage in ("generation", "update", "view_full", "view_delta", "json_encoding"):
+        assert f'grid_solver_stage_duration_seconds_count{{stage="{stage}"}}' in text
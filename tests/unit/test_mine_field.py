@@ -1,9 +1,15 @@
+import math
+import random
 import pytest
+import numpy as np
 from copy import deepcopy
 
-from typing import List, Union
+from typing import List, Tuple, Union
 
 import config
+from app.field_utils import (
+    get_distance, get_mine_distance_map, get_radius_ring, get_radius_stencil, get_radius_stencil_offsets
+)
 from app.classes.mine_field import MineField
 from app.classes.game_state import GameState
 
@@ -77,3 +83,263 @@ def test_mine_field_cleaning_completion():
     mine_field.discover_cell(1, 2)
     assert mine_field.get_game_state() == GameState.Won.value, "Leaving 1 unknown cell on the 1-mine field " \
                                                                f"should change game state to `{GameState.Won.value}`."
+
+
+@pytest.mark.parametrize("horizontal_size, vertical_size, mines, opened_cells", [
+    (5, 5, 4, 5,),
+    (40, 40, 1000, 600,),
+    (3, 3, 0, 0,),
+])
+def test_mine_field_generation(horizontal_size: int, vertical_size: int, mines: int, opened_cells: int):
+    settings = {
+        "horizontal_size": horizontal_size,
+        "vertical_size": vertical_size,
+        "mines": mines,
+        "discoverable_radius": 2,
+        "opened_cells": opened_cells
+    }
+    mine_field = MineField(**settings, seed=1)
+    assert mine_field.get_field_state() == MineField(**settings, seed=1).get_field_state(), \
+        "Same seeds should give same mine fields."
+
+    cells = [cell for row in mine_field.get_field_state() for cell in row]
+    assert len(cells) - cells.count(config.UNKNOWN_CELL) == opened_cells
+    if mines + opened_cells == horizontal_size * vertical_size:
+        assert mine_field.get_game_state() == GameState.Won.value, "Only mines should be left on the full board."
+
+
+def test_discovered_cells_and_version():
+    mine_field = get_pre_defined_mine_field(PRE_DEFINED_MINE_FIELD_MAP)
+    assert mine_field.get_version() == 0
+
+    assert mine_field.discover_cell(0, 2) == [(0, 2,)]
+    assert mine_field.get_version() == 1
+
+    # Discovering already discovered cell changes nothing.
+    assert mine_field.discover_cell(0, 2) == []
+    assert mine_field.get_version() == 1
+
+    # Once mine is discovered, all mine cells are shown.
+    assert mine_field.discover_cell(1, 1) == [(1, 1,)]
+    assert mine_field.get_version() == 2
+
+
+def test_cells_discovery():
+    mine_field = get_pre_defined_mine_field(PRE_DEFINED_MINE_FIELD_MAP)
+
+    # Nothing is discovered when any of the moves is incorrect.
+    with pytest.raises(ValueError):
+        mine_field.discover_cells([(0, 2,), (5, 5,)])
+    assert mine_field.get_version() == 0
+
+    # Moves left after the end of the game are skipped.
+    assert mine_field.discover_cells([(0, 2,), (0, 2,), (1, 2,), (1, 1,)]) == [[(0, 2,)], [], [(1, 2,)]]
+    assert mine_field.get_game_state() == GameState.Won.value
+
+
+def test_flood_discovery():
+    mine_field = MineField(horizontal_size=5, vertical_size=3, mines=1, discoverable_radius=1, opened_cells=1)
+    mine_field.set_pre_defined_field_map([
+        ["?", "?", "?", "?", "?"],
+        ["?", "?", "?", "?", "?"],
+        ["?", "?", "?", "?", "X"]
+    ])
+    mine_field.record_moves()
+
+    # Cell next to the mine is not empty, so nothing else is discovered.
+    assert mine_field.discover_cell(3, 2, flood=True) == [(3, 2,)]
+    changed_cells = mine_field.discover_cell(0, 0, flood=True)
+    assert changed_cells[0] == (0, 0,)
+    assert sorted(changed_cells) == sorted(
+        (x, y,) for y in range(3) for x in range(5) if (x, y,) not in [(3, 2,), (4, 2,)]
+    )
+    assert mine_field.get_version() == 2, "Whole region should be discovered by a single move."
+    assert mine_field.get_unsaved_moves() == [(3, 2, True,), (0, 0, True,)]
+    assert mine_field.get_game_state() == GameState.Won.value
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_flood_discovery_matches_cell_by_cell_walk(seed):
+    mine_field = MineField(
+        horizontal_size=30, vertical_size=20, mines=8, discoverable_radius=2, opened_cells=3, seed=seed
+    )
+    mines_cells, _, mine_distances = mine_field.get_cells_layout()
+    unknown_cells = set(mine_field.get_unknown_cells_coordinates())
+    x, y = next((x, y,) for x, y in sorted(unknown_cells) if not mine_distances[y, x] and not mines_cells[y, x])
+
+    # Walking the region cell by cell: every cell inside the radius of an empty cell is safe.
+    region, queue = {(x, y,)}, [(x, y,)]
+    while queue:
+        cell_x, cell_y = queue.pop()
+        for dx, dy, _ in get_radius_stencil(2):
+            neighbor = (cell_x + dx, cell_y + dy,)
+            if neighbor in region or not (0 <= neighbor[0] < 30 and 0 <= neighbor[1] < 20):
+                continue
+            region.add(neighbor)
+            if not mine_distances[neighbor[1], neighbor[0]]:
+                queue.append(neighbor)
+
+    changed_cells = mine_field.discover_cell(x, y, flood=True)
+    assert len(changed_cells) == len(set(changed_cells))
+    assert set(changed_cells) == region & unknown_cells
+    assert not any(mines_cells[cell_y, cell_x] for cell_x, cell_y in changed_cells)
+    assert mine_field.get_version() == 1
+
+
+def test_rows_representation():
+    mine_field = get_pre_defined_mine_field([
+        ["?", "?", "?", " ", " "],
+        ["?", "X", "?", "?", " "],
+        [" ", "?", "?", "?", "?"]
+    ])
+    assert mine_field.to_rows() == ["?*3, *2", "?*4, ", "1,?*4"]
+
+    mine_field.discover_cell(3, 1)
+    assert mine_field.to_rows() == ["?*3, *2", "?*3, *2", "1,?*4"]
+
+
+def get_full_rescan_field_state(
+    mine_field_map: List[List[Union[str, int]]],
+    discovered_cells: List[Tuple[int, int]],
+    discoverable_radius: int
+) -> Tuple[List[List[Union[str, int]]], str]:
+    """
+    Reference implementation of the mine field which re-scans the whole field after each discovery.
+    Used to make sure incremental updates of `MineField` lead to exactly the same results.
+    """
+
+    mines_cells_coordinates = set()
+    field_state = deepcopy(mine_field_map)
+    for y, row in enumerate(field_state):
+        for x, cell in enumerate(row):
+            if cell == config.MINE_CELL:
+                mines_cells_coordinates.add((x, y,))
+                field_state[y][x] = config.UNKNOWN_CELL
+
+    game_state = GameState.InProgress.value
+    moves = [None] + discovered_cells
+    for move in moves:
+        if move in mines_cells_coordinates:
+            game_state = GameState.Lost.value
+            for x, y in mines_cells_coordinates:
+                field_state[y][x] = config.MINE_CELL
+        elif move:
+            field_state[move[1]][move[0]] = config.EMPTY_CELL
+
+        unknown_cells = 0
+        for y, row in enumerate(field_state):
+            for x, cell in enumerate(row):
+                if cell == config.UNKNOWN_CELL:
+                    unknown_cells += 1
+                elif cell == config.EMPTY_CELL:
+                    distances = [get_distance((x, y,), coordinate) for coordinate in mines_cells_coordinates]
+                    distances = [distance for distance in distances if distance <= discoverable_radius]
+                    if distances:
+                        field_state[y][x] = min(distances)
+        if unknown_cells == len(mines_cells_coordinates) and game_state == GameState.InProgress.value:
+            game_state = GameState.Won.value
+        if game_state != GameState.InProgress.value:
+            break
+
+    return field_state, game_state
+
+
+def generate_random_mine_field_map(
+    horizontal_size: int,
+    vertical_size: int,
+    mines: int,
+    opened_cells: int
+) -> List[List[Union[str, int]]]:
+    cells = [(x, y,) for x in range(horizontal_size) for y in range(vertical_size)]
+    random.shuffle(cells)
+    mine_field_map = [[config.UNKNOWN_CELL for _ in range(horizontal_size)] for _ in range(vertical_size)]
+    for x, y in cells[:mines]:
+        mine_field_map[y][x] = config.MINE_CELL
+    for x, y in cells[mines:mines + opened_cells]:
+        mine_field_map[y][x] = config.EMPTY_CELL
+    return mine_field_map
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_incremental_updates_match_full_rescan(seed):
+    random.seed(seed)
+    horizontal_size = random.randint(1, 8)
+    vertical_size = random.randint(1, 8)
+    mines = random.randint(0, horizontal_size * vertical_size - 1)
+    opened_cells = random.randint(0, horizontal_size * vertical_size - mines)
+    discoverable_radius = random.randint(0, 4)
+    mine_field_map = generate_random_mine_field_map(horizontal_size, vertical_size, mines, opened_cells)
+
+    mine_field = MineField(
+        horizontal_size=horizontal_size,
+        vertical_size=vertical_size,
+        mines=mines,
+        discoverable_radius=discoverable_radius,
+        opened_cells=opened_cells
+    )
+    mine_field.set_pre_defined_field_map(deepcopy(mine_field_map))
+
+    discovered_cells = []
+    while mine_field.get_game_state() == GameState.InProgress.value:
+        # Already discovered cells are picked on purpose too, since discovering them again is allowed.
+        move = (random.randint(0, horizontal_size - 1), random.randint(0, vertical_size - 1),)
+        discovered_cells.append(move)
+        mine_field.discover_cell(*move)
+
+        expected_field_state, expected_game_state = get_full_rescan_field_state(
+            mine_field_map, discovered_cells, discoverable_radius
+        )
+        assert mine_field.get_field_state() == expected_field_state
+        assert mine_field.get_game_state() == expected_game_state
+
+
+def test_single_cell_state():
+    mine_field = get_pre_defined_mine_field(PRE_DEFINED_MINE_FIELD_MAP)
+    field_state = mine_field.get_field_state()
+    for y, row in enumerate(field_state):
+        for x, cell in enumerate(row):
+            assert mine_field.get_cell(x, y) == cell
+
+
+def test_unknown_cells_listing():
+    mine_field = get_pre_defined_mine_field(PRE_DEFINED_MINE_FIELD_MAP)
+    assert mine_field.get_unknown_cells_coordinates() == [(1, 1,), (0, 2,), (1, 2,)]
+
+
+def test_large_mine_field_is_compact():
+    mine_field = MineField(
+        horizontal_size=1000,
+        vertical_size=1000,
+        mines=1000,
+        discoverable_radius=5,
+        opened_cells=1000
+    )
+    assert mine_field._mine_field.nbytes + mine_field._mine_distances.nbytes + mine_field._mines_cells.nbytes \
+        <= 5 * 1024 * 1024
+
+
+@pytest.mark.parametrize("radius", [0, 1, 2, 5, 13])
+def test_radius_stencils(radius):
+    expected_offsets = {
+        (dx, dy, int(math.sqrt(dx ** 2 + dy ** 2)),)
+        for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)
+        if int(math.sqrt(dx ** 2 + dy ** 2)) <= radius
+    }
+    stencil = get_radius_stencil(radius)
+    assert set(stencil) == expected_offsets
+    assert [offset[2] for offset in stencil] == sorted(offset[2] for offset in stencil)
+    assert get_radius_ring(radius) == tuple(offset for offset in stencil if offset[2] == radius)
+    assert get_radius_stencil_offsets(radius).tolist() == [[dx, dy] for dx, dy, _ in stencil]
+
+
+@pytest.mark.parametrize("horizontal_size, vertical_size, radius", [(9, 7, 0), (9, 7, 1), (9, 7, 3), (300, 3, 300)])
+def test_mine_distance_map(horizontal_size, vertical_size, radius):
+    # Radius of the last case is too big for the table of distances, so distances are found with square roots.
+    mines_cells = np.random.default_rng(radius).random((vertical_size, horizontal_size,)) < 0.05
+    mines_coordinates = list(zip(*np.nonzero(mines_cells)[::-1]))
+    distances = get_mine_distance_map(mines_cells, radius)
+    for y in range(vertical_size):
+        for x in range(horizontal_size):
+            mine_distances = [get_distance((x, y,), coordinates) for coordinates in mines_coordinates]
+            mine_distances = [distance for distance in mine_distances if 0 < distance <= radius]
+            assert distances[y, x] == (min(mine_distances) if mine_distances and not mines_cells[y, x] else 0)
@@ -0,0 +1,56 @@
+import time
+from collections import deque
+
+import pytest
+
+from app.classes.mine_field_pool import MineFieldPool
+
+SETTINGS = {"horizontal_size": 5, "vertical_size": 5, "mines": 4, "discoverable_radius": 2, "opened_cells": 5}
+
+
+def wait_for_full_pool(pool: MineFieldPool, size: int) -> None:
+    deadline = time.monotonic() + 10
+    while min(pool.get_sizes().values()) < size and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_pooled_mine_fields():
+    pool = MineFieldPool([SETTINGS], size=3)
+    wait_for_full_pool(pool, 3)
+    assert list(pool.get_sizes().values()) == [3]
+
+    mine_fields = [pool.create(**SETTINGS) for _ in range(3)]
+    assert len({id(mine_field) for mine_field in mine_fields}) == 3, "Pooled mine fields should not be reused."
+    assert all(mine_field.get_mines() == SETTINGS["mines"] for mine_field in mine_fields)
+
+    # Pool is refilled in background once mine fields are taken from it.
+    wait_for_full_pool(pool, 3)
+    assert list(pool.get_sizes().values()) == [3]
+
+
+class SlowDeque(deque):
+    def popleft(self):
+        # Gives the refill thread time to wake up and refill the pool before the mine field is taken.
+        time.sleep(0.1)
+        return super().popleft()
+
+
+def test_pool_is_refilled_after_wakeup():
+    pool = MineFieldPool([SETTINGS], size=3)
+    wait_for_full_pool(pool, 3)
+    key = next(iter(pool.get_sizes()))
+    pool._mine_fields[key] = SlowDeque(pool._mine_fields[key])
+
+    pool.create(**SETTINGS)
+    wait_for_full_pool(pool, 3)
+    assert list(pool.get_sizes().values()) == [3], "Mine field taken right after the wakeup should be refilled."
+
+
+def test_not_pooled_mine_fields():
+    pool = MineFieldPool()
+    mine_field = pool.create(**{**SETTINGS, "mines": 1})
+    assert mine_field.get_mines() == 1
+    assert pool.get_sizes() == {}
+
+    with pytest.raises(ValueError):
+        MineFieldPool([{**SETTINGS, "mines": 100}])
@@ -0,0 +1,121 @@
+import os
+from copy import deepcopy
+from typing import Any
+
+from app.classes.mine_field import MineField
+from app.classes.move_log_storage import MoveLogStorage, LOG_HEADER, LOG_RECORD
+from app.classes.abstract.storage import AbstractStorage
+from scripts.replay import replay_games
+
+
+class MemoryStorage(AbstractStorage):
+    def __init__(self):
+        self.objects = {}
+        self.written_ids = []
+
+    def set(self, object_id: str, data: Any) -> None:
+        self.written_ids.append(object_id)
+        self.objects[object_id] = deepcopy(data)
+
+    def get(self, object_id: str) -> Any:
+        return deepcopy(self.objects.get(object_id))
+
+
+def create_mine_field() -> MineField:
+    return MineField(horizontal_size=10, vertical_size=10, mines=10, discoverable_radius=2, opened_cells=5, seed=7)
+
+
+def get_safe_cells(mine_field: MineField):
+    mines_cells = mine_field.get_cells_layout()[0]
+    return [(x, y) for x, y in mine_field.get_unknown_cells_coordinates() if not mines_cells[y, x]]
+
+
+def test_moves_are_appended(tmp_path):
+    snapshots = MemoryStorage()
+    storage = MoveLogStorage(snapshots, snapshot_interval=3, log_path=str(tmp_path))
+    mine_field = create_mine_field()
+    storage.set("game", mine_field)
+    assert snapshots.written_ids == ["game.layout", "game"]
+
+    for index, (x, y) in enumerate(get_safe_cells(mine_field)[:7]):
+        stored_mine_field = storage.get("game")
+        version = stored_mine_field.get_version()
+        assert version == index
+        stored_mine_field.discover_cell(x, y)
+        mine_field.discover_cell(x, y)
+        assert storage.compare_and_set("game", stored_mine_field, version)
+        assert not storage.compare_and_set("game", stored_mine_field, version), "Version should be checked."
+        assert storage.get("game").to_bytes() == mine_field.to_bytes()
+
+    assert os.path.getsize(tmp_path / "game.log") == LOG_HEADER.size + 7 * LOG_RECORD.size
+    assert snapshots.written_ids == ["game.layout", "game", "game", "game"], "Snapshot should be stored every 3 moves."
+    assert snapshots.objects["game"].get_version() == 6
+
+
+def test_batch_of_moves(tmp_path):
+    storage = MoveLogStorage(MemoryStorage(), snapshot_interval=100, log_path=str(tmp_path))
+    mine_field = create_mine_field()
+    storage.set("game", mine_field)
+
+    stored_mine_field = storage.get("game")
+    stored_mine_field.discover_cells(get_safe_cells(mine_field)[:5])
+    assert storage.compare_and_set("game", stored_mine_field, 0)
+    # Moves which are already logged are not logged again.
+    storage.set("game", stored_mine_field)
+
+    layout, moves = storage.get_replay("game")
+    assert layout.to_bytes() == mine_field.to_bytes()
+    assert moves == [(x, y, False,) for x, y in get_safe_cells(mine_field)[:5]]
+    assert storage.get("game").to_bytes() == stored_mine_field.to_bytes()
+
+
+def test_new_log_is_started(tmp_path):
+    storage = MoveLogStorage(MemoryStorage(), log_path=str(tmp_path))
+    mine_field = create_mine_field()
+    mine_field.discover_cells(get_safe_cells(mine_field)[:3])
+    assert mine_field.get_unsaved_moves() == [], "Moves are not recorded by default."
+    storage.set("game", mine_field)
+
+    layout, moves = storage.get_replay("game")
+    assert layout.get_version() == 3
+    assert moves == []
+    assert storage.get("game").to_bytes() == mine_field.to_bytes()
+
+
+def test_replay_games(tmp_path):
+    storage = MoveLogStorage(MemoryStorage(), snapshot_interval=2, log_path=str(tmp_path))
+    for mine_field_id in ("1", "2"):
+        mine_field = create_mine_field()
+        storage.set(mine_field_id, mine_field)
+        mine_field.discover_cells(get_safe_cells(mine_field)[:5])
+        storage.set(mine_field_id, mine_field)
+
+    results = replay_games(storage, sweeper=True)
+    assert results["games"] == 2
+    assert results["moves"] == 10
+    assert results["mismatches"] == []
+    assert results["won"] + results["lost"] == 2
+
+
+def test_flood_moves_are_replayed(tmp_path):
+    storage = MoveLogStorage(MemoryStorage(), log_path=str(tmp_path))
+    mine_field = MineField(horizontal_size=20, vertical_size=20, mines=5, discoverable_radius=1, opened_cells=0, seed=1)
+    storage.set("game", mine_field)
+    _, _, mine_distances = mine_field.get_cells_layout()
+    x, y = next((x, y) for x, y in get_safe_cells(mine_field) if not mine_distances[y, x])
+
+    assert len(mine_field.discover_cell(x, y, flood=True)) > 1
+    storage.set("game", mine_field)
+    assert storage.get_replay("game")[1] == [(x, y, True,)]
+    assert storage.get("game").to_bytes() == mine_field.to_bytes()
+
+
+def test_logs_deletion(tmp_path):
+    snapshots = MemoryStorage()
+    storage = MoveLogStorage(snapshots, log_path=str(tmp_path))
+    storage.set("game", create_mine_field())
+    assert storage.get_replay("game")
+
+    storage.delete_logs(["game", "unknown"])
+    assert list(storage.get_logged_ids()) == []
+    assert storage.get_replay("game") is None, "Game without log can not be replayed."
@@ -0,0 +1,57 @@
+import time
+from typing import Any
+
+import pytest
+
+from app.classes.solve_jobs import SolveJobs
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField
+from app.classes.solve_job_status import SolveJobStatus
+from app.classes.abstract.storage import AbstractStorage
+
+
+class MemoryStorage(AbstractStorage):
+    def __init__(self):
+        self.objects = {}
+
+    def set(self, object_id: str, data: Any) -> None:
+        self.objects[object_id] = data
+
+    def get(self, object_id: str) -> Any:
+        return self.objects.get(object_id)
+
+
+def get_mine_field() -> MineField:
+    return MineField(horizontal_size=10, vertical_size=10, mines=5, discoverable_radius=2, opened_cells=5)
+
+
+def test_solve_job():
+    storage = MemoryStorage()
+    solve_jobs = SolveJobs(storage, workers=1)
+    storage.set("game", get_mine_field())
+
+    job_id = solve_jobs.submit("game", storage.get("game"))
+    try:
+        deadline = time.monotonic() + 30
+        while solve_jobs.get(job_id)["status"] == SolveJobStatus.Pending.value and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        solve_jobs.shutdown()
+
+    job = solve_jobs.get(job_id)
+    assert job["status"] == SolveJobStatus.Finished.value
+    assert job["mineFieldId"] == "game"
+    assert job["moves"] > 0
+    assert job["gameState"] in (GameState.Won.value, GameState.Lost.value,)
+    assert storage.get("game").get_game_state() == job["gameState"], "Solved mine field should be stored."
+
+
+def test_solve_jobs_limits():
+    solve_jobs = SolveJobs(MemoryStorage(), max_pending_jobs=0)
+    assert solve_jobs.submit("game", get_mine_field()) is None, "Jobs above the limit should be rejected."
+    assert solve_jobs.get("unknown") is None
+
+    mine_field = get_mine_field()
+    mine_field.discover_cells(mine_field.get_unknown_cells_coordinates())
+    with pytest.raises(ValueError):
+        solve_jobs.submit("game", mine_field)
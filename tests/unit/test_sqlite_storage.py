@@ -0,0 +1,112 @@
+import threading
+from uuid import uuid4
+
+from app.classes import sqlite_storage
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField
+from app.classes.sqlite_storage import SqliteStorage
+
+
+def get_mine_field() -> MineField:
+    mine_field = MineField(
+        horizontal_size=3,
+        vertical_size=2,
+        mines=1,
+        discoverable_radius=2,
+        opened_cells=1
+    )
+    mine_field.set_pre_defined_field_map([
+        [" ", "?", "?"],
+        ["?", "?", "X"]
+    ])
+    return mine_field
+
+
+def test_storage(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "storage.sqlite3"))
+    mine_field_id = str(uuid4())
+    mine_field = get_mine_field()
+
+    assert storage.get(mine_field_id) is None
+    storage.set(mine_field_id, mine_field)
+    assert storage.get(mine_field_id).get_field_state() == mine_field.get_field_state()
+
+    mine_field.discover_cell(1, 0)
+    storage.set(mine_field_id, mine_field)
+    assert storage.get(mine_field_id).get_field_state() == mine_field.get_field_state()
+
+
+def test_batched_writes(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "storage.sqlite3"))
+    mine_fields = {str(uuid4()): get_mine_field() for _ in range(10)}
+
+    storage.set_many(mine_fields)
+    for mine_field_id, mine_field in mine_fields.items():
+        assert storage.get(mine_field_id).get_field_state() == mine_field.get_field_state()
+
+
+def test_connection_per_thread(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "storage.sqlite3"))
+    mine_field_ids = [str(uuid4()) for _ in range(4)]
+
+    def play(mine_field_id: str) -> None:
+        storage.set(mine_field_id, get_mine_field())
+
+    threads = [threading.Thread(target=play, args=(mine_field_id,)) for mine_field_id in mine_field_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(storage.get(mine_field_id) for mine_field_id in mine_field_ids)
+
+
+def test_compare_and_set(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "storage.sqlite3"))
+    mine_field = get_mine_field()
+
+    assert storage.compare_and_set("game", mine_field, None)
+    assert not storage.compare_and_set("game", mine_field, None), "Existing object should not be replaced."
+
+    mine_field.discover_cell(1, 0)
+    assert not storage.compare_and_set("game", mine_field, 1), "Object version should be checked."
+    assert storage.compare_and_set("game", mine_field, 0)
+    assert storage.get("game").get_version() == 1
+
+
+def test_finished_games_expiration(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_storage, "time", lambda: now[0])
+    storage = SqliteStorage(str(tmp_path / "storage.sqlite3"), finished_games_ttl=100, expiration_interval=10)
+
+    lost_mine_field = get_mine_field()
+    lost_mine_field.discover_cell(2, 1)
+    assert lost_mine_field.get_game_state() == GameState.Lost.value
+    storage.set("lost", lost_mine_field)
+    storage.set("in progress", get_mine_field())
+
+    now[0] = 1200.0
+    storage.set("new", get_mine_field())
+
+    assert storage.get("lost") is None, "Finished game should be deleted once expired."
+    assert storage.get("in progress"), "Games in progress should never expire."
+
+
+def test_expired_games_data_deletion(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_storage, "time", lambda: now[0])
+    storage = SqliteStorage(str(tmp_path / "storage.sqlite3"), finished_games_ttl=100, expiration_interval=10)
+    expired_ids = []
+    storage.add_expiration_listener(expired_ids.extend)
+
+    lost_mine_field = get_mine_field()
+    lost_mine_field.discover_cell(2, 1)
+    storage.set_many({"lost": lost_mine_field, "lost.layout": get_mine_field(), "lost.tile.0.0": get_mine_field()})
+    storage.set_many({"lost2": get_mine_field(), "lost2.layout": get_mine_field()})
+
+    now[0] = 1200.0
+    assert storage.delete_expired_games() == 1
+    assert expired_ids == ["lost"]
+    assert storage.get("lost.layout") is None, "Objects kept for the game should be deleted along with it."
+    assert storage.get("lost.tile.0.0") is None
+    assert storage.get("lost2") and storage.get("lost2.layout"), "Objects of other games should be kept."
@@ -0,0 +1,217 @@
+import pickle
+import copyreg
+import threading
+from uuid import uuid4
+from typing import Dict, Tuple
+
+import config
+from libs.serializer import Serializer
+from app.storage_factory import create_storage
+from app.classes.storage import Storage, LOCK_FILES_NUMBER
+from app.classes.game_state import GameState
+from app.classes.mine_field import MineField, BINARY_FORMAT_HEADER, BINARY_FORMAT_HEADERS
+from app.classes.mine_field_serializer import MineFieldSerializer
+
+
+class LegacyMineField:
+    """
+    Pickles the given state the same way mine fields were pickled before they got slots.
+    """
+
+    def __init__(self, state: Dict):
+        self._state = state
+
+    def __reduce__(self) -> Tuple:
+        return copyreg._reconstructor, (MineField, object, None,), self._state
+
+
+def get_mine_field() -> MineField:
+    mine_field = MineField(
+        horizontal_size=4,
+        vertical_size=3,
+        mines=2,
+        discoverable_radius=2,
+        opened_cells=1
+    )
+    mine_field.set_pre_defined_field_map([
+        [" ", " ", "?", "?"],
+        ["?", "X", "?", "?"],
+        ["?", "?", "?", "X"]
+    ])
+    return mine_field
+
+
+def assert_same_mine_fields(mine_field: MineField, expected_mine_field: MineField) -> None:
+    assert mine_field.get_field_state() == expected_mine_field.get_field_state()
+    assert mine_field.get_game_state() == expected_mine_field.get_game_state()
+    assert mine_field.get_mines() == expected_mine_field.get_mines()
+    assert mine_field.get_discoverable_radius() == expected_mine_field.get_discoverable_radius()
+    assert repr(mine_field) == repr(expected_mine_field)
+    assert mine_field.get_version() == expected_mine_field.get_version()
+
+
+def test_mine_field_serialization():
+    serializer = MineFieldSerializer()
+    mine_field = get_mine_field()
+    mine_field.discover_cell(3, 0)
+
+    restored_mine_field = serializer.deserialize(serializer.serialize(mine_field))
+    assert_same_mine_fields(restored_mine_field, mine_field)
+
+    # Restored mine field should be playable the same way as the original one.
+    mine_field.discover_cell(0, 2)
+    restored_mine_field.discover_cell(0, 2)
+    assert_same_mine_fields(restored_mine_field, mine_field)
+
+
+def test_lost_mine_field_serialization():
+    serializer = MineFieldSerializer()
+    mine_field = get_mine_field()
+    mine_field.discover_cell(1, 1)
+    assert mine_field.get_game_state() == GameState.Lost.value
+
+    assert_same_mine_fields(serializer.deserialize(serializer.serialize(mine_field)), mine_field)
+
+
+def test_first_binary_format_version_deserialization():
+    mine_field = get_mine_field()
+    mine_field.discover_cell(3, 0)
+    data = mine_field.to_bytes()
+
+    # Format version 1 header had no board version at the end.
+    header = BINARY_FORMAT_HEADERS[1].pack(*BINARY_FORMAT_HEADER.unpack_from(data)[:-1])
+    first_version_data = header[:4] + bytes([1]) + header[5:] + data[BINARY_FORMAT_HEADER.size:]
+
+    restored_mine_field = MineFieldSerializer().deserialize(first_version_data)
+    assert restored_mine_field.get_field_state() == mine_field.get_field_state()
+    assert restored_mine_field.get_version() == 0
+
+
+def test_legacy_mine_field_deserialization():
+    mine_field = get_mine_field()
+    mine_field.discover_cell(3, 0)
+
+    # Mine fields were pickled with cells kept in lists before switching to the binary format.
+    legacy_mine_field = LegacyMineField({
+        "_game_state": GameState.InProgress.value,
+        "_empty_cell": config.EMPTY_CELL,
+        "_mine_cell": config.MINE_CELL,
+        "_unknown_cell": config.UNKNOWN_CELL,
+        "_discoverable_radius": 2,
+        "_opened_cells": 1,
+        "_horizontal_field_size": 4,
+        "_vertical_field_size": 3,
+        "_mines": 2,
+        "_mines_cells_coordinates": {(1, 1,), (3, 2,)},
+        "_mine_field": mine_field.get_field_state()
+    })
+    legacy_data = Serializer().serialize(pickle.dumps(legacy_mine_field)).encode()
+
+    restored_mine_field = MineFieldSerializer().deserialize(legacy_data)
+    assert restored_mine_field.get_field_state() == mine_field.get_field_state()
+    assert repr(restored_mine_field) == repr(mine_field)
+    assert restored_mine_field.get_version() == 0
+
+
+def test_pickled_mine_field_deserialization():
+    mine_field = get_mine_field()
+    mine_field.record_moves()
+    mine_field.discover_cell(3, 0)
+    assert not hasattr(mine_field, "__dict__")
+
+    restored_mine_field = pickle.loads(pickle.dumps(mine_field))
+    assert_same_mine_fields(restored_mine_field, mine_field)
+    assert restored_mine_field.get_unsaved_moves() == [(3, 0, False,)]
+
+    # Mine fields kept in arrays were pickled along with cell constants, but without versions.
+    state = {
+        name: getattr(mine_field, name) for name in MineField.__slots__ if name not in ("_version", "_unsaved_moves",)
+    }
+    legacy_data = pickle.dumps(LegacyMineField({**state, "_empty_cell": config.EMPTY_CELL}))
+    restored_mine_field = pickle.loads(legacy_data)
+    assert restored_mine_field.get_field_state() == mine_field.get_field_state()
+    assert restored_mine_field.get_version() == 0
+    assert restored_mine_field.get_unsaved_moves() == []
+
+
+def test_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = Storage()
+    mine_field_id = str(uuid4())
+    mine_field = get_mine_field()
+
+    assert storage.get(mine_field_id) is None
+    storage.set(mine_field_id, mine_field)
+    assert_same_mine_fields(storage.get(mine_field_id), mine_field)
+    assert (tmp_path / config.STORAGE_FOLDER_NAME / mine_field_id).exists()
+    assert [path.name for path in (tmp_path / config.STORAGE_FOLDER_NAME).iterdir()] == [mine_field_id], \
+        "Temporary files should be replaced by the stored one."
+
+
+def test_compare_and_set(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = Storage()
+    mine_field_id = str(uuid4())
+    mine_field = get_mine_field()
+
+    assert storage.compare_and_set(mine_field_id, mine_field, None)
+    assert not storage.compare_and_set(mine_field_id, mine_field, None), "Existing object should not be replaced."
+
+    mine_field.discover_cell(3, 0)
+    assert not storage.compare_and_set(mine_field_id, mine_field, 1), "Object version should be checked."
+    assert storage.compare_and_set(mine_field_id, mine_field, 0)
+    assert storage.get(mine_field_id).get_version() == 1
+
+
+def test_concurrent_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = Storage()
+    mine_field_id = str(uuid4())
+    mine_field = MineField(horizontal_size=8, vertical_size=8, mines=0, discoverable_radius=2, opened_cells=0)
+    storage.set(mine_field_id, mine_field)
+
+    def discover_row(y: int) -> None:
+        for x in range(8):
+            while True:
+                stored_mine_field = storage.get(mine_field_id)
+                version = stored_mine_field.get_version()
+                stored_mine_field.discover_cell(x, y)
+                if storage.compare_and_set(mine_field_id, stored_mine_field, version):
+                    break
+
+    threads = [threading.Thread(target=discover_row, args=(y,)) for y in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert storage.get(mine_field_id).get_version() == 64, "None of the concurrent updates should be lost."
+
+
+def test_stored_size_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = create_storage()
+    mine_field_id = str(uuid4())
+    mine_field = MineField(horizontal_size=64, vertical_size=64, mines=0, discoverable_radius=0, opened_cells=0)
+    storage.set(mine_field_id, mine_field)
+    initial_size = len(pickle.dumps(storage.get(mine_field_id)))
+
+    for y in range(64):
+        stored_mine_field = storage.get(mine_field_id)
+        for x in range(64):
+            stored_mine_field.discover_cell(x, y)
+        storage.set(mine_field_id, stored_mine_field)
+
+    stored_mine_field = storage.get(mine_field_id)
+    assert stored_mine_field.get_version() == 64 * 64
+    assert len(pickle.dumps(stored_mine_field)) <= initial_size + 64, "Moves should not be kept along with the board."
+
+
+def test_lock_files_number_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    storage = Storage()
+    for _ in range(LOCK_FILES_NUMBER * 4):
+        assert storage.compare_and_set(str(uuid4()), get_mine_field(), None)
+
+    lock_files = [path for path in (tmp_path / config.STORAGE_FOLDER_NAME).iterdir() if path.name.startswith(".")]
+    assert 0 < len(lock_files) <= LOCK_FILES_NUMBER
@@ -20,3 +20,35 @@ def test_game_finished():
             break
         sweeper.sweep()
     assert mine_field.get_game_state() in [GameState.Won.value, GameState.Lost.value], "Game should be finished."
+
+
+def test_safe_cells_discovered_without_guesses():
+    mine_field = MineField(
+        horizontal_size=5,
+        vertical_size=1,
+        mines=1,
+        discoverable_radius=4,
+        opened_cells=1
+    )
+    # Nearest mine is 4 cells away from the opened cell, so all cells between them are safe.
+    mine_field.set_pre_defined_field_map([[" ", "?", "?", "?", "X"]])
+    sweeper = Sweeper(mine_field)
+
+    assert sweeper.sweep() == GameState.Won.value
+    assert sweeper.get_moves() == 3, "Only safe cells should be discovered."
+
+
+def test_flood_discovery():
+    mine_field = MineField(
+        horizontal_size=7,
+        vertical_size=1,
+        mines=1,
+        discoverable_radius=3,
+        opened_cells=1
+    )
+    # Safe cell next to the opened one has no mines inside the radius, so the rest of the cells are discovered with it.
+    mine_field.set_pre_defined_field_map([["?", "?", "?", " ", "?", "?", "X"]])
+    sweeper = Sweeper(mine_field, flood=True)
+
+    assert sweeper.sweep() == GameState.Won.value
+    assert sweeper.get_moves() == 1
@@ -0,0 +1,178 @@
+import pickle
+from copy import deepcopy
+from typing import Any
+
+from app.classes import sqlite_storage
+from app.classes.storage import Storage
+from app.classes.sqlite_storage import SqliteStorage
+from app.classes.mine_field import MineField
+from app.classes.tiled_storage import TiledStorage
+from app.classes.tiled_mine_field import TiledMineField
+from app.classes.abstract.storage import AbstractStorage
+
+
+class MemoryStorage(AbstractStorage):
+    def __init__(self):
+        self.objects = {}
+        self.read_ids = []
+        self.written_ids = []
+
+    def set(self, object_id: str, data: Any) -> None:
+        self.written_ids.append(object_id)
+        self.objects[object_id] = data
+
+    def get(self, object_id: str) -> Any:
+        self.read_ids.append(object_id)
+        return deepcopy(self.objects.get(object_id))
+
+
+def create_mine_field() -> MineField:
+    return MineField(horizontal_size=10, vertical_size=7, mines=15, discoverable_radius=2, opened_cells=10, seed=3)
+
+
+def test_same_game():
+    mine_field = create_mine_field()
+    storage = TiledStorage(MemoryStorage(), tile_size=3)
+    storage.set("game", mine_field)
+
+    for x, y in sorted(mine_field.get_unknown_cells_coordinates(), key=lambda coordinates: coordinates[::-1]):
+        tiled_mine_field = storage.get("game")
+        assert isinstance(tiled_mine_field, TiledMineField)
+        version = tiled_mine_field.get_version()
+        assert tiled_mine_field.discover_cell(x, y) == mine_field.discover_cell(x, y)
+        assert storage.compare_and_set("game", tiled_mine_field, version)
+
+        stored_mine_field = storage.get("game")
+        assert stored_mine_field.get_game_state() == mine_field.get_game_state()
+        assert stored_mine_field.get_version() == mine_field.get_version()
+        assert stored_mine_field.to_rows() == mine_field.to_rows()
+        assert stored_mine_field.to_dict() == mine_field.to_dict()
+        if mine_field.get_game_state() != "in progress":
+            break
+
+
+def test_only_changed_tile_is_written():
+    mine_field = create_mine_field()
+    memory_storage = MemoryStorage()
+    storage = TiledStorage(memory_storage, tile_size=4)
+    storage.set("game", mine_field)
+    assert len(memory_storage.written_ids) == 3 * 2 + 1
+
+    mines_cells = mine_field.get_cells_layout()[0]
+    x, y = next((x, y) for x, y in mine_field.get_unknown_cells_coordinates() if not mines_cells[y, x])
+    memory_storage.read_ids, memory_storage.written_ids = [], []
+    tiled_mine_field = storage.get("game")
+    tiled_mine_field.discover_cell(x, y)
+    storage.set("game", tiled_mine_field)
+
+    tile_id = f"game.tile.{x // 4}.{y // 4}"
+    assert memory_storage.read_ids == ["game", tile_id]
+    assert memory_storage.written_ids == [tile_id, "game"]
+
+
+def test_conflicting_moves_write_no_tiles():
+    mine_field = create_mine_field()
+    memory_storage = MemoryStorage()
+    storage = TiledStorage(memory_storage, tile_size=4)
+    storage.set("game", mine_field)
+
+    mines_cells = mine_field.get_cells_layout()[0]
+    safe_cells = [(x, y) for x, y in mine_field.get_unknown_cells_coordinates() if not mines_cells[y, x]]
+    first_mine_field, second_mine_field = storage.get("game"), storage.get("game")
+    first_mine_field.discover_cell(*safe_cells[0])
+    second_mine_field.discover_cell(*safe_cells[-1])
+    memory_storage.written_ids = []
+
+    assert storage.compare_and_set("game", first_mine_field, 0)
+    assert not storage.compare_and_set("game", second_mine_field, 0), "Game state version should be checked."
+    x, y = safe_cells[0]
+    assert memory_storage.written_ids == [f"game.tile.{x // 4}.{y // 4}", "game"]
+
+
+def test_region_loads_overlapping_tiles():
+    mine_field = create_mine_field()
+    memory_storage = MemoryStorage()
+    storage = TiledStorage(memory_storage, tile_size=4)
+    storage.set("game", mine_field)
+
+    memory_storage.read_ids = []
+    cells = storage.get("game").get_cells(3, 1, 6, 3)
+    assert cells.tolist() == mine_field._mine_field[1:3, 3:6].tolist()
+    assert memory_storage.read_ids == ["game", "game.tile.0.0", "game.tile.1.0"]
+
+
+def test_lost_game():
+    mine_field = create_mine_field()
+    storage = TiledStorage(MemoryStorage(), tile_size=4)
+    storage.set("game", mine_field)
+    ys, xs = mine_field.get_cells_layout()[0].nonzero()
+
+    tiled_mine_field = storage.get("game")
+    assert tiled_mine_field.discover_cell(int(xs[0]), int(ys[0])) == mine_field.discover_cell(int(xs[0]), int(ys[0]))
+    storage.set("game", tiled_mine_field)
+    assert storage.get("game").get_game_state() == "lost"
+    assert storage.get("game").to_dict() == mine_field.to_dict()
+
+
+def test_file_storage(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    mine_field = create_mine_field()
+    storage = TiledStorage(Storage(), tile_size=4)
+    storage.set("game", mine_field)
+
+    tiled_mine_field = storage.get("game")
+    assert tiled_mine_field.to_rows() == mine_field.to_rows()
+    assert tiled_mine_field.to_mine_field().to_bytes() == mine_field.to_bytes()
+    unpickled_mine_field = pickle.loads(pickle.dumps(tiled_mine_field))
+    assert isinstance(unpickled_mine_field, MineField)
+    assert unpickled_mine_field.to_dict() == mine_field.to_dict()
+
+
+def test_sqlite_storage(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(sqlite_storage, "time", lambda: now[0])
+    games_storage = SqliteStorage(str(tmp_path / "storage.sqlite3"), finished_games_ttl=100)
+    storage = TiledStorage(games_storage, tile_size=4)
+    mine_field = create_mine_field()
+    assert storage.compare_and_set("game", mine_field, None)
+    assert storage.get("game").to_rows() == mine_field.to_rows()
+
+    ys, xs = mine_field.get_cells_layout()[0].nonzero()
+    tiled_mine_field = storage.get("game")
+    tiled_mine_field.discover_cell(int(xs[0]), int(ys[0]))
+    assert storage.compare_and_set("game", tiled_mine_field, 0)
+
+    now[0] = 1200.0
+    assert games_storage.delete_expired_games() == 1
+    assert storage.get("game") is None
+    assert games_storage.get("game.tile.0.0") is None, "Tiles should be expired along with the game."
+
+
+def test_whole_mine_fields_are_readable():
+    memory_storage = MemoryStorage()
+    mine_field = create_mine_field()
+    memory_storage.set("game", mine_field)
+    assert TiledStorage(memory_storage).get("game").to_bytes() == mine_field.to_bytes()
+
+
+def test_flood_discovery():
+    mine_field = MineField(horizontal_size=20, vertical_size=15, mines=6, discoverable_radius=1, opened_cells=0, seed=5)
+    memory_storage = MemoryStorage()
+    storage = TiledStorage(memory_storage, tile_size=4)
+    storage.set("game", mine_field)
+    mines_cells, _, mine_distances = mine_field.get_cells_layout()
+    x, y = next((x, y) for x, y in mine_field.get_unknown_cells_coordinates() if not mine_distances[y, x] and
+                not mines_cells[y, x])
+
+    tiled_mine_field = storage.get("game")
+    changed_cells = tiled_mine_field.discover_cell(x, y, flood=True)
+    assert len(changed_cells) > 1
+    assert changed_cells == mine_field.discover_cell(x, y, flood=True)
+    memory_storage.written_ids = []
+    storage.set("game", tiled_mine_field)
+    assert len(memory_storage.written_ids) == len({(x // 4, y // 4,) for x, y in changed_cells}) + 1
+
+    stored_mine_field = storage.get("game")
+    assert stored_mine_field.get_version() == mine_field.get_version()
+    assert stored_mine_field.get_game_state() == mine_field.get_game_state()
+    assert stored_mine_field.to_rows() == mine_field.to_rows()
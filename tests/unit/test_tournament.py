@@ -0,0 +1,53 @@
+import random
+
+from app.classes.tournament import Tournament
+
+TOURNAMENT_SETTINGS = {
+    "horizontal_size": 3,
+    "vertical_size": 3,
+    "mines": 2,
+    "discoverable_radius": 2,
+    "opened_cells": 2,
+    "games": 50,
+    "shard_size": 10,
+    "seed": 7
+}
+
+
+def play_tournament(**kwargs) -> dict:
+    results = None
+    for results in Tournament(**{**TOURNAMENT_SETTINGS, **kwargs}).play():
+        pass
+    return results
+
+
+def test_all_games_played():
+    results = play_tournament(workers=1)
+    assert results["games"] == TOURNAMENT_SETTINGS["games"]
+    assert results["won"] + results["lost"] == TOURNAMENT_SETTINGS["games"]
+    assert sum(results["moves"]["won"].values()) == results["won"]
+    assert sum(results["moves"]["lost"].values()) == results["lost"]
+
+
+def test_results_do_not_depend_on_workers():
+    assert play_tournament(workers=1) == play_tournament(workers=2), "Shards should be seeded independently."
+
+
+def test_global_random_generator_is_not_seeded():
+    random.seed(1)
+    expected_state = random.getstate()
+    play_tournament(workers=1)
+    assert random.getstate() == expected_state, "Shards should use their own random generators."
+
+
+def test_resume_from_checkpoint(tmp_path):
+    checkpoint_path = str(tmp_path / "tournament.jsonl")
+    expected_results = play_tournament(workers=1, checkpoint_path=checkpoint_path)
+
+    # Dropping last 2 shards to emulate interrupted tournament.
+    with open(checkpoint_path, "r") as file:
+        lines = file.readlines()
+    with open(checkpoint_path, "w") as file:
+        file.writelines(lines[:-2])
+
+    assert play_tournament(workers=1, checkpoint_path=checkpoint_path) == expected_results